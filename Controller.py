@@ -1,6 +1,7 @@
 
 # controller.py
-from Events import GestorEventos, Evento, TIPOS_EVENTO, UBICACIONES_CAMP_NOU
+from Events import GestorEventos, Evento, ESTADOS_EVENTO, TIPOS_EVENTO, UBICACIONES_CAMP_NOU
+from almacenamiento import AlmacenamientoJSON, EscrituraDiferida
 from datetime import datetime
 import tkinter.messagebox as messagebox
 
@@ -9,7 +10,20 @@ class ControladorEventos:
     
     def __init__(self, ui):
         self.ui = ui
-        self.gestor = GestorEventos()
+        # Las escrituras van a un hilo aparte para no congelar la interfaz
+        self.gestor = GestorEventos(
+            almacenamiento=EscrituraDiferida(AlmacenamientoJSON("events_data.json")))
+        
+        # Página mostrada en la tabla: los argumentos con que se pidió y el resultado
+        self._peticion_pagina = (None, False)
+        self._pagina = None
+        # Resultados de la búsqueda activa (None si se muestran todos los eventos)
+        self._resultados_busqueda = None
+        # IDs de las filas de la página mostrada, en orden
+        self._filas_pagina = []
+        
+        # La tabla y las estadísticas se actualizan con los avisos del gestor
+        self.gestor.suscribir(self._al_cambiar_eventos)
         
         # Conectar eventos de la UI
         self.conectar_eventos()
@@ -17,6 +31,11 @@ class ControladorEventos:
         # Cargar datos iniciales
         self.cargar_datos_iniciales()
     
+    def cerrar(self):
+        """Escribe los cambios pendientes y libera el almacenamiento"""
+        if not self.gestor.cerrar():
+            messagebox.showerror("Error", "No se pudieron guardar los últimos cambios de los eventos")
+    
     def conectar_eventos(self):
         """Conecta los botones de la UI con los métodos del controlador"""
         # Botones del formulario
@@ -28,9 +47,18 @@ class ControladorEventos:
         self.ui.show_all_button.config(command=self.mostrar_todos_eventos)
         self.ui.view_details_button.config(command=self.ver_detalles_evento)
         self.ui.delete_event_button.config(command=self.eliminar_evento)
+        self.ui.change_status_button.config(command=self.cambiar_estado_seleccion)
+        self.ui.status_combo.config(values=ESTADOS_EVENTO)
+        
+        # Paginación de la tabla
+        self.ui.prev_page_button.config(command=self.pagina_anterior)
+        self.ui.next_page_button.config(command=self.pagina_siguiente)
+        self.ui.page_size_combo.bind("<<ComboboxSelected>>", lambda _: self.refrescar_eventos(desde_inicio=True))
+        self.ui.continuous_check.config(command=lambda: self.refrescar_eventos(desde_inicio=True))
         
         # Botón de estadísticas
-        self.ui.update_stats_button.config(command=self.actualizar_estadisticas)
+        self.ui.update_stats_button.config(
+            command=lambda: self.actualizar_estadisticas(historico=True))
     
     def cargar_datos_iniciales(self):
         """Carga datos iniciales en la UI"""
@@ -53,8 +81,6 @@ class ControladorEventos:
             if evento:
                 messagebox.showinfo("Éxito", f"Evento '{evento.nombre}' creado exitosamente!")
                 self.limpiar_formulario()
-                self.mostrar_todos_eventos()
-                self.actualizar_estadisticas()
             else:
                 messagebox.showerror("Error", "No se pudo crear el evento. Verifique los datos.")
                 
@@ -139,9 +165,199 @@ class ControladorEventos:
         self.ui.clear_form_fields()
     
     def mostrar_todos_eventos(self):
-        """Muestra todos los eventos en la tabla"""
-        eventos = self.gestor.obtener_todos_para_ui()
-        self.ui.display_events(eventos)
+        """Muestra la primera página de todos los eventos en la tabla"""
+        self._resultados_busqueda = None
+        self._mostrar_pagina(None, False)
+    
+    def pagina_siguiente(self):
+        """Muestra la página siguiente de la tabla"""
+        if self._pagina and self._pagina['siguiente'] is not None:
+            self._mostrar_pagina(self._pagina['siguiente'], False)
+    
+    def pagina_anterior(self):
+        """Muestra la página anterior de la tabla"""
+        if self._pagina and self._pagina['anterior'] is not None:
+            self._mostrar_pagina(self._pagina['anterior'], True)
+    
+    def refrescar_eventos(self, desde_inicio: bool = False):
+        """Vuelve a pedir la página actual (o la primera) tras un cambio"""
+        if not desde_inicio and self.ui.is_continuous() and self.ui.virtual_table.active:
+            # Se mantiene la posición de desplazamiento y solo se repiden las filas visibles
+            self.ui.virtual_table.refresh(self._total_filas())
+        elif desde_inicio:
+            self._mostrar_pagina(None, False)
+        else:
+            self._mostrar_pagina(*self._peticion_pagina)
+    
+    def _total_filas(self) -> int:
+        if self._resultados_busqueda is None:
+            return self.gestor.contar_eventos()
+        return len(self._resultados_busqueda)
+    
+    def _filas(self, desde: int, hasta: int) -> list:
+        """Origen de filas de la tabla con desplazamiento continuo"""
+        if self._resultados_busqueda is None:
+            return self.gestor.obtener_filas(desde, hasta)
+        return [evento.to_dict() for evento in self._resultados_busqueda[desde:hasta]]
+    
+    def _mostrar_pagina(self, cursor, hacia_atras: bool):
+        """Pide una página al gestor (o a los resultados de búsqueda) y la muestra"""
+        if self.ui.is_continuous():
+            # Sin páginas: la tabla pide las filas a medida que se desplaza
+            self._pagina = None
+            self.ui.display_virtual(self._total_filas(), self._filas)
+            return
+        tamano = self.ui.get_page_size()
+        if self._resultados_busqueda is None:
+            pagina = self.gestor.obtener_pagina(cursor, tamano, hacia_atras)
+        else:
+            pagina = self._pagina_de_busqueda(cursor, tamano, hacia_atras)
+        self._peticion_pagina = (cursor, hacia_atras)
+        self._pagina = pagina
+        self._filas_pagina = [evento['id'] for evento in pagina['eventos']]
+        self.ui.display_events(pagina['eventos'])
+        self._actualizar_controles_pagina()
+    
+    def _actualizar_controles_pagina(self):
+        pagina = self._pagina
+        self.ui.update_page_controls(pagina['posicion'], len(self._filas_pagina), pagina['total'],
+                                     pagina['anterior'] is not None,
+                                     pagina['siguiente'] is not None)
+    
+    def _al_cambiar_eventos(self, cambios: list):
+        """
+        Aplica a la tabla una tanda de cambios publicada por el gestor
+        
+        Un alta, cambio o baja suelto se traduce en la inserción,
+        actualización o borrado de su fila si cae en la página mostrada. En
+        las tandas (operaciones por lotes) el gestor ya aplicó todos los
+        cambios: si no alteran el orden se actualizan las filas en su sitio y
+        si no se repide la página, con coste proporcional a su tamaño. Las
+        estadísticas se leen de los agregados que el gestor mantiene al día.
+        """
+        if self.ui.is_continuous() and self.ui.virtual_table.active:
+            # Las bajas (y los cambios de ID) dejan de estar seleccionados
+            self.ui.virtual_table.discard(evento_id for operacion, evento_id, evento in cambios
+                                          if evento is None or evento.id != evento_id)
+            self.ui.virtual_table.refresh(self._total_filas())
+        elif self._resultados_busqueda is not None:
+            self._aplicar_cambios_busqueda(cambios)
+        elif self._pagina is None:
+            self.refrescar_eventos()
+        else:
+            if len(cambios) == 1:
+                self._aplicar_cambio_pagina(*cambios[0])
+                self._completar_pagina()
+            elif not self._actualizar_filas_en_sitio(cambios):
+                self.refrescar_eventos()
+            if self._filas_pagina or not self.gestor.contar_eventos():
+                self._actualizar_controles_pagina()
+            else:
+                # Se borró la página entera: se pide la que ocupa su lugar (o la última)
+                self.refrescar_eventos()
+                if not self._filas_pagina:
+                    self._mostrar_pagina(None, True)
+        self.actualizar_estadisticas()
+    
+    def _actualizar_filas_en_sitio(self, cambios: list) -> bool:
+        """
+        Actualiza las filas visibles de una tanda de cambios que no altera el
+        orden de la página (p. ej. un cambio de estado); False si no es el caso
+        """
+        if any(operacion != 'cambio' or evento.id != evento_id
+               for operacion, evento_id, evento in cambios):
+            return False
+        inicio = self._pagina['posicion']
+        filas = self.gestor.obtener_filas(inicio, inicio + len(self._filas_pagina))
+        if [fila['id'] for fila in filas] != self._filas_pagina:
+            return False
+        cambiados = {evento_id for _, evento_id, _ in cambios}
+        for fila in filas:
+            if fila['id'] in cambiados:
+                self.ui.update_event_row(fila)
+        return True
+    
+    def _aplicar_cambio_pagina(self, operacion: str, evento_id: str, evento):
+        """Aplica un cambio a la página mostrada de todos los eventos"""
+        filas = self._filas_pagina
+        if evento_id in filas:
+            filas.remove(evento_id)
+            if operacion == 'cambio' and evento.id == evento_id:
+                self.ui.update_event_row(evento.to_dict())
+            else:
+                self.ui.delete_event_row(evento_id)
+        
+        total = self.gestor.contar_eventos()
+        # La página se sitúa por su primera fila: las altas y bajas anteriores la desplazan
+        inicio = self.gestor.cursor_evento(filas[0])[2] if filas else self._pagina['posicion']
+        if operacion != 'baja':
+            cursor = self.gestor.cursor_evento(evento.id)
+            indice = cursor[2] - inicio
+            cabe = 0 <= indice < len(filas) or (
+                indice == len(filas) and (inicio + len(filas) == total - 1 or not filas)
+                and len(filas) < self.ui.get_page_size())
+            if cabe:
+                filas.insert(indice, evento.id)
+                if self.ui.events_tree.exists(evento.id):
+                    self.ui.update_event_row(evento.to_dict(), indice)
+                else:
+                    self.ui.insert_event_row(indice, evento.to_dict())
+                if len(filas) > self.ui.get_page_size():
+                    self.ui.delete_event_row(filas.pop())
+            elif self.ui.events_tree.exists(evento.id):
+                self.ui.delete_event_row(evento.id)
+            if indice < 0 and not filas:
+                inicio += 1
+        
+        self._pagina['posicion'] = inicio
+        self._pagina['total'] = total
+        self._pagina['anterior'] = (self.gestor.cursor_evento(filas[0])
+                                    if filas and inicio > 0 else None)
+        self._pagina['siguiente'] = (self.gestor.cursor_evento(filas[-1])
+                                     if filas and inicio + len(filas) < total else None)
+    
+    def _completar_pagina(self):
+        """Tras las bajas, rellena la página con las filas que la siguen"""
+        filas = self._filas_pagina
+        inicio, total = self._pagina['posicion'], self._pagina['total']
+        faltan = self.ui.get_page_size() - len(filas)
+        if not filas or faltan <= 0 or inicio + len(filas) >= total:
+            return
+        for evento in self.gestor.obtener_filas(inicio + len(filas), inicio + len(filas) + faltan):
+            self.ui.insert_event_row(len(filas), evento)
+            filas.append(evento['id'])
+        self._pagina['siguiente'] = (self.gestor.cursor_evento(filas[-1])
+                                     if inicio + len(filas) < total else None)
+    
+    def _aplicar_cambios_busqueda(self, cambios: list):
+        """Aplica cambios a los resultados de búsqueda: las altas no se añaden"""
+        bajas = {evento_id for operacion, evento_id, _ in cambios if operacion == 'baja'}
+        if bajas:
+            self._resultados_busqueda = [evento for evento in self._resultados_busqueda
+                                         if evento.id not in bajas]
+            self._mostrar_pagina(*self._peticion_pagina)
+        for operacion, evento_id, evento in cambios:
+            if operacion == 'cambio' and evento_id in self._filas_pagina:
+                if evento.id == evento_id:
+                    self.ui.update_event_row(evento.to_dict())
+                else:
+                    self._mostrar_pagina(*self._peticion_pagina)
+    
+    def _pagina_de_busqueda(self, cursor, tamano: int, hacia_atras: bool) -> dict:
+        """Página de los resultados de búsqueda; aquí el cursor es una posición"""
+        resultados = self._resultados_busqueda
+        if cursor is None:
+            inicio = max(len(resultados) - tamano, 0) if hacia_atras else 0
+        else:
+            inicio = max(cursor - tamano, 0) if hacia_atras else cursor
+        fin = min(inicio + tamano, len(resultados))
+        return {
+            'eventos': [evento.to_dict() for evento in resultados[inicio:fin]],
+            'posicion': inicio,
+            'total': len(resultados),
+            'anterior': inicio if inicio > 0 else None,
+            'siguiente': fin if fin < len(resultados) else None
+        }
     
     def buscar_eventos(self):
         """Busca eventos según el criterio en la barra de búsqueda"""
@@ -151,38 +367,29 @@ class ControladorEventos:
             self.mostrar_todos_eventos()
             return
         
-        # Buscar por nombre, tipo o ubicación
-        eventos_encontrados = []
-        eventos_encontrados.extend(self.gestor.buscar_por_nombre(criterio))
-        eventos_encontrados.extend(self.gestor.buscar_por_tipo(criterio))
-        
-        # Convertir a formato para UI
-        eventos_ui = [e.to_dict() for e in eventos_encontrados]
+        # Buscar en nombre, tipo, ubicación y descripción
+        eventos_encontrados = self.gestor.buscar_texto(criterio)
         
-        if eventos_ui:
-            self.ui.display_events(eventos_ui)
+        if eventos_encontrados:
+            # Solo se convierte a formato para UI la página visible
+            self._resultados_busqueda = eventos_encontrados
+            self._mostrar_pagina(None, False)
         else:
             messagebox.showinfo("Búsqueda", "No se encontraron eventos con ese criterio")
             self.mostrar_todos_eventos()
     
     def ver_detalles_evento(self):
         """Muestra los detalles del evento seleccionado"""
-        seleccion = self.ui.events_tree.selection()
+        seleccion = self.ui.get_selected_event_ids()
         
         if not seleccion:
             messagebox.showwarning("Selección requerida", 
                                   "Por favor, seleccione un evento de la lista")
             return
         
-        # Obtener el evento seleccionado
-        item = self.ui.events_tree.item(seleccion[0])
-        nombre_evento = item['values'][0]
-        
-        # Buscar el evento
-        eventos = self.gestor.buscar_por_nombre(nombre_evento)
-        if eventos:
-            evento = eventos[0]  # Tomar el primero encontrado
-            
+        # Las filas se identifican por el ID del evento
+        evento = self.gestor.buscar_por_id(seleccion[0])
+        if evento:
             # Crear ventana de detalles
             from tkinter import Toplevel, Label, Frame, Text, Button
             import tkinter.font as tkFont
@@ -241,45 +448,60 @@ class ControladorEventos:
                    padx=20, pady=5).pack(pady=20)
     
     def eliminar_evento(self):
-        """Elimina el evento seleccionado"""
-        seleccion = self.ui.events_tree.selection()
-        
-        if not seleccion:
-            messagebox.showwarning("Selección requerida",
-                                  "Por favor, seleccione un evento de la lista")
-            return
-        
-        # Obtener el evento seleccionado
-        item = self.ui.events_tree.item(seleccion[0])
-        nombre_evento = item['values'][0]
-        
-        # Buscar el evento
-        eventos = self.gestor.buscar_por_nombre(nombre_evento)
+        """Elimina los eventos seleccionados"""
+        eventos = self._eventos_seleccionados()
         if not eventos:
-            messagebox.showerror("Error", "Evento no encontrado")
             return
         
-        evento = eventos[0]
-        
         # Confirmar eliminación
-        confirmacion = messagebox.askyesno(
-            "Confirmar eliminación",
-            f"¿Está seguro de que desea eliminar el evento '{evento.nombre}'?"
-        )
+        if len(eventos) == 1:
+            pregunta = f"¿Está seguro de que desea eliminar el evento '{eventos[0].nombre}'?"
+        else:
+            pregunta = f"¿Está seguro de que desea eliminar los {len(eventos)} eventos seleccionados?"
+        confirmacion = messagebox.askyesno("Confirmar eliminación", pregunta)
         
         if confirmacion:
-            if self.gestor.eliminar_evento(evento.id):
+            # Una sola baja por lotes: una escritura y un aviso a la tabla
+            eliminados = self.gestor.eliminar_eventos([evento.id for evento in eventos])
+            if eliminados == 1:
                 messagebox.showinfo("Eliminado", 
-                                  f"Evento '{evento.nombre}' eliminado exitosamente")
-                self.mostrar_todos_eventos()
-                self.actualizar_estadisticas()
+                                  f"Evento '{eventos[0].nombre}' eliminado exitosamente")
+            elif eliminados:
+                messagebox.showinfo("Eliminado", f"{eliminados} eventos eliminados exitosamente")
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el evento")
     
-    def actualizar_estadisticas(self):
-        """Actualiza las estadísticas mostradas en la UI"""
+    def cambiar_estado_seleccion(self):
+        """Aplica el estado elegido a todos los eventos seleccionados"""
+        estado = self.ui.status_var.get()
+        if not estado:
+            messagebox.showwarning("Estado requerido", "Por favor, elija el nuevo estado")
+            return
+        eventos = self._eventos_seleccionados()
+        if not eventos:
+            return
+        cambiados = self.gestor.cambiar_estado_eventos([evento.id for evento in eventos], estado)
+        messagebox.showinfo("Estado actualizado",
+                            f"{cambiados} eventos cambiados a '{estado}'")
+    
+    def _eventos_seleccionados(self) -> list:
+        """Eventos seleccionados en la tabla; avisa si no hay ninguno"""
+        seleccion = self.ui.get_selected_event_ids()
+        eventos = [evento for evento in map(self.gestor.buscar_por_id, seleccion) if evento]
+        if not seleccion:
+            messagebox.showwarning("Selección requerida",
+                                  "Por favor, seleccione un evento de la lista")
+        elif not eventos:
+            messagebox.showerror("Error", "Evento no encontrado")
+        return eventos
+    
+    def actualizar_estadisticas(self, historico: bool = False):
+        """
+        Actualiza las estadísticas mostradas en la UI (con historico=True
+        carga antes las temporadas antiguas que aún no estén en memoria)
+        """
         try:
-            stats = self.gestor.obtener_estadisticas()
+            stats = self.gestor.obtener_estadisticas(historico)
             
             # Preparar datos para la UI
             datos_stats = {
@@ -287,7 +509,8 @@ class ControladorEventos:
                 'upcoming_events': str(stats['eventos_proximos']),
                 'total_capacity': f"{stats['capacidad_total']:,}",
                 'most_common_type': stats['tipo_mas_comun'],
-                'type_distribution': stats['tipos_eventos']
+                'type_distribution': stats['tipos_eventos'],
+                'unloaded_seasons': stats['temporadas_sin_cargar']
             }
             
             # Actualizar UI
@@ -1,13 +1,73 @@
 # events.py
 import json
-import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Tuple, Any, TYPE_CHECKING
+import math
 import re
+import sys
+from itertools import islice
+
+from indices import CursorTemporal, EstadisticasEventos, IndiceIntervalos, IndiceTexto
+
+if TYPE_CHECKING:
+    from almacenamiento import Almacenamiento
+    from binario import VistaEventos
+    from consultas import Acceso, Consulta, Predicado
+
+# Origen de la representación interna de tiempos (minutos desde la época)
+EPOCA = datetime(1970, 1, 1)
+
+
+def a_minutos(momento: datetime) -> int:
+    """Convierte un datetime en minutos enteros desde EPOCA"""
+    return (momento - EPOCA) // timedelta(minutes=1)
+
+
+def desde_minutos(minutos: int) -> datetime:
+    """Convierte minutos desde EPOCA en un datetime"""
+    return EPOCA + timedelta(minutes=minutos)
+
+
+def _internar(valor: Any) -> Any:
+    """Interna cadenas repetidas para que todos los eventos compartan el mismo objeto"""
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+def _campo_internado(nombre: str, doc: str) -> property:
+    """Crea una propiedad cuyo valor se guarda internado en el slot `_<nombre>`"""
+    slot = f"_{nombre}"
+    
+    def obtener(self):
+        return getattr(self, slot)
+    
+    def asignar(self, valor):
+        setattr(self, slot, _internar(valor))
+    
+    return property(obtener, asignar, doc=doc)
+
 
 class Evento:
     """Clase que representa un evento en el Camp Nou"""
     
+    # Sin __dict__ por instancia: con 100.000 eventos cargados desde JSON el
+    # coste baja de ~920 a ~505 bytes por evento (medido con tracemalloc).
+    __slots__ = (
+        'nombre', '_fecha', '_hora', '_duracion', 'minuto_inicio', 'minuto_fin',
+        '_tipo', '_ubicacion', 'descripcion', 'capacidad', '_estado',
+        'precio_base', '_organizador', 'id', 'fecha_creacion', 'serie_id'
+    )
+    
+    # Campos categóricos: se repiten los mismos pocos valores en cada evento
+    tipo = _campo_internado('tipo', "Tipo de evento")
+    ubicacion = _campo_internado('ubicacion', "Ubicación dentro del Camp Nou")
+    estado = _campo_internado('estado', "Estado del evento")
+    organizador = _campo_internado('organizador', "Organizador del evento")
+    
+    TASA_OCUPACION = 0.8  # Suponemos 80% de ocupación
+    
+    # Conversión de los campos numéricos, como en __init__
+    CONVERSIONES = {'duracion': float, 'capacidad': int, 'precio_base': float}
+    
     def __init__(self, **kwargs):
         """
         Inicializa un nuevo evento
@@ -26,9 +86,10 @@ class Evento:
             organizador (str): Organizador del evento (opcional)
         """
         self.nombre = kwargs.get('nombre', '')
-        self.fecha = kwargs.get('fecha', '')
-        self.hora = kwargs.get('hora', '')
-        self.duracion = float(kwargs.get('duracion', 2.0))
+        self._fecha = _internar(kwargs.get('fecha', ''))
+        self._hora = _internar(kwargs.get('hora', ''))
+        self._duracion = float(kwargs.get('duracion', 2.0))
+        self._recalcular_tiempos()
         self.tipo = kwargs.get('tipo', 'Partido')
         self.ubicacion = kwargs.get('ubicacion', 'Tribuna Principal')
         self.descripcion = kwargs.get('descripcion', '')
@@ -37,9 +98,40 @@ class Evento:
         self.precio_base = float(kwargs.get('precio_base', 0.0))
         self.organizador = kwargs.get('organizador', 'FC Barcelona')
         
-        # Generar ID único
-        self.id = self._generar_id()
-        self.fecha_creacion = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        # Conservar el ID y la fecha de creación al recargar desde disco
+        self.id = kwargs.get('id') or self._generar_id()
+        self.fecha_creacion = (kwargs.get('fecha_creacion') or
+                               datetime.now().strftime("%d/%m/%Y %H:%M:%S"))
+        # ID de la SerieEventos si el evento es una ocurrencia calculada
+        self.serie_id = None
+    
+    @classmethod
+    def desde_campos(cls, id: str, nombre: str, fecha: str, hora: str, duracion: float,
+                     minuto_inicio: Optional[int], minuto_fin: Optional[int], tipo: str,
+                     ubicacion: str, descripcion: str, capacidad: int, estado: str,
+                     precio_base: float, organizador: str, fecha_creacion: str) -> 'Evento':
+        """
+        Crea un Evento con campos ya validados, sin conversiones ni interpretar
+        fecha y hora: para cargadores que guardan también los minutos
+        """
+        evento = cls.__new__(cls)
+        evento.id = id
+        evento.nombre = nombre
+        evento._fecha = fecha
+        evento._hora = hora
+        evento._duracion = duracion
+        evento.minuto_inicio = minuto_inicio
+        evento.minuto_fin = minuto_fin
+        evento._tipo = tipo
+        evento._ubicacion = ubicacion
+        evento.descripcion = descripcion
+        evento.capacidad = capacidad
+        evento._estado = estado
+        evento.precio_base = precio_base
+        evento._organizador = organizador
+        evento.fecha_creacion = fecha_creacion
+        evento.serie_id = None
+        return evento
     
     def _generar_id(self) -> str:
         """Genera un ID único para el evento"""
@@ -47,61 +139,94 @@ class Evento:
         fecha_limpia = self.fecha.replace('/', '')
         return f"{nombre_limpio}_{fecha_limpia}_{self.hora.replace(':', '')}"
     
+    @property
+    def fecha(self) -> str:
+        """Fecha en formato DD/MM/AAAA"""
+        return self._fecha
+    
+    @fecha.setter
+    def fecha(self, valor: str):
+        self._fecha = _internar(valor)
+        self._recalcular_tiempos()
+    
+    @property
+    def hora(self) -> str:
+        """Hora en formato HH:MM"""
+        return self._hora
+    
+    @hora.setter
+    def hora(self, valor: str):
+        self._hora = _internar(valor)
+        self._recalcular_tiempos()
+    
+    @property
+    def duracion(self) -> float:
+        """Duración en horas"""
+        return self._duracion
+    
+    @duracion.setter
+    def duracion(self, valor: float):
+        self._duracion = float(valor)
+        self._recalcular_tiempos()
+    
+    def _recalcular_tiempos(self):
+        """Interpreta fecha, hora y duración una sola vez como minutos desde EPOCA"""
+        try:
+            inicio = datetime.strptime(f"{self._fecha} {self._hora}", "%d/%m/%Y %H:%M")
+        except (TypeError, ValueError):
+            self.minuto_inicio = None
+            self.minuto_fin = None
+            return
+        self.minuto_inicio = a_minutos(inicio)
+        self.minuto_fin = self.minuto_inicio + round(self._duracion * 60)
+    
     @property
     def hora_fin(self) -> str:
         """Calcula la hora de finalización del evento"""
-        try:
-            hora_inicio = datetime.strptime(self.hora, "%H:%M")
-            hora_fin = hora_inicio + timedelta(hours=self.duracion)
-            return hora_fin.strftime("%H:%M")
-        except:
+        if self.minuto_fin is None:
             return ""
+        return desde_minutos(self.minuto_fin).strftime("%H:%M")
     
     @property
     def fecha_hora_inicio(self) -> Optional[datetime]:
         """Devuelve la fecha y hora de inicio como objeto datetime"""
-        try:
-            return datetime.strptime(f"{self.fecha} {self.hora}", "%d/%m/%Y %H:%M")
-        except:
+        if self.minuto_inicio is None:
             return None
+        return desde_minutos(self.minuto_inicio)
     
     @property
     def fecha_hora_fin(self) -> Optional[datetime]:
         """Devuelve la fecha y hora de fin como objeto datetime"""
-        try:
-            inicio = self.fecha_hora_inicio
-            if inicio:
-                return inicio + timedelta(hours=self.duracion)
-        except:
+        if self.minuto_fin is None:
             return None
-        return None
+        return desde_minutos(self.minuto_fin)
+    
+    def es_proximo_a(self, ahora: int) -> bool:
+        """Verifica si el evento empieza en las 48 horas siguientes al minuto `ahora`"""
+        if self.minuto_inicio is None:
+            return False
+        return 0 < self.minuto_inicio - ahora <= 48 * 60
+    
+    def es_del_dia(self, dia: int) -> bool:
+        """Verifica si el evento empieza en el día que comienza en el minuto `dia`"""
+        if self.minuto_inicio is None:
+            return False
+        return dia <= self.minuto_inicio < dia + 24 * 60
     
     @property
     def es_proximo(self) -> bool:
         """Verifica si el evento está próximo (en las próximas 48 horas)"""
-        try:
-            inicio = self.fecha_hora_inicio
-            if inicio:
-                ahora = datetime.now()
-                diferencia = inicio - ahora
-                return timedelta(hours=0) < diferencia <= timedelta(hours=48)
-        except:
-            return False
-        return False
+        return self.es_proximo_a(a_minutos(datetime.now()))
     
     @property
     def es_hoy(self) -> bool:
         """Verifica si el evento es hoy"""
-        try:
-            hoy = datetime.now().strftime("%d/%m/%Y")
-            return self.fecha == hoy
-        except:
-            return False
+        hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.es_del_dia(a_minutos(hoy))
     
     def cambiar_estado(self, nuevo_estado: str):
         """Cambia el estado del evento"""
-        estados_validos = ['programado', 'en_curso', 'finalizado', 'cancelado']
-        if nuevo_estado in estados_validos:
+        if nuevo_estado in ESTADOS_EVENTO:
             self.estado = nuevo_estado
             return True
         return False
@@ -115,8 +240,7 @@ class Evento:
     
     def obtener_ingresos_estimados(self) -> float:
         """Calcula los ingresos estimados del evento"""
-        tasa_ocupacion = 0.8  # Suponemos 80% de ocupación
-        return self.capacidad * tasa_ocupacion * self.precio_base
+        return self.capacidad * self.TASA_OCUPACION * self.precio_base
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el evento a diccionario para JSON"""
@@ -148,37 +272,324 @@ class Evento:
         return f"<Evento {self.id}: {self.nombre}>"
 
 
+class SerieEventos:
+    """Evento recurrente guardado como un único registro
+    
+    Las ocurrencias no se almacenan: se calculan bajo demanda dentro del
+    rango consultado a partir de la fecha inicial, la frecuencia y las
+    excepciones.
+    """
+    
+    # Días entre semanas o días consecutivos de cada frecuencia
+    FRECUENCIAS = {'diaria': 1, 'semanal': 7}
+    
+    def __init__(self, frecuencia: str = 'diaria', intervalo: int = 1,
+                 dias_semana: Optional[Iterable[int]] = None, fecha_fin: Optional[str] = None,
+                 repeticiones: Optional[int] = None, excepciones: Iterable[str] = (),
+                 **datos):
+        """
+        Inicializa una serie de eventos
+        
+        Args:
+            frecuencia (str): 'diaria' o 'semanal'
+            intervalo (int): Cada cuántos días o semanas se repite
+            dias_semana (list): Días de la semana (0 = lunes) en series semanales;
+                por defecto, el de la fecha inicial
+            fecha_fin (str): Última fecha posible en formato DD/MM/AAAA (opcional)
+            repeticiones (int): Número máximo de ocurrencias (opcional)
+            excepciones (list): Fechas DD/MM/AAAA en las que no hay ocurrencia
+            **datos: Campos del evento, como en Evento; `fecha` es la primera fecha
+        """
+        if frecuencia not in self.FRECUENCIAS:
+            raise ValueError(f"Frecuencia no válida: {frecuencia}")
+        self.plantilla = Evento(**datos)
+        if self.plantilla.minuto_inicio is None:
+            raise ValueError("La serie necesita fecha y hora de inicio válidas")
+        self.id = datos.get('id') or f"serie_{self.plantilla.id}"
+        self.frecuencia = frecuencia
+        self.intervalo = max(int(intervalo), 1)
+        self.fecha_fin = fecha_fin
+        self.repeticiones = int(repeticiones) if repeticiones else None
+        
+        # Todo se calcula en días desde EPOCA y minutos dentro del día
+        self._dia_inicial, self._minuto_del_dia = divmod(self.plantilla.minuto_inicio, 24 * 60)
+        self.duracion_minutos = self.plantilla.minuto_fin - self.plantilla.minuto_inicio
+        if frecuencia == 'semanal':
+            dias = dias_semana if dias_semana else [self._dia_semana(self._dia_inicial)]
+            self.dias_semana = sorted({int(dia) % 7 for dia in dias})
+        else:
+            self.dias_semana = []
+        self.excepciones = set()
+        self._dias_excluidos = set()
+        for fecha in excepciones:
+            self.agregar_excepcion(fecha)
+        self._ultimo_dia = self._calcular_ultimo_dia()
+    
+    @property
+    def periodo(self) -> int:
+        """Días tras los que el patrón de la serie se repite"""
+        return self.FRECUENCIAS[self.frecuencia] * self.intervalo
+    
+    @property
+    def es_infinita(self) -> bool:
+        """Indica si la serie no tiene fecha de fin ni número de repeticiones"""
+        return self._ultimo_dia is None
+    
+    @property
+    def primer_inicio(self) -> int:
+        """Minuto de inicio de la primera ocurrencia posible"""
+        return self.plantilla.minuto_inicio
+    
+    @property
+    def ultimo_dia(self) -> Optional[int]:
+        """Último día (desde EPOCA) con ocurrencia posible, o None si es infinita"""
+        return self._ultimo_dia
+    
+    def agregar_excepcion(self, fecha: str):
+        """Anula la ocurrencia de `fecha` (DD/MM/AAAA)"""
+        dia = a_minutos(datetime.strptime(fecha, "%d/%m/%Y")) // (24 * 60)
+        self.excepciones.add(fecha)
+        self._dias_excluidos.add(dia)
+    
+    def inicios(self, desde: int, hasta: Optional[int] = None) -> Iterator[int]:
+        """Minutos de inicio de las ocurrencias en [desde, hasta), en orden"""
+        dia = max((desde - self._minuto_del_dia) // (24 * 60), self._dia_inicial)
+        for dia in self._dias(dia):
+            inicio = dia * 24 * 60 + self._minuto_del_dia
+            if inicio < desde:
+                continue
+            if hasta is not None and inicio >= hasta:
+                return
+            yield inicio
+    
+    def solapados(self, inicio: int, fin: int) -> Iterator[int]:
+        """Inicios de las ocurrencias que se solapan con [inicio, fin)"""
+        return self.inicios(inicio - self.duracion_minutos + 1, fin)
+    
+    def materializar(self, inicio: int) -> Evento:
+        """Construye el Evento de la ocurrencia que empieza en `inicio`"""
+        momento = desde_minutos(inicio)
+        datos = self.plantilla.to_dict()
+        datos['fecha'] = momento.strftime("%d/%m/%Y")
+        datos['hora'] = momento.strftime("%H:%M")
+        datos['id'] = f"{self.id}_{momento.strftime('%d%m%Y')}"
+        evento = Evento(**datos)
+        evento.serie_id = self.id
+        return evento
+    
+    def ocurrencias(self, desde: int, hasta: int) -> Iterator[Evento]:
+        """Eventos de las ocurrencias que empiezan en [desde, hasta)"""
+        return (self.materializar(inicio) for inicio in self.inicios(desde, hasta))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la serie a diccionario para JSON"""
+        datos = self.plantilla.to_dict()
+        datos.update({
+            'id': self.id,
+            'frecuencia': self.frecuencia,
+            'intervalo': self.intervalo,
+            'dias_semana': self.dias_semana,
+            'fecha_fin': self.fecha_fin,
+            'repeticiones': self.repeticiones,
+            'excepciones': sorted(self.excepciones)
+        })
+        return datos
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SerieEventos':
+        """Crea una SerieEventos desde un diccionario"""
+        return cls(**data)
+    
+    @staticmethod
+    def _dia_semana(dia: int) -> int:
+        """Día de la semana (0 = lunes) de un día contado desde EPOCA (jueves)"""
+        return (dia + 3) % 7
+    
+    def _dias(self, desde_dia: int) -> Iterator[int]:
+        """Días con ocurrencia a partir de `desde_dia`, sin excepciones"""
+        for dia in self._dias_patron(desde_dia):
+            if self._ultimo_dia is not None and dia > self._ultimo_dia:
+                return
+            if dia not in self._dias_excluidos:
+                yield dia
+    
+    def _dias_patron(self, desde_dia: int) -> Iterator[int]:
+        """Días que marca la frecuencia a partir de `desde_dia`, excepciones incluidas"""
+        desde_dia = max(desde_dia, self._dia_inicial)
+        if self.frecuencia == 'diaria':
+            pasos = -(-(desde_dia - self._dia_inicial) // self.intervalo)
+            dia = self._dia_inicial + pasos * self.intervalo
+            while True:
+                yield dia
+                dia += self.intervalo
+        
+        lunes_inicial = self._dia_inicial - self._dia_semana(self._dia_inicial)
+        semana = (desde_dia - lunes_inicial) // 7
+        semana += -semana % self.intervalo
+        while True:
+            lunes = lunes_inicial + semana * 7
+            for dia_semana in self.dias_semana:
+                dia = lunes + dia_semana
+                if dia >= desde_dia:
+                    yield dia
+            semana += self.intervalo
+    
+    def _calcular_ultimo_dia(self) -> Optional[int]:
+        ultimo = None
+        if self.fecha_fin:
+            ultimo = a_minutos(datetime.strptime(self.fecha_fin, "%d/%m/%Y")) // (24 * 60)
+        if self.repeticiones:
+            # Como en RRULE, las excepciones cuentan para el número de repeticiones
+            for numero, dia in enumerate(self._dias_patron(self._dia_inicial), 1):
+                if (ultimo is not None and dia > ultimo) or numero == self.repeticiones:
+                    ultimo = dia if ultimo is None else min(ultimo, dia)
+                    break
+        return ultimo
+    
+    def __str__(self) -> str:
+        return f"{self.plantilla.nombre} - serie {self.frecuencia} desde {self.plantilla.fecha}"
+    
+    def __repr__(self) -> str:
+        return f"<SerieEventos {self.id}: {self.plantilla.nombre}>"
+
+
 class GestorEventos:
     """Clase que gestiona todos los eventos del Camp Nou"""
     
-    def __init__(self, archivo_datos: str = "events_data.json"):
-        self.archivo_datos = archivo_datos
-        self.eventos: List[Evento] = []
+    # Campos con índice hash para búsquedas y filtros
+    CAMPOS_INDEXADOS = ('tipo', 'estado', 'fecha', 'ubicacion')
+    
+    # Campos de la búsqueda de texto y su peso al ordenar resultados
+    CAMPOS_TEXTO = (('nombre', 4), ('tipo', 3), ('ubicacion', 2), ('descripcion', 1))
+    
+    # Columnas de exportar_a_csv / importar_desde_csv: (encabezado, atributo)
+    COLUMNAS_CSV = (
+        ('ID', 'id'), ('Nombre', 'nombre'), ('Fecha', 'fecha'), ('Hora', 'hora'),
+        ('Duración', 'duracion'), ('Tipo', 'tipo'), ('Ubicación', 'ubicacion'),
+        ('Capacidad', 'capacidad'), ('Estado', 'estado'), ('Precio Base', 'precio_base'),
+        ('Organizador', 'organizador'), ('Fecha Creación', 'fecha_creacion'),
+        ('Descripción', 'descripcion')
+    )
+    
+    def __init__(self, archivo_datos: str = "events_data.json",
+                 almacenamiento: Optional['Almacenamiento'] = None,
+                 reloj: Callable[[], datetime] = datetime.now):
+        """
+        Args:
+            archivo_datos (str): Archivo JSON de eventos (almacenamiento por defecto)
+            almacenamiento (Almacenamiento): Backend de persistencia alternativo,
+                p. ej. AlmacenamientoDiario o AlmacenamientoSQLite
+            reloj (callable): Devuelve la hora actual; se lee una vez por consulta
+        """
+        from almacenamiento import AlmacenamientoJSON
+        
+        self.almacenamiento = almacenamiento or AlmacenamientoJSON(archivo_datos)
+        self.archivo_datos = self.almacenamiento.ruta
+        self._eventos: Dict[str, Evento] = {}
+        self._series: Dict[str, SerieEventos] = {}
+        self._indice_horario = IndiceIntervalos()
+        # Eventos sin fecha u hora válidas: no están en los índices horarios
+        self._sin_horario: Dict[str, Evento] = {}
+        self.reloj = reloj
+        self._cursor_proximos = CursorTemporal(self._indice_horario)
+        self._cursor_hoy = CursorTemporal(self._indice_horario)
+        # Particiones para los conflictos: una por ubicación y los exclusivos
+        self.tipos_exclusivos = set(TIPOS_EXCLUSIVOS)
+        self._indices_por_ubicacion: Dict[str, IndiceIntervalos] = {}
+        self._indice_exclusivos = IndiceIntervalos()
+        # Índices hash por campo filtrable: valor -> {id: evento}
+        self._indices: Dict[str, Dict[Any, Dict[str, Evento]]] = {
+            campo: {} for campo in self.CAMPOS_INDEXADOS
+        }
+        self._estadisticas = EstadisticasEventos()
+        self._indice_texto = IndiceTexto([peso for _, peso in self.CAMPOS_TEXTO])
+        # Funciones avisadas de cada tanda de cambios (ver suscribir)
+        self._oyentes: List[Callable[[List[tuple]], None]] = []
         self.cargar_eventos()
     
+    @property
+    def eventos(self) -> List[Evento]:
+        """Lista de todos los eventos en orden de alta"""
+        return list(self._eventos.values())
+    
     def cargar_eventos(self) -> bool:
-        """Carga los eventos desde el archivo JSON"""
+        """Carga los eventos desde el almacenamiento"""
         try:
-            if os.path.exists(self.archivo_datos):
-                with open(self.archivo_datos, 'r', encoding='utf-8') as f:
-                    datos = json.load(f)
-                    self.eventos = [Evento.from_dict(evento) for evento in datos]
-                print(f"✓ Cargados {len(self.eventos)} eventos desde {self.archivo_datos}")
-                return True
+            self._eventos = {}
+            if self.almacenamiento.existe():
+                for evento in self.almacenamiento.cargar_eventos():
+                    self._asignar_id_unico(evento)
+                    self._eventos[evento.id] = evento
+                print(f"✓ Cargados {len(self._eventos)} eventos desde {self.archivo_datos}")
             else:
                 print(f"⚠ Archivo {self.archivo_datos} no encontrado. Se creará uno nuevo.")
-                return True
+            self._series = {}
+            for serie in (SerieEventos.from_dict(dato) for dato in self.almacenamiento.cargar_series()):
+                self._series[serie.id] = serie
+            self._reconstruir_indices()
+            return True
         except Exception as e:
             print(f"✗ Error al cargar eventos: {e}")
             return False
     
     def guardar_eventos(self) -> bool:
-        """Guarda los eventos en el archivo JSON"""
+        """Guarda todos los eventos en el almacenamiento"""
         try:
-            datos = [evento.to_dict() for evento in self.eventos]
-            with open(self.archivo_datos, 'w', encoding='utf-8') as f:
-                json.dump(datos, f, ensure_ascii=False, indent=2)
-            print(f"✓ Guardados {len(self.eventos)} eventos en {self.archivo_datos}")
+            self.almacenamiento.guardar(self._eventos.values())
+            print(f"✓ Guardados {len(self._eventos)} eventos en {self.archivo_datos}")
+            return True
+        except Exception as e:
+            print(f"✗ Error al guardar eventos: {e}")
+            return False
+    
+    def cerrar(self) -> bool:
+        """Libera los recursos del almacenamiento (False si quedaron cambios sin guardar)"""
+        try:
+            self.almacenamiento.cerrar()
+            return True
+        except Exception as e:
+            print(f"✗ Error al guardar eventos: {e}")
+            return False
+    
+    def suscribir(self, oyente: Callable[[List[tuple]], None]):
+        """
+        Avisa a `oyente` de cada tanda de cambios en los eventos
+        
+        Recibe una lista de tuplas (operacion, evento_id, evento), las mismas
+        que van al almacenamiento: 'alta' y 'cambio' con el evento ya
+        modificado ('cambio' lleva el ID que tenía antes del cambio) y 'baja'
+        con evento None. Una operación por lotes llega como una sola tanda.
+        """
+        self._oyentes.append(oyente)
+    
+    def cancelar_suscripcion(self, oyente: Callable[[List[tuple]], None]):
+        """Deja de avisar a `oyente`"""
+        if oyente in self._oyentes:
+            self._oyentes.remove(oyente)
+    
+    def _publicar(self, cambios: List[tuple]):
+        """Avisa a los oyentes de una tanda de cambios"""
+        if not cambios:
+            return
+        for oyente in list(self._oyentes):
+            try:
+                oyente(cambios)
+            except Exception as e:
+                print(f"✗ Error al notificar cambios: {e}")
+    
+    def _persistir(self, operacion: str, evento: Evento, evento_id: Optional[str] = None) -> bool:
+        """Persiste un cambio ('alta', 'cambio' o 'baja') en el almacenamiento y lo publica"""
+        cambio = (operacion, evento_id or evento.id, None if operacion == 'baja' else evento)
+        guardado = self._persistir_cambios([cambio])
+        self._publicar([cambio])
+        return guardado
+    
+    def _persistir_cambios(self, cambios: List[tuple]) -> bool:
+        """Persiste una tanda de cambios con una sola escritura"""
+        if not cambios:
+            return True
+        try:
+            self.almacenamiento.registrar_cambios(cambios, lambda: self._eventos.values())
             return True
         except Exception as e:
             print(f"✗ Error al guardar eventos: {e}")
@@ -191,8 +602,10 @@ class GestorEventos:
             print(f"✗ Conflicto de horario para el evento: {evento.nombre}")
             return False
         
-        self.eventos.append(evento)
-        self.guardar_eventos()
+        self._asignar_id_unico(evento)
+        self._eventos[evento.id] = evento
+        self._indexar(evento)
+        self._persistir('alta', evento)
         print(f"✓ Evento agregado: {evento.nombre}")
         return True
     
@@ -207,137 +620,908 @@ class GestorEventos:
             print(f"✗ Error al crear evento: {e}")
             return None
     
+    def crear_eventos_lote(self, filas: Iterable[Dict[str, Any]],
+                           persistir: bool = True) -> List[Dict[str, Any]]:
+        """
+        Crea varios eventos de una vez con una sola escritura al final
+        
+        Las filas se validan, se ordenan por inicio y se recorren una vez:
+        cada una se compara con los índices de eventos existentes y con el
+        fin más tardío de las filas ya aceptadas en su misma ubicación (o en
+        todo el estadio, si alguna de las dos es exclusiva). Si dos filas del
+        lote se solapan, se conserva la que empieza antes.
+        
+        Con persistir=False los eventos se añaden en memoria y queda en manos
+        del llamador guardarlos (p. ej. con guardar_eventos).
+        
+        Returns:
+            Un resultado por fila, en el orden de entrada, con las claves
+            'fila', 'evento' (Evento creado o None) y 'error' (str o None)
+        """
+        resultados = []
+        validos = []
+        for numero, datos in enumerate(filas):
+            resultado = {'fila': numero, 'evento': None, 'error': None}
+            resultados.append(resultado)
+            try:
+                evento = Evento(**datos)
+            except (TypeError, ValueError) as e:
+                resultado['error'] = f"Datos inválidos: {e}"
+                continue
+            error = self._validar_para_lote(evento)
+            if error:
+                resultado['error'] = error
+                continue
+            validos.append((evento, resultado))
+        
+        validos.sort(key=lambda par: par[0].minuto_inicio)
+        aceptados = []
+        # Fin más tardío de lo ya aceptado: en todo el lote, entre los
+        # exclusivos y en cada ubicación
+        fin_lote = fin_exclusivos = None
+        fin_por_ubicacion: Dict[str, int] = {}
+        for evento, resultado in validos:
+            inicio = evento.minuto_inicio
+            exclusivo = self.es_exclusivo(evento)
+            if exclusivo:
+                limites = (fin_lote,)
+            else:
+                limites = (fin_exclusivos, fin_por_ubicacion.get(evento.ubicacion))
+            if any(limite is not None and inicio < limite for limite in limites):
+                resultado['error'] = "Conflicto de horario con otra fila del lote"
+            elif self.verificar_conflicto_horario(evento):
+                resultado['error'] = "Conflicto de horario con un evento existente"
+            else:
+                resultado['evento'] = evento
+                aceptados.append(evento)
+                fin = evento.minuto_fin
+                fin_lote = fin if fin_lote is None else max(fin_lote, fin)
+                fin_ubicacion = fin_por_ubicacion.get(evento.ubicacion, fin)
+                fin_por_ubicacion[evento.ubicacion] = max(fin_ubicacion, fin)
+                if exclusivo:
+                    fin_exclusivos = fin if fin_exclusivos is None else max(fin_exclusivos, fin)
+        
+        for evento in aceptados:
+            self._asignar_id_unico(evento)
+            self._eventos[evento.id] = evento
+            self._indexar(evento)
+        cambios = [('alta', evento.id, evento) for evento in aceptados]
+        if persistir:
+            self._persistir_cambios(cambios)
+        self._publicar(cambios)
+        
+        print(f"✓ Lote procesado: {len(aceptados)} eventos creados, "
+              f"{len(resultados) - len(aceptados)} rechazados")
+        return resultados
+    
+    @staticmethod
+    def _validar_para_lote(evento: Evento) -> Optional[str]:
+        """Devuelve el motivo por el que el evento no es importable, o None"""
+        if not evento.nombre:
+            return "El nombre del evento es obligatorio"
+        if evento.minuto_inicio is None:
+            return "La fecha y la hora deben tener el formato DD/MM/AAAA y HH:MM"
+        if evento.duracion <= 0:
+            return "La duración debe ser mayor a 0"
+        if evento.capacidad < 0:
+            return "La capacidad no puede ser negativa"
+        return None
+    
+    def crear_serie(self, **kwargs) -> Optional[SerieEventos]:
+        """
+        Crea una serie de eventos recurrentes (ver SerieEventos) si ninguna
+        de sus ocurrencias choca con eventos u otras series
+        """
+        try:
+            serie = SerieEventos(**kwargs)
+        except Exception as e:
+            print(f"✗ Error al crear serie: {e}")
+            return None
+        
+        conflicto = next(self._conflictos_serie(serie), None)
+        if conflicto is not None:
+            print(f"✗ Conflicto de horario para la serie {serie.plantilla.nombre} "
+                  f"con {conflicto}")
+            return None
+        
+        base = serie.id
+        sufijo = 2
+        while serie.id in self._series:
+            serie.id = f"{base}_{sufijo}"
+            sufijo += 1
+        self._series[serie.id] = serie
+        self._guardar_series()
+        print(f"✓ Serie agregada: {serie}")
+        return serie
+    
+    def eliminar_serie(self, serie_id: str) -> bool:
+        """Elimina una serie y con ella todas sus ocurrencias"""
+        serie = self._series.pop(serie_id, None)
+        if serie is None:
+            print(f"✗ Serie con ID {serie_id} no encontrada")
+            return False
+        self._guardar_series()
+        print(f"✓ Serie eliminada: {serie.plantilla.nombre}")
+        return True
+    
+    def excluir_ocurrencia(self, serie_id: str, fecha: str) -> bool:
+        """Anula la ocurrencia de una serie en `fecha` (DD/MM/AAAA)"""
+        serie = self._series.get(serie_id)
+        if serie is None:
+            return False
+        try:
+            serie.agregar_excepcion(fecha)
+        except ValueError:
+            return False
+        return self._guardar_series()
+    
+    def obtener_series(self) -> List[SerieEventos]:
+        """Obtiene todas las series de eventos recurrentes"""
+        return list(self._series.values())
+    
+    def _guardar_series(self) -> bool:
+        """Guarda todas las series (son pocas y se reescriben enteras)"""
+        try:
+            self.almacenamiento.guardar_series([serie.to_dict() for serie in self._series.values()])
+            return True
+        except Exception as e:
+            print(f"✗ Error al guardar series: {e}")
+            return False
+    
+    def _conflictos_serie(self, serie: SerieEventos) -> Iterator[Evento]:
+        """Eventos y ocurrencias de otras series que chocan con `serie`"""
+        plantilla = serie.plantilla
+        exclusivo = self.es_exclusivo(plantilla)
+        for inicio in serie.inicios(serie.primer_inicio, self._horizonte_conflictos(serie)):
+            yield from self._conflictos_intervalo(
+                inicio, inicio + serie.duracion_minutos, plantilla.ubicacion, exclusivo)
+    
+    def _horizonte_conflictos(self, serie: SerieEventos) -> Optional[int]:
+        """
+        Minuto a partir del cual una serie infinita ya no puede producir
+        choques nuevos (None si la serie es finita y basta recorrerla entera)
+        """
+        if not serie.es_infinita:
+            return None
+        exclusivo = self.es_exclusivo(serie.plantilla)
+        horizonte = serie.primer_inicio + 24 * 60
+        for indice in self._particiones_recurso(serie.plantilla.ubicacion, exclusivo):
+            cota = indice.cota_fin()
+            if cota is not None:
+                horizonte = max(horizonte, cota)
+        for otra in self._series_recurso(serie.plantilla.ubicacion, exclusivo):
+            if otra.es_infinita:
+                # Las dos series repiten su patrón conjunto cada mcm(periodos) días
+                # tras el arranque de ambas y la última excepción de cualquiera
+                excluidos = serie._dias_excluidos | otra._dias_excluidos
+                desde = max(serie.primer_inicio, otra.primer_inicio,
+                            (max(excluidos) + 1) * 24 * 60 if excluidos else 0)
+                ciclo = math.lcm(serie.periodo, otra.periodo) + 2
+                horizonte = max(horizonte, desde + ciclo * 24 * 60)
+            else:
+                horizonte = max(horizonte, (otra.ultimo_dia + 2) * 24 * 60)
+        return horizonte
+    
     def eliminar_evento(self, evento_id: str) -> bool:
         """Elimina un evento por su ID"""
-        evento = self.buscar_por_id(evento_id)
+        evento = self._eventos.pop(evento_id, None)
         if evento:
-            self.eventos.remove(evento)
-            self.guardar_eventos()
+            self._desindexar(evento)
+            self._persistir('baja', evento)
             print(f"✓ Evento eliminado: {evento.nombre}")
             return True
         print(f"✗ Evento con ID {evento_id} no encontrado")
         return False
     
+    def eliminar_eventos(self, evento_ids: Iterable[str]) -> int:
+        """
+        Elimina varios eventos por su ID con una sola escritura y un solo aviso
+        
+        Returns:
+            Número de eventos eliminados (los IDs que no existen se ignoran)
+        """
+        cambios = []
+        for evento_id in evento_ids:
+            evento = self._eventos.pop(evento_id, None)
+            if evento:
+                self._desindexar(evento)
+                cambios.append(('baja', evento_id, None))
+        self._persistir_cambios(cambios)
+        self._publicar(cambios)
+        print(f"✓ {len(cambios)} eventos eliminados")
+        return len(cambios)
+    
+    def cambiar_estado_eventos(self, evento_ids: Iterable[str], nuevo_estado: str) -> int:
+        """
+        Cambia el estado de varios eventos con una sola escritura y un solo aviso
+        
+        Returns:
+            Número de eventos cambiados (0 si el estado no es válido)
+        """
+        if nuevo_estado not in ESTADOS_EVENTO:
+            print(f"✗ Estado no válido: {nuevo_estado}")
+            return 0
+        indice = self._indices['estado']
+        cambios = []
+        for evento_id in evento_ids:
+            evento = self._eventos.get(evento_id)
+            if evento is None or evento.estado == nuevo_estado:
+                continue
+            # El estado solo figura en su índice hash y en las estadísticas
+            self._estadisticas.retirar(evento)
+            grupo = indice[evento.estado]
+            del grupo[evento_id]
+            if not grupo:
+                del indice[evento.estado]
+            evento.cambiar_estado(nuevo_estado)
+            indice.setdefault(nuevo_estado, {})[evento_id] = evento
+            self._estadisticas.registrar(evento)
+            cambios.append(('cambio', evento_id, evento))
+        self._persistir_cambios(cambios)
+        self._publicar(cambios)
+        print(f"✓ {len(cambios)} eventos cambiados a '{nuevo_estado}'")
+        return len(cambios)
+    
     def buscar_por_id(self, evento_id: str) -> Optional[Evento]:
         """Busca un evento por su ID"""
-        for evento in self.eventos:
-            if evento.id == evento_id:
-                return evento
-        return None
+        return self._eventos.get(evento_id)
     
     def buscar_por_nombre(self, nombre: str) -> List[Evento]:
-        """Busca eventos por nombre (búsqueda parcial)"""
-        nombre = nombre.lower()
-        return [e for e in self.eventos if nombre in e.nombre.lower()]
+        """
+        Busca eventos por nombre (búsqueda parcial, sin distinguir mayúsculas
+        ni tildes), de mayor a menor relevancia
+        
+        Como siempre, el texto se busca en cualquier parte del nombre ("ar"
+        encuentra "Barça"); con menos de tres caracteres no hay trigramas que
+        lo acoten y se recorren todos los nombres.
+        """
+        self.cargar_historico()
+        claves = self._indice_texto.buscar(nombre, campos=[0], subcadena=True)
+        return [self._eventos[clave] for clave in claves]
+    
+    def buscar_texto(self, consulta: str) -> List[Evento]:
+        """
+        Busca `consulta` en nombre, tipo, ubicación y descripción
+        
+        Sin distinguir mayúsculas ni tildes y en cualquier parte del texto,
+        como buscar_por_nombre. Devuelve cada evento una sola vez, primero
+        los que coinciden en los campos más relevantes.
+        """
+        self.cargar_historico()
+        claves = self._indice_texto.buscar(consulta, subcadena=True)
+        return [self._eventos[clave] for clave in claves]
     
     def buscar_por_tipo(self, tipo: str) -> List[Evento]:
         """Busca eventos por tipo"""
-        tipo = tipo.lower()
-        return [e for e in self.eventos if tipo == e.tipo.lower()]
+        self.cargar_historico()
+        return list(self._indices['tipo'].get(tipo.lower(), {}).values())
     
     def buscar_por_fecha(self, fecha: str) -> List[Evento]:
         """Busca eventos por fecha"""
-        return [e for e in self.eventos if e.fecha == fecha]
+        self._asegurar_fecha_cargada(fecha)
+        return list(self._indices['fecha'].get(fecha, {}).values())
     
     def buscar_por_estado(self, estado: str) -> List[Evento]:
         """Busca eventos por estado"""
-        return [e for e in self.eventos if e.estado == estado]
+        self.cargar_historico()
+        return list(self._indices['estado'].get(estado, {}).values())
+    
+    def buscar_por_ubicacion(self, ubicacion: str) -> List[Evento]:
+        """Busca eventos por ubicación (búsqueda parcial)"""
+        ubicacion = ubicacion.lower()
+        indice = self._indices['ubicacion']
+        return [evento
+                for clave, grupo in indice.items() if ubicacion in clave.lower()
+                for evento in grupo.values()]
     
     def obtener_eventos_proximos(self) -> List[Evento]:
         """Obtiene los eventos próximos (próximas 48 horas)"""
-        return [e for e in self.eventos if e.es_proximo]
+        desde, hasta = self._ventana_proximos()
+        return self._con_ocurrencias(self._cursor_proximos.valores(desde, hasta), desde, hasta)
+    
+    def _ventana_proximos(self):
+        """Rango [desde, hasta) de minutos de inicio de los eventos próximos"""
+        ahora = a_minutos(self.reloj())
+        return ahora + 1, ahora + 48 * 60 + 1
     
     def obtener_eventos_de_hoy(self) -> List[Evento]:
         """Obtiene los eventos de hoy"""
-        return [e for e in self.eventos if e.es_hoy]
+        hoy = self.reloj().replace(hour=0, minute=0, second=0, microsecond=0)
+        dia = a_minutos(hoy)
+        return self._con_ocurrencias(self._cursor_hoy.valores(dia, dia + 24 * 60),
+                                     dia, dia + 24 * 60)
     
     def obtener_eventos_por_mes(self, año: int, mes: int) -> List[Evento]:
         """Obtiene los eventos de un mes específico"""
-        eventos_mes = []
-        for evento in self.eventos:
-            try:
-                fecha_evento = datetime.strptime(evento.fecha, "%d/%m/%Y")
-                if fecha_evento.year == año and fecha_evento.month == mes:
-                    eventos_mes.append(evento)
-            except:
-                continue
-        return eventos_mes
+        desde = datetime(año, mes, 1)
+        hasta = datetime(año + 1, 1, 1) if mes == 12 else datetime(año, mes + 1, 1)
+        filas = self.almacenamiento.eventos_entre(a_minutos(desde), a_minutos(hasta))
+        if filas is None:
+            return self.obtener_eventos_en_rango(desde, hasta)
+        # El backend resuelve el rango; se reutilizan los eventos ya cargados
+        self._asegurar_filas_cargadas(filas)
+        eventos = (self._eventos.get(fila['id']) or Evento.from_dict(fila) for fila in filas)
+        return self._con_ocurrencias(eventos, a_minutos(desde), a_minutos(hasta))
+    
+    def obtener_eventos_por_semana(self, dia: date) -> List[Evento]:
+        """Obtiene los eventos de la semana (de lunes a domingo) que contiene `dia`"""
+        lunes = datetime(dia.year, dia.month, dia.day) - timedelta(days=dia.weekday())
+        return self.obtener_eventos_en_rango(lunes, lunes + timedelta(days=7))
+    
+    def obtener_eventos_por_dia(self, dia: date) -> List[Evento]:
+        """Obtiene los eventos que empiezan en `dia`"""
+        inicio = datetime(dia.year, dia.month, dia.day)
+        return self.obtener_eventos_en_rango(inicio, inicio + timedelta(days=1))
+    
+    def obtener_eventos_en_rango(self, desde: datetime, hasta: datetime) -> List[Evento]:
+        """
+        Obtiene, ordenados por inicio, los eventos que empiezan en [desde, hasta),
+        incluidas las ocurrencias de las series recurrentes
+        """
+        desde, hasta = a_minutos(desde), a_minutos(hasta)
+        self._asegurar_cargados(desde, hasta)
+        return self._con_ocurrencias(self._indice_horario.en_rango(desde, hasta), desde, hasta)
+    
+    def _con_ocurrencias(self, eventos: Iterable[Evento], desde: int, hasta: int) -> List[Evento]:
+        """Mezcla en orden de inicio `eventos` con las ocurrencias de [desde, hasta)"""
+        if not self._series:
+            return list(eventos)
+        import heapq
+        
+        ocurrencias = [serie.ocurrencias(desde, hasta) for serie in self._series.values()]
+        return list(heapq.merge(eventos, *ocurrencias, key=lambda evento: evento.minuto_inicio))
     
     def verificar_conflicto_horario(self, nuevo_evento: Evento) -> bool:
         """Verifica si hay conflictos de horario con eventos existentes"""
-        if not nuevo_evento.fecha_hora_inicio or not nuevo_evento.fecha_hora_fin:
-            return False
-        
-        for evento_existente in self.eventos:
-            if (evento_existente.fecha_hora_inicio and evento_existente.fecha_hora_fin and
-                nuevo_evento.fecha_hora_inicio < evento_existente.fecha_hora_fin and
-                nuevo_evento.fecha_hora_fin > evento_existente.fecha_hora_inicio):
-                return True
+        for _ in self.obtener_conflictos(nuevo_evento):
+            return True
         return False
     
-    def obtener_estadisticas(self) -> Dict[str, Any]:
-        """Genera estadísticas de los eventos"""
-        total_eventos = len(self.eventos)
-        eventos_programados = len(self.buscar_por_estado('programado'))
-        eventos_en_curso = len(self.buscar_por_estado('en_curso'))
-        eventos_finalizados = len(self.buscar_por_estado('finalizado'))
-        eventos_cancelados = len(self.buscar_por_estado('cancelado'))
+    def obtener_conflictos(self, nuevo_evento: Evento) -> Iterator[Evento]:
+        """
+        Devuelve los eventos existentes que chocan con `nuevo_evento`
         
-        # Conteo por tipo
-        tipos = {}
-        for evento in self.eventos:
-            tipos[evento.tipo] = tipos.get(evento.tipo, 0) + 1
+        Cada ubicación es un recurso independiente: solo chocan eventos
+        solapados en la misma ubicación. Los eventos exclusivos (partidos)
+        ocupan todo el estadio y chocan con cualquier evento solapado. Las
+        ocurrencias de las series recurrentes cuentan como eventos.
+        """
+        inicio = nuevo_evento.minuto_inicio
+        if inicio is None:
+            return
+        yield from self._conflictos_intervalo(
+            inicio, nuevo_evento.minuto_fin, nuevo_evento.ubicacion,
+            self.es_exclusivo(nuevo_evento), ignorar=nuevo_evento)
+    
+    def _conflictos_intervalo(self, inicio: int, fin: int, ubicacion: str, exclusivo: bool,
+                              ignorar: Optional[Evento] = None) -> Iterator[Evento]:
+        """Eventos y ocurrencias que ocupan el recurso en [inicio, fin)"""
+        self._asegurar_solapados(inicio, fin)
+        for indice in self._particiones_recurso(ubicacion, exclusivo):
+            for evento in indice.solapados(inicio, fin):
+                if evento is not ignorar:
+                    yield evento
+        serie_ignorada = ignorar.serie_id if ignorar is not None else None
+        for serie in self._series_recurso(ubicacion, exclusivo):
+            if serie.id != serie_ignorada:
+                for inicio_ocurrencia in serie.solapados(inicio, fin):
+                    yield serie.materializar(inicio_ocurrencia)
+    
+    def _particiones_recurso(self, ubicacion: str, exclusivo: bool) -> List[IndiceIntervalos]:
+        """Índices con los eventos que ocupan una ubicación (o todo el estadio)"""
+        if exclusivo:
+            return [self._indice_horario]
+        particiones = [self._indice_exclusivos]
+        if ubicacion in self._indices_por_ubicacion:
+            particiones.append(self._indices_por_ubicacion[ubicacion])
+        return particiones
+    
+    def _series_recurso(self, ubicacion: str, exclusivo: bool) -> List[SerieEventos]:
+        """Series cuyas ocurrencias ocupan una ubicación (o todo el estadio)"""
+        return [serie for serie in self._series.values()
+                if exclusivo or self.es_exclusivo(serie.plantilla)
+                or serie.plantilla.ubicacion == ubicacion]
+    
+    def buscar_huecos_libres(self, ubicacion: str, duracion: float, desde: datetime,
+                             cantidad: int = 5, tipo: Optional[str] = None,
+                             hasta: Optional[datetime] = None) -> List[datetime]:
+        """
+        Devuelve los `cantidad` primeros inicios libres a partir de `desde`
+        para un evento de `duracion` horas en `ubicacion`
         
-        # Tipo más común
-        tipo_mas_comun = max(tipos, key=tipos.get) if tipos else "N/A"
+        Recorre en orden los huecos entre los eventos que ocuparían ese
+        recurso (los de la ubicación y los exclusivos, o todos si `tipo` es
+        exclusivo), incluidas las ocurrencias de las series. Dentro de un
+        hueco largo propone inicios consecutivos.
         
-        # Capacidad total
-        capacidad_total = sum(evento.capacidad for evento in self.eventos)
+        El recorrido termina en `hasta` (el evento debe acabar antes) o, sin
+        él, en el horizonte a partir del cual las series infinitas solo
+        repiten huecos ya vistos; por eso puede devolver menos de `cantidad`.
+        """
+        import heapq
         
-        # Ingresos estimados totales
-        ingresos_totales = sum(evento.obtener_ingresos_estimados() 
-                              for evento in self.eventos)
+        minutos = round(float(duracion) * 60)
+        cursor = a_minutos(desde)
+        self._asegurar_solapados(cursor, sys.maxsize)
+        exclusivo = tipo in self.tipos_exclusivos
+        flujos = [indice.intervalos_desde(cursor)
+                  for indice in self._particiones_recurso(ubicacion, exclusivo)]
+        for serie in self._series_recurso(ubicacion, exclusivo):
+            flujos.append((inicio, inicio + serie.duracion_minutos, serie)
+                          for inicio in serie.solapados(cursor, sys.maxsize))
+        ocupados = heapq.merge(*flujos, key=lambda entrada: entrada[0])
+        limite = a_minutos(hasta) if hasta is not None else None
+        horizonte = limite if limite is not None else self._horizonte_huecos(
+            ubicacion, exclusivo, cursor)
         
-        # Próximos eventos
-        eventos_proximos = len(self.obtener_eventos_proximos())
+        huecos = []
+        agotado = True
+        for inicio, fin, _ in ocupados:
+            if limite is not None:
+                inicio = min(inicio, limite)
+            while len(huecos) < cantidad and inicio - cursor >= minutos:
+                huecos.append(cursor)
+                cursor += max(minutos, 1)
+            if len(huecos) >= cantidad:
+                break
+            cursor = max(cursor, fin)
+            if horizonte is not None and cursor >= horizonte:
+                agotado = False
+                break
+        # Tras el último evento todo está libre (hasta `hasta`, si se indicó)
+        while agotado and len(huecos) < cantidad and (limite is None or cursor + minutos <= limite):
+            huecos.append(cursor)
+            cursor += max(minutos, 1)
+        return [desde_minutos(hueco) for hueco in huecos]
+    
+    def _horizonte_huecos(self, ubicacion: str, exclusivo: bool, desde: int) -> Optional[int]:
+        """
+        Minuto a partir del cual los huecos del recurso se repiten con el
+        patrón de sus series infinitas (None si no tiene ninguna)
+        """
+        infinitas = [serie for serie in self._series_recurso(ubicacion, exclusivo)
+                     if serie.es_infinita]
+        if not infinitas:
+            return None
+        # Desde aquí ya no quedan eventos sueltos, series finitas ni excepciones
+        inicio = desde
+        for indice in self._particiones_recurso(ubicacion, exclusivo):
+            cota = indice.cota_fin()
+            if cota is not None:
+                inicio = max(inicio, cota)
+        ciclo = 1
+        for serie in self._series_recurso(ubicacion, exclusivo):
+            if serie.es_infinita:
+                ciclo = math.lcm(ciclo, serie.periodo)
+                inicio = max(inicio, serie.primer_inicio)
+                if serie._dias_excluidos:
+                    inicio = max(inicio, (max(serie._dias_excluidos) + 1) * 24 * 60)
+            else:
+                inicio = max(inicio, (serie.ultimo_dia + 2) * 24 * 60)
+        # Dos ciclos completos bastan para ver todos los huecos del patrón
+        return inicio + (2 * ciclo + 2) * 24 * 60
+    
+    def auditar_conflictos(self) -> Dict[str, List[Tuple[Evento, Evento]]]:
+        """
+        Busca todos los pares de eventos guardados que chocan entre sí,
+        agrupados por la ubicación donde se produce el choque
+        
+        Sirve para revisar datos editados a mano o cargados de versiones sin
+        control de conflictos. Barre los eventos en orden de inicio llevando
+        los que siguen abiertos, así que cuesta O(n log n + k) para k choques.
+        Cuando un evento exclusivo choca con uno normal, el choque se anota en
+        la ubicación del normal. Las series recurrentes no entran: sus
+        ocurrencias ya se validan al crearlas.
+        """
+        import heapq
+        
+        self.cargar_historico()
+        conflictos: Dict[str, List[Tuple[Evento, Evento]]] = {}
+        activos: Dict[str, Evento] = {}
+        activos_exclusivos: Dict[str, Evento] = {}
+        activos_por_ubicacion: Dict[str, Dict[str, Evento]] = {}
+        finales: List[Tuple[int, int, Evento]] = []
+        
+        for orden, (inicio, fin, evento) in enumerate(self._indice_horario):
+            while finales and finales[0][0] <= inicio:
+                _, _, terminado = heapq.heappop(finales)
+                del activos[terminado.id]
+                activos_exclusivos.pop(terminado.id, None)
+                activos_por_ubicacion[terminado.ubicacion].pop(terminado.id, None)
+            
+            en_ubicacion = activos_por_ubicacion.setdefault(evento.ubicacion, {})
+            if self.es_exclusivo(evento):
+                for anterior in activos.values():
+                    conflictos.setdefault(anterior.ubicacion, []).append((anterior, evento))
+                activos_exclusivos[evento.id] = evento
+            else:
+                if activos_exclusivos or en_ubicacion:
+                    pares = conflictos.setdefault(evento.ubicacion, [])
+                    for anterior in activos_exclusivos.values():
+                        pares.append((anterior, evento))
+                    for anterior in en_ubicacion.values():
+                        pares.append((anterior, evento))
+                en_ubicacion[evento.id] = evento
+            activos[evento.id] = evento
+            heapq.heappush(finales, (fin, orden, evento))
+        return conflictos
+    
+    def generar_informe_conflictos(self, archivo_salida: str = "informe_conflictos.txt") -> int:
+        """
+        Escribe el resultado de auditar_conflictos en un archivo de texto
+        
+        Returns:
+            int: Número de pares de eventos en conflicto
+        """
+        try:
+            conflictos = self.auditar_conflictos()
+            total = 0
+            with open(archivo_salida, 'w', encoding='utf-8') as f:
+                f.write(f"Auditoría de conflictos - {len(self._eventos)} eventos\n")
+                for ubicacion in sorted(conflictos):
+                    pares = conflictos[ubicacion]
+                    total += len(pares)
+                    f.write(f"\n{ubicacion} ({len(pares)} conflictos)\n")
+                    for anterior, evento in pares:
+                        f.write(f"  {anterior.id} {anterior.fecha} {anterior.hora}-{anterior.hora_fin}"
+                                f" <> {evento.id} {evento.fecha} {evento.hora}-{evento.hora_fin}\n")
+            print(f"✓ {total} conflictos en {len(conflictos)} ubicaciones; informe en {archivo_salida}")
+            return total
+        except Exception as e:
+            print(f"✗ Error al generar el informe de conflictos: {e}")
+            return -1
+    
+    def es_exclusivo(self, evento: Evento) -> bool:
+        """Indica si el evento ocupa todo el estadio"""
+        return evento.tipo in self.tipos_exclusivos
+    
+    def cargar_historico(self):
+        """Carga todo lo que el almacenamiento dejó sin cargar al arrancar"""
+        if self.almacenamiento.temporadas_sin_cargar():
+            self._asegurar_cargados(-sys.maxsize, sys.maxsize)
+    
+    def _asegurar_cargados(self, desde: int, hasta: int):
+        """
+        Trae a memoria los eventos guardados en [desde, hasta) que aún no lo
+        están (temporadas históricas de AlmacenamientoPorTemporadas)
+        """
+        cargados = []
+        for evento in self.almacenamiento.cargar_rango(desde, hasta):
+            self._asignar_id_unico(evento)
+            self._eventos[evento.id] = evento
+            self._indexar(evento)
+            cargados.append(('alta', evento.id, evento))
+        # Para quien muestra los eventos en memoria son altas, aunque no se guarden
+        self._publicar(cargados)
+    
+    def _asegurar_filas_cargadas(self, filas: List[Dict[str, Any]]):
+        """
+        Carga las temporadas de las filas que el almacenamiento devolvió sin
+        estar en memoria, para que se puedan editar o borrar por su id
+        """
+        for fila in filas:
+            if fila['id'] not in self._eventos:
+                self._asegurar_fecha_cargada(fila['fecha'])
+    
+    def _asegurar_solapados(self, desde: int, hasta: int):
+        """
+        Como _asegurar_cargados, pero incluye los eventos sin cargar que
+        empezaron antes de `desde` y siguen en curso
+        """
+        self._asegurar_cargados(desde - self.almacenamiento.duracion_maxima(), hasta)
+    
+    def _asegurar_fecha_cargada(self, fecha: str):
+        """Como _asegurar_cargados para el día `fecha` (DD/MM/AAAA)"""
+        try:
+            dia = a_minutos(datetime.strptime(fecha, "%d/%m/%Y"))
+        except (TypeError, ValueError):
+            return
+        self._asegurar_cargados(dia, dia + 24 * 60)
+    
+    def _asignar_id_unico(self, evento: Evento):
+        """Añade un sufijo al ID si ya existe otro evento con el mismo"""
+        if evento.id not in self._eventos:
+            return
+        base = evento.id
+        sufijo = 2
+        while f"{base}_{sufijo}" in self._eventos:
+            sufijo += 1
+        evento.id = f"{base}_{sufijo}"
+    
+    def _particiones(self, evento: Evento, crear: bool = False) -> List[IndiceIntervalos]:
+        """Índices de intervalos en los que figura el evento"""
+        particiones = [self._indice_horario]
+        if crear:
+            particiones.append(self._indices_por_ubicacion.setdefault(
+                evento.ubicacion, IndiceIntervalos()))
+        elif evento.ubicacion in self._indices_por_ubicacion:
+            particiones.append(self._indices_por_ubicacion[evento.ubicacion])
+        if self.es_exclusivo(evento):
+            particiones.append(self._indice_exclusivos)
+        return particiones
+    
+    def _textos_buscables(self, evento: Evento) -> List[str]:
+        """Textos del evento para el índice de búsqueda, en el orden de CAMPOS_TEXTO"""
+        return [getattr(evento, campo) or "" for campo, _ in self.CAMPOS_TEXTO]
+    
+    @staticmethod
+    def _clave_indice(evento: Evento, campo: str) -> Any:
+        """Valor con el que se indexa el evento en el índice de `campo`"""
+        valor = getattr(evento, campo)
+        return valor.lower() if campo == 'tipo' else valor
+    
+    def _indexar(self, evento: Evento):
+        """Registra el evento en el índice de horarios y en los índices hash"""
+        if evento.minuto_inicio is not None:
+            for indice in self._particiones(evento, crear=True):
+                indice.agregar(evento.minuto_inicio, evento.minuto_fin, evento)
+        else:
+            self._sin_horario[evento.id] = evento
+        self._estadisticas.registrar(evento)
+        self._indice_texto.agregar(evento.id, self._textos_buscables(evento))
+        for campo, indice in self._indices.items():
+            clave = self._clave_indice(evento, campo)
+            indice.setdefault(clave, {})[evento.id] = evento
+    
+    def _desindexar(self, evento: Evento):
+        """Retira el evento del índice de horarios y de los índices hash"""
+        if evento.minuto_inicio is not None:
+            for indice in self._particiones(evento):
+                indice.eliminar(evento.minuto_inicio, evento)
+        else:
+            self._sin_horario.pop(evento.id, None)
+        self._estadisticas.retirar(evento)
+        self._indice_texto.eliminar(evento.id)
+        for campo, indice in self._indices.items():
+            clave = self._clave_indice(evento, campo)
+            grupo = indice.get(clave)
+            if grupo is not None:
+                grupo.pop(evento.id, None)
+                if not grupo:
+                    del indice[clave]
+    
+    def _reconstruir_indices(self):
+        """Reconstruye todos los índices a partir de los eventos cargados"""
+        con_horario = [evento for evento in self._eventos.values()
+                       if evento.minuto_inicio is not None]
+        self._sin_horario = {evento.id: evento for evento in self._eventos.values()
+                             if evento.minuto_inicio is None}
+        self._indice_horario.reconstruir(
+            (evento.minuto_inicio, evento.minuto_fin, evento) for evento in con_horario
+        )
+        self._indice_exclusivos.reconstruir(
+            (evento.minuto_inicio, evento.minuto_fin, evento)
+            for evento in con_horario if self.es_exclusivo(evento)
+        )
+        por_ubicacion: Dict[str, list] = {}
+        for evento in con_horario:
+            por_ubicacion.setdefault(evento.ubicacion, []).append(
+                (evento.minuto_inicio, evento.minuto_fin, evento))
+        self._indices_por_ubicacion = {
+            ubicacion: IndiceIntervalos(entradas)
+            for ubicacion, entradas in por_ubicacion.items()
+        }
+        self._estadisticas.reiniciar()
+        self._indice_texto.vaciar()
+        for evento in self._eventos.values():
+            self._estadisticas.registrar(evento)
+            self._indice_texto.agregar(evento.id, self._textos_buscables(evento))
+        for campo, indice in self._indices.items():
+            indice.clear()
+            for evento in self._eventos.values():
+                clave = self._clave_indice(evento, campo)
+                indice.setdefault(clave, {})[evento.id] = evento
+    
+    def obtener_estadisticas(self, historico: bool = False) -> Dict[str, Any]:
+        """
+        Genera estadísticas de los eventos (en SQL si el almacenamiento sabe
+        calcularlas; si no, de los agregados en memoria)
+        
+        Los agregados en memoria solo cuentan las temporadas cargadas. Con
+        historico=True se cargan antes las que falten; si no, la clave
+        'temporadas_sin_cargar' lista las que quedan fuera.
+        """
+        desde, hasta = self._ventana_proximos()
+        ocurrencias = sum(1 for serie in self._series.values() for _ in serie.inicios(desde, hasta))
+        calculadas = self.almacenamiento.estadisticas(desde, hasta)
+        if calculadas is not None:
+            # El backend cuenta también lo que no está cargado
+            calculadas['eventos_proximos'] += ocurrencias
+            calculadas['temporadas_sin_cargar'] = []
+            return calculadas
+        
+        if historico:
+            self.cargar_historico()
+        sin_cargar = self.almacenamiento.temporadas_sin_cargar()
+        estadisticas = self._estadisticas
+        eventos_proximos = self._cursor_proximos.contar(desde, hasta) + ocurrencias
         
         return {
-            'total_eventos': total_eventos,
-            'eventos_programados': eventos_programados,
-            'eventos_en_curso': eventos_en_curso,
-            'eventos_finalizados': eventos_finalizados,
-            'eventos_cancelados': eventos_cancelados,
-            'tipos_eventos': tipos,
-            'tipo_mas_comun': tipo_mas_comun,
-            'capacidad_total': capacidad_total,
-            'ingresos_totales': ingresos_totales,
-            'eventos_proximos': eventos_proximos
+            'total_eventos': estadisticas.total,
+            'eventos_programados': estadisticas.por_estado.get('programado', 0),
+            'eventos_en_curso': estadisticas.por_estado.get('en_curso', 0),
+            'eventos_finalizados': estadisticas.por_estado.get('finalizado', 0),
+            'eventos_cancelados': estadisticas.por_estado.get('cancelado', 0),
+            'tipos_eventos': dict(estadisticas.por_tipo),
+            'tipo_mas_comun': estadisticas.tipo_mas_comun(),
+            'capacidad_total': estadisticas.capacidad_total,
+            'ingresos_totales': estadisticas.ingresos_totales,
+            'eventos_proximos': eventos_proximos,
+            'temporadas_sin_cargar': sin_cargar
         }
     
     def obtener_todos_para_ui(self) -> List[Dict[str, Any]]:
         """Obtiene todos los eventos en formato para la UI"""
-        return [evento.to_dict() for evento in self.eventos]
+        return [evento.to_dict() for evento in self._eventos.values()]
+    
+    def obtener_pagina(self, cursor: Optional[Tuple[Optional[int], str, int]] = None,
+                       tamano: int = 50, hacia_atras: bool = False) -> Dict[str, Any]:
+        """
+        Obtiene una página de eventos en orden cronológico para la UI (los
+        eventos sin fecha válida van al final)
+        
+        Sin cursor devuelve la primera página (o la última con hacia_atras).
+        Con el cursor 'siguiente' de una página devuelve la que la sigue, y
+        con su cursor 'anterior' y hacia_atras=True, la que la precede. Los
+        cursores marcan un evento, no una posición, así que las altas y bajas
+        entre página y página no hacen saltar ni repetir filas. Solo se
+        convierten a diccionario los eventos de la página.
+        
+        Returns:
+            Diccionario con 'eventos' (lista de to_dict()), 'posicion' (índice
+            del primero), 'total', y los cursores 'anterior' y 'siguiente'
+            (None si no hay más páginas en ese sentido)
+        """
+        total = len(self._eventos)
+        tamano = max(int(tamano), 1)
+        if cursor is None:
+            inicio = max(total - tamano, 0) if hacia_atras else 0
+        elif hacia_atras:
+            inicio = max(self._posicion_cronologica(cursor, tras=False) - tamano, 0)
+        else:
+            inicio = self._posicion_cronologica(cursor, tras=True)
+        fin = min(inicio + tamano, total)
+        eventos = list(self._cronologicos(inicio, fin))
+        return {
+            'eventos': [evento.to_dict() for evento in eventos],
+            'posicion': inicio,
+            'total': total,
+            'anterior': self._cursor_de(eventos[0], inicio) if eventos and inicio > 0 else None,
+            'siguiente': self._cursor_de(eventos[-1], fin - 1) if eventos and fin < total else None
+        }
+    
+    def obtener_filas(self, desde: int, hasta: int) -> List[Dict[str, Any]]:
+        """
+        Eventos de las posiciones [desde, hasta) en el orden de obtener_pagina,
+        en formato para la UI. Sirve de origen de filas a la tabla con
+        desplazamiento continuo, que solo pide las que muestra.
+        """
+        return [evento.to_dict() for evento in self._cronologicos(max(desde, 0), hasta)]
+    
+    def contar_eventos(self) -> int:
+        """Número de eventos cargados"""
+        return len(self._eventos)
+    
+    def cursor_evento(self, evento_id: str) -> Optional[Tuple[Optional[int], str, int]]:
+        """
+        Cursor de obtener_pagina que señala al evento, o None si no existe;
+        su último elemento es la posición del evento en orden cronológico
+        """
+        evento = self._eventos.get(evento_id)
+        if evento is None:
+            return None
+        posicion = self._posicion_cronologica(self._cursor_de(evento, 0), tras=False)
+        return self._cursor_de(evento, posicion)
+    
+    @staticmethod
+    def _cursor_de(evento: Evento, posicion: int) -> Tuple[Optional[int], str, int]:
+        return (evento.minuto_inicio, evento.id, posicion)
+    
+    def _posicion_cronologica(self, cursor: Tuple[Optional[int], str, int], tras: bool) -> int:
+        """Posición en orden cronológico del evento del cursor (o la siguiente, con tras)"""
+        inicio, evento_id, posicion_previa = cursor
+        con_horario = len(self._indice_horario)
+        if inicio is None:
+            if evento_id in self._sin_horario:
+                return con_horario + list(self._sin_horario).index(evento_id) + tras
+            primera, ultima = con_horario, len(self._eventos)
+        else:
+            evento = self._eventos.get(evento_id)
+            posicion = self._indice_horario.posicion_de(inicio, evento) if evento else None
+            if posicion is not None:
+                return posicion + tras
+            primera = self._indice_horario.posicion(inicio)
+            ultima = self._indice_horario.posicion_tras(inicio)
+        # El evento del cursor ya no está: entre los que empiezan a la misma
+        # hora, se toma la posición que tenía
+        return min(max(posicion_previa, primera), ultima)
+    
+    def _cronologicos(self, desde: int, hasta: int) -> Iterator[Evento]:
+        """Eventos de las posiciones [desde, hasta) en orden cronológico"""
+        con_horario = len(self._indice_horario)
+        yield from self._indice_horario.entre_posiciones(min(desde, con_horario),
+                                                         min(hasta, con_horario))
+        if hasta > con_horario:
+            yield from islice(self._sin_horario.values(),
+                              max(desde - con_horario, 0), hasta - con_horario)
     
     def filtrar_eventos(self, criterio: str, valor: str) -> List[Dict[str, Any]]:
-        """Filtra eventos según criterio"""
-        eventos_filtrados = []
-        
-        criterio = criterio.lower()
-        valor = valor.lower()
-        
-        for evento in self.eventos:
-            if criterio == 'nombre' and valor in evento.nombre.lower():
-                eventos_filtrados.append(evento.to_dict())
-            elif criterio == 'tipo' and valor == evento.tipo.lower():
-                eventos_filtrados.append(evento.to_dict())
-            elif criterio == 'fecha' and valor == evento.fecha:
-                eventos_filtrados.append(evento.to_dict())
-            elif criterio == 'ubicacion' and valor in evento.ubicacion.lower():
-                eventos_filtrados.append(evento.to_dict())
-            elif criterio == 'estado' and valor == evento.estado:
-                eventos_filtrados.append(evento.to_dict())
-        
-        return eventos_filtrados
+        """Filtra eventos según criterio (en SQL si el almacenamiento sabe hacerlo)"""
+        filas = self.almacenamiento.filtrar(criterio, valor)
+        if filas is not None:
+            self._asegurar_filas_cargadas(filas)
+            return filas
+        return [evento.to_dict() for evento in self._filtrar(criterio, valor)]
+    
+    def _filtrar(self, criterio: str, valor: str) -> List[Evento]:
+        """Eventos que cumplen un criterio de filtrar_eventos"""
+        from consultas import Contiene, Igual
+        
+        predicados = {
+            'nombre': lambda: Contiene('nombre', valor),
+            'tipo': lambda: Igual('tipo', valor),
+            'fecha': lambda: Igual('fecha', valor),
+            'ubicacion': lambda: Contiene('ubicacion', valor),
+            'estado': lambda: Igual('estado', valor.lower()),
+        }
+        predicado = predicados.get(criterio.lower())
+        if predicado is None:
+            return []
+        self.cargar_historico()
+        return self.consultar(predicado()).lista()
+    
+    def consultar(self, predicado: Optional['Predicado'] = None) -> 'Consulta':
+        """
+        Crea una consulta sobre los eventos (ver consultas.py)
+        
+        Ejemplo:
+            gestor.consultar(Igual('tipo', 'Concierto') & Rango('capacidad', desde=5000))
+                  .ordenar_por('fecha').limite(10).filas()
+        """
+        from consultas import Consulta
+        return Consulta(self, predicado)
+    
+    # Accesos por índice que usa el plan de consultas.Consulta
+    
+    def _acceso_total(self) -> 'Acceso':
+        from consultas import Acceso
+        return Acceso(len(self._eventos), lambda: iter(self._eventos.values()), "recorrido completo")
+    
+    def _acceso_igual(self, campo: str, valor: Any) -> Optional['Acceso']:
+        from consultas import Acceso
+        if campo == 'id':
+            evento = self._eventos.get(valor)
+            return Acceso(int(evento is not None), lambda: iter((evento,) if evento else ()),
+                          "búsqueda por id")
+        if campo not in self._indices:
+            return None
+        if campo == 'fecha':
+            self._asegurar_fecha_cargada(valor)
+        grupo = self._indices[campo].get(valor, {})
+        return Acceso(len(grupo), lambda: iter(grupo.values()), f"índice de {campo}")
+    
+    def _acceso_texto(self, campo: str, texto: str) -> Optional['Acceso']:
+        from consultas import Acceso
+        posiciones = [campo_texto for campo_texto, _ in self.CAMPOS_TEXTO]
+        if campo not in posiciones:
+            return None
+        claves = self._indice_texto.candidatos(texto)
+        if claves is None:
+            return None
+        return Acceso(len(claves), lambda: (self._eventos[clave] for clave in claves),
+                      "índice de texto")
+    
+    def _acceso_rango(self, campo: str, desde: Any, hasta: Any) -> Optional['Acceso']:
+        from consultas import Acceso
+        if campo != 'fecha':
+            return None
+        desde = -sys.maxsize if desde is None else desde
+        hasta = sys.maxsize if hasta is None else hasta
+        self._asegurar_cargados(desde, hasta)
+        indice = self._indice_horario
+        primera, ultima = indice.posicion(desde), indice.posicion(hasta)
+        return Acceso(max(ultima - primera, 0), lambda: indice.entre_posiciones(primera, ultima),
+                      "índice horario")
     
     def actualizar_evento(self, evento_id: str, **kwargs) -> bool:
         """Actualiza un evento existente"""
@@ -345,44 +1529,217 @@ class GestorEventos:
         if not evento:
             return False
         
-        # Actualizar solo los campos proporcionados
-        for key, value in kwargs.items():
-            if hasattr(evento, key):
+        # Actualizar solo los campos proporcionados, convertidos antes de
+        # tocar los índices para que un valor inválido no deje nada a medias
+        cambios = {key: value for key, value in kwargs.items() if hasattr(evento, key)}
+        try:
+            for key, convertir in Evento.CONVERSIONES.items():
+                if key in cambios:
+                    cambios[key] = convertir(cambios[key])
+        except (TypeError, ValueError) as e:
+            print(f"✗ Error al actualizar evento: {e}")
+            return False
+        anteriores = {key: getattr(evento, key) for key in cambios}
+        self._desindexar(evento)
+        try:
+            for key, value in cambios.items():
                 setattr(evento, key, value)
+            if evento.id != evento_id:
+                del self._eventos[evento_id]
+                self._asignar_id_unico(evento)
+                self._eventos[evento.id] = evento
+            self._indexar(evento)
+        except Exception as e:
+            self._deshacer_actualizacion(evento, evento_id, anteriores)
+            print(f"✗ Error al actualizar evento: {e}")
+            return False
         
-        self.guardar_eventos()
+        self._persistir('cambio', evento, evento_id)
         print(f"✓ Evento actualizado: {evento.nombre}")
         return True
     
-    def exportar_a_csv(self, archivo_salida: str = "eventos_exportados.csv") -> bool:
-        """Exporta todos los eventos a un archivo CSV"""
+    def _deshacer_actualizacion(self, evento: Evento, evento_id: str,
+                                anteriores: Dict[str, Any]):
+        """
+        Devuelve el evento a sus valores `anteriores` y con su ID original
+        
+        El fallo pudo dejar el evento a medio indexar, así que se
+        reconstruyen los índices: es O(n), pero solo en este caso de error.
+        """
+        if self._eventos.get(evento.id) is evento and evento.id != evento_id:
+            del self._eventos[evento.id]
+        for key, value in anteriores.items():
+            setattr(evento, key, value)
+        evento.id = evento_id
+        self._eventos[evento_id] = evento
+        self._reconstruir_indices()
+    
+    def exportar_a_csv(self, archivo_salida: str = "eventos_exportados.csv",
+                       criterio: Optional[str] = None, valor: str = "",
+                       desde: Optional[datetime] = None, hasta: Optional[datetime] = None,
+                       tamano_bloque: int = 1000) -> bool:
+        """
+        Exporta eventos a un archivo CSV
+        
+        Args:
+            archivo_salida (str): Archivo destino; si termina en .gz se comprime con gzip
+            criterio (str): Criterio de filtrar_eventos (nombre, tipo, fecha, ubicacion, estado)
+            valor (str): Valor buscado para el criterio
+            desde (datetime): Exportar solo eventos que empiezan a partir de este momento
+            hasta (datetime): Exportar solo eventos que empiezan antes de este momento
+            tamano_bloque (int): Filas que se escriben de cada vez
+        """
         try:
             import csv
             
-            with open(archivo_salida, 'w', newline='', encoding='utf-8') as f:
+            eventos = self._seleccionar_para_exportar(criterio, valor, desde, hasta)
+            filas = ([getattr(evento, campo) for _, campo in self.COLUMNAS_CSV]
+                     for evento in eventos)
+            exportados = 0
+            with self._abrir_csv(archivo_salida, 'w') as f:
                 writer = csv.writer(f)
                 # Escribir encabezados
-                writer.writerow([
-                    'ID', 'Nombre', 'Fecha', 'Hora', 'Duración', 'Tipo',
-                    'Ubicación', 'Capacidad', 'Estado', 'Precio Base',
-                    'Organizador', 'Fecha Creación'
-                ])
+                writer.writerow([encabezado for encabezado, _ in self.COLUMNAS_CSV])
                 
-                # Escribir datos
-                for evento in self.eventos:
-                    writer.writerow([
-                        evento.id, evento.nombre, evento.fecha, evento.hora,
-                        evento.duracion, evento.tipo, evento.ubicacion,
-                        evento.capacidad, evento.estado, evento.precio_base,
-                        evento.organizador, evento.fecha_creacion
-                    ])
+                # Escribir datos por bloques desde el generador
+                while True:
+                    bloque = list(islice(filas, tamano_bloque))
+                    if not bloque:
+                        break
+                    writer.writerows(bloque)
+                    exportados += len(bloque)
             
-            print(f"✓ Eventos exportados a {archivo_salida}")
+            print(f"✓ {exportados} eventos exportados a {archivo_salida}")
             return True
             
         except Exception as e:
             print(f"✗ Error al exportar a CSV: {e}")
             return False
+    
+    def importar_desde_csv(self, archivo_entrada: str,
+                           tamano_lote: int = 1000) -> Optional[Dict[str, Any]]:
+        """
+        Importa eventos desde un CSV con las columnas de exportar_a_csv
+        
+        El archivo se lee en streaming y cada lote pasa por crear_eventos_lote;
+        los eventos se guardan una sola vez al terminar.
+        
+        Returns:
+            Diccionario con 'creados', 'rechazados' y 'errores' (lista de
+            (número de fila, motivo)), o None si no se pudo leer el archivo
+        """
+        try:
+            import csv
+            
+            campos = dict(self.COLUMNAS_CSV)
+            resumen = {'creados': 0, 'rechazados': 0, 'errores': []}
+            with self._abrir_csv(archivo_entrada, 'r') as f:
+                filas = ({campos[encabezado]: valor
+                          for encabezado, valor in fila.items() if encabezado in campos}
+                         for fila in csv.DictReader(f))
+                primera_fila = 0
+                while True:
+                    lote = list(islice(filas, tamano_lote))
+                    if not lote:
+                        break
+                    for resultado in self.crear_eventos_lote(lote, persistir=False):
+                        if resultado['evento']:
+                            resumen['creados'] += 1
+                        else:
+                            resumen['rechazados'] += 1
+                            resumen['errores'].append(
+                                (primera_fila + resultado['fila'] + 1, resultado['error']))
+                    primera_fila += len(lote)
+            
+            if resumen['creados']:
+                self.guardar_eventos()
+            print(f"✓ Importados {resumen['creados']} eventos desde {archivo_entrada} "
+                  f"({resumen['rechazados']} rechazados)")
+            return resumen
+            
+        except Exception as e:
+            print(f"✗ Error al importar desde CSV: {e}")
+            return None
+    
+    @staticmethod
+    def abrir_archivo_binario(ruta: str) -> 'VistaEventos':
+        """
+        Abre una instantánea binaria (ver AlmacenamientoBinario) para consultas
+        de solo lectura sin cargar sus eventos en memoria
+        
+        Útil para analizar archivos históricos grandes; hay que cerrarla al
+        terminar (o usarla con `with`).
+        """
+        from binario import VistaEventos
+        return VistaEventos(ruta)
+    
+    def exportar_a_json(self, archivo_salida: str = "eventos_exportados.json") -> bool:
+        """Exporta todos los eventos en el formato JSON de events_data.json"""
+        try:
+            self.cargar_historico()
+            datos = [evento.to_dict() for evento in self._eventos.values()]
+            with open(archivo_salida, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, ensure_ascii=False, indent=2)
+            print(f"✓ {len(datos)} eventos exportados a {archivo_salida}")
+            return True
+        except Exception as e:
+            print(f"✗ Error al exportar a JSON: {e}")
+            return False
+    
+    def importar_desde_json(self, archivo_entrada: str) -> Optional[Dict[str, Any]]:
+        """
+        Importa eventos desde un JSON con el formato de events_data.json
+        
+        Returns:
+            Diccionario con 'creados', 'rechazados' y 'errores', como
+            importar_desde_csv, o None si no se pudo leer el archivo
+        """
+        try:
+            with open(archivo_entrada, 'r', encoding='utf-8') as f:
+                filas = json.load(f)
+            resumen = {'creados': 0, 'rechazados': 0, 'errores': []}
+            for resultado in self.crear_eventos_lote(filas, persistir=False):
+                if resultado['evento']:
+                    resumen['creados'] += 1
+                else:
+                    resumen['rechazados'] += 1
+                    resumen['errores'].append((resultado['fila'] + 1, resultado['error']))
+            if resumen['creados']:
+                self.guardar_eventos()
+            print(f"✓ Importados {resumen['creados']} eventos desde {archivo_entrada} "
+                  f"({resumen['rechazados']} rechazados)")
+            return resumen
+        except Exception as e:
+            print(f"✗ Error al importar desde JSON: {e}")
+            return None
+    
+    def _seleccionar_para_exportar(self, criterio: Optional[str], valor: str,
+                                   desde: Optional[datetime],
+                                   hasta: Optional[datetime]) -> Iterable[Evento]:
+        """Generador con los eventos a exportar según criterio y rango de fechas"""
+        inicio = a_minutos(desde) if desde is not None else -sys.maxsize
+        fin = a_minutos(hasta) if hasta is not None else sys.maxsize
+        self._asegurar_cargados(inicio, fin)
+        if desde is None and hasta is None:
+            eventos = self._eventos.values()
+            if criterio:
+                eventos = self._filtrar(criterio, valor)
+            yield from eventos
+            return
+        
+        # Con rango de fechas se recorre el índice horario, ya ordenado por inicio
+        seleccion = {evento.id for evento in self._filtrar(criterio, valor)} if criterio else None
+        for evento in self._indice_horario.en_rango(inicio, fin):
+            if seleccion is None or evento.id in seleccion:
+                yield evento
+    
+    @staticmethod
+    def _abrir_csv(archivo: str, modo: str):
+        """Abre un CSV en modo texto, comprimido con gzip si termina en .gz"""
+        if archivo.endswith('.gz'):
+            import gzip
+            return gzip.open(archivo, modo + 't', newline='', encoding='utf-8')
+        return open(archivo, modo, newline='', encoding='utf-8')
 
 
 # Tipos de eventos predefinidos para el Camp Nou
@@ -399,6 +1756,16 @@ TIPOS_EVENTO = [
     "Otro"
 ]
 
+# Tipos de evento que ocupan todo el estadio: chocan con cualquier otro evento
+TIPOS_EXCLUSIVOS = [
+    "Partido de Liga",
+    "Partido de Champions",
+    "Partido de Copa"
+]
+
+# Estados por los que pasa un evento
+ESTADOS_EVENTO = ['programado', 'en_curso', 'finalizado', 'cancelado']
+
 # Ubicaciones disponibles en el Camp Nou
 UBICACIONES_CAMP_NOU = [
     "Tribuna Principal",
@@ -43,6 +43,7 @@ class AplicacionPrincipal:
     def cerrar_aplicacion(self):
         """Maneja el cierre de la aplicación"""
         audio_manager.audio_manager.stop() 
+        self.controlador.cerrar()
         self.root.destroy()
        
     
@@ -0,0 +1,926 @@
+# almacenamiento.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+import binario
+from Events import Evento, a_minutos, desde_minutos
+from indices import normalizar_texto
+
+# Cambio persistible: (operación, id afectado, evento o None en las bajas).
+# Las operaciones son 'alta', 'cambio' y 'baja'.
+Cambio = Tuple[str, str, Optional[Evento]]
+
+
+def escribir_json_atomico(ruta: str, datos: Any):
+    """Escribe `datos` en un temporal, lo fuerza a disco y lo renombra encima de `ruta`"""
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+class Almacenamiento:
+    """Interfaz de persistencia que usa GestorEventos
+
+    Los backends reciben objetos Evento y devuelven los datos en el formato
+    de Evento.to_dict(), que es lo que el gestor sabe reconstruir.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+
+    def __str__(self) -> str:
+        return self.ruta
+
+    def existe(self) -> bool:
+        """Indica si ya hay datos guardados"""
+        return os.path.exists(self.ruta)
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        """Devuelve todos los eventos guardados como diccionarios"""
+        raise NotImplementedError
+
+    def cargar_eventos(self) -> List[Evento]:
+        """Devuelve todos los eventos guardados ya construidos
+
+        Por defecto los crea a partir de cargar(); los formatos que saben
+        construirlos más deprisa lo redefinen.
+        """
+        return [Evento.from_dict(dato) for dato in self.cargar()]
+
+    def cargar_rango(self, desde: int, hasta: int) -> List[Evento]:
+        """Eventos guardados en [desde, hasta) (minutos) que cargar_eventos() no devolvió
+
+        Los backends que cargan todo de entrada no tienen nada pendiente.
+        """
+        return []
+
+    def hay_sin_cargar(self, desde: int, hasta: int) -> bool:
+        """Indica si cargar_rango(desde, hasta) tiene algo que devolver
+
+        Debe poder llamarse desde otro hilo mientras se escribe.
+        """
+        return False
+
+    def duracion_maxima(self) -> int:
+        """Cota de la duración (minutos) de los eventos que cargar_rango aún puede devolver
+
+        Quien busca solapes en [desde, hasta) carga desde `desde` menos esta
+        duración para no perder eventos largos que empezaron antes.
+        """
+        return 0
+
+    def temporadas_sin_cargar(self) -> List[str]:
+        """Temporadas guardadas con eventos que aún no se han entregado al gestor"""
+        return []
+
+    def guardar(self, eventos: Iterable[Evento]):
+        """Reescribe el almacenamiento completo con `eventos`"""
+        raise NotImplementedError
+
+    # Consultas que un backend puede resolver por sí mismo sin pasar por los
+    # objetos Evento del gestor (los que lo hacen ponen resuelve_consultas a
+    # True). None significa que no sabe y que el gestor las resuelve con sus
+    # índices en memoria.
+    resuelve_consultas = False
+
+    def filtrar(self, criterio: str, valor: str) -> Optional[List[Dict[str, Any]]]:
+        """Equivalente de GestorEventos.filtrar_eventos"""
+        return None
+
+    def eventos_entre(self, desde: int, hasta: int) -> Optional[List[Dict[str, Any]]]:
+        """Eventos cuyo minuto de inicio está en [desde, hasta), ordenados por inicio"""
+        return None
+
+    def estadisticas(self, desde_proximos: int,
+                     hasta_proximos: int) -> Optional[Dict[str, Any]]:
+        """Equivalente de GestorEventos.obtener_estadisticas, sin las series
+
+        Los próximos son los eventos con inicio en [desde_proximos, hasta_proximos).
+        """
+        return None
+
+    def registrar_cambios(self, cambios: List[Cambio],
+                          eventos: Callable[[], Iterable[Evento]]):
+        """Persiste una tanda de cambios
+
+        Por defecto reescribe todo a partir de `eventos()`; los backends que
+        saben aplicar cambios sueltos lo redefinen.
+        """
+        self.guardar(eventos())
+
+    def cargar_series(self) -> List[Dict[str, Any]]:
+        """Devuelve las series recurrentes guardadas (formato SerieEventos.to_dict())
+
+        Por defecto viven en un archivo JSON aparte, `<ruta>.series.json`.
+        """
+        archivo = f"{self.ruta}.series.json"
+        if not os.path.exists(archivo):
+            return []
+        with open(archivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def guardar_series(self, series: List[Dict[str, Any]]):
+        """Reescribe todas las series recurrentes"""
+        escribir_json_atomico(f"{self.ruta}.series.json", series)
+
+    def cerrar(self):
+        """Libera archivos o conexiones abiertas"""
+
+
+class AlmacenamientoJSON(Almacenamiento):
+    """Lista de eventos en un único archivo JSON (formato original)"""
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        with open(self.ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def guardar(self, eventos: Iterable[Evento]):
+        # Un fallo a mitad deja intacto el archivo anterior
+        self._guardar_atomico(eventos)
+
+    def _guardar_atomico(self, eventos: Iterable[Evento]):
+        """Escribe en un temporal, lo fuerza a disco y lo renombra encima"""
+        escribir_json_atomico(self.ruta, [evento.to_dict() for evento in eventos])
+
+
+class AlmacenamientoDiario(AlmacenamientoJSON):
+    """Instantánea JSON más un diario de cambios de solo anexado
+
+    Cada cambio se añade como una línea JSON a `<ruta>.log`; cada
+    `max_registros` cambios el diario se compacta en una instantánea nueva.
+    """
+
+    def __init__(self, ruta: str, max_registros: int = 1000):
+        super().__init__(ruta)
+        self.archivo_diario = f"{ruta}.log"
+        self.max_registros = max_registros
+        self._diario = None
+        self._registros = 0
+
+    def existe(self) -> bool:
+        return os.path.exists(self.ruta) or os.path.exists(self.archivo_diario)
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        datos: Dict[Any, Dict[str, Any]] = {}
+        if os.path.exists(self.ruta):
+            for dato in super().cargar():
+                datos[dato.get('id') or object()] = dato
+        self._reproducir(datos)
+        return list(datos.values())
+
+    def guardar(self, eventos: Iterable[Evento]):
+        """Escribe una instantánea nueva y vacía el diario"""
+        self._guardar_atomico(eventos)
+        # Si se interrumpe aquí, el diario se vuelve a aplicar sobre la
+        # instantánea nueva; sus registros son idempotentes.
+        self.cerrar()
+        with open(self.archivo_diario, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._registros = 0
+
+    def registrar_cambios(self, cambios: List[Cambio],
+                          eventos: Callable[[], Iterable[Evento]]):
+        lineas = []
+        for operacion, evento_id, evento in cambios:
+            registro = {'op': operacion, 'id': evento_id}
+            if evento is not None:
+                registro['evento'] = evento.to_dict()
+            lineas.append(json.dumps(registro, ensure_ascii=False) + "\n")
+        if self._diario is None:
+            self._diario = open(self.archivo_diario, 'a', encoding='utf-8')
+        self._diario.write("".join(lineas))
+        self._diario.flush()
+        os.fsync(self._diario.fileno())
+        self._registros += len(lineas)
+        if self._registros >= self.max_registros:
+            self.guardar(eventos())
+            print(f"✓ Diario compactado en {self.ruta}")
+
+    def cerrar(self):
+        if self._diario is not None:
+            self._diario.close()
+            self._diario = None
+
+    def _reproducir(self, datos: Dict[Any, Dict[str, Any]]):
+        """Aplica sobre `datos` los registros del diario"""
+        if not os.path.exists(self.archivo_diario):
+            return
+        validos = 0
+        with open(self.archivo_diario, 'rb') as f:
+            for linea in f:
+                try:
+                    if not linea.endswith(b"\n"):
+                        raise ValueError("línea sin terminar")
+                    registro = json.loads(linea)
+                except ValueError:
+                    # Escritura interrumpida: se descarta la cola incompleta
+                    print(f"⚠ Registro incompleto al final de {self.archivo_diario}; se descarta")
+                    break
+                # Alta y cambio sustituyen el evento completo; baja lo borra
+                datos.pop(registro['id'], None)
+                if registro['op'] != 'baja':
+                    datos[registro['evento']['id']] = registro['evento']
+                validos += len(linea)
+                self._registros += 1
+        with open(self.archivo_diario, 'r+b') as f:
+            f.truncate(validos)
+        if self._registros:
+            print(f"✓ Reproducidos {self._registros} cambios desde {self.archivo_diario}")
+
+
+class AlmacenamientoBinario(Almacenamiento):
+    """Instantánea en el formato binario compacto de binario.py
+
+    Arranca mucho más rápido que el JSON: los registros se decodifican en
+    bloque y los eventos se construyen sin volver a interpretar fecha y hora.
+    Cada cambio reescribe la instantánea entera, así que conviene usarlo
+    envuelto en EscrituraDiferida. Para importar o exportar JSON están
+    GestorEventos.importar_desde_json y exportar_a_json.
+    """
+
+    def __init__(self, ruta: str = "events_data.bin"):
+        super().__init__(ruta)
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        return [evento.to_dict() for evento in self.cargar_eventos()]
+
+    def cargar_eventos(self) -> List[Evento]:
+        return binario.leer_eventos(self.ruta)
+
+    def guardar(self, eventos: Iterable[Evento]):
+        binario.escribir(self.ruta, eventos)
+
+
+class AlmacenamientoPorTemporadas(Almacenamiento):
+    """Un archivo por temporada (de julio a junio) dentro de un directorio
+
+    Al arrancar solo se cargan la temporada en curso y las siguientes, más
+    los eventos sin fecha válida; las anteriores se cargan con cargar_rango
+    cuando una consulta llega a ellas. Cada cambio reescribe solo los
+    archivos de las temporadas afectadas. Cada archivo usa el formato de
+    otro backend (`formato`), JSON por defecto. En `duraciones.json` se
+    guarda la duración del evento más largo de cada temporada.
+    """
+
+    MES_INICIO_TEMPORADA = 7
+    SIN_FECHA = "sin_fecha"
+    ARCHIVO_DURACIONES = "duraciones.json"
+
+    def __init__(self, directorio: str = "eventos_temporadas",
+                 formato: Type[Almacenamiento] = AlmacenamientoJSON, extension: str = ".json",
+                 reloj: Callable[[], datetime] = datetime.now):
+        super().__init__(directorio)
+        self.formato = formato
+        self.extension = extension
+        self.reloj = reloj
+        self._guardadas: Set[str] = set()
+        self._cargadas: Set[str] = set()
+        self._temporada_de_id: Dict[str, str] = {}
+        # Eventos guardados de temporadas que se escribieron sin haberse
+        # cargado: siguen en su archivo y se entregan con cargar_rango
+        self._pendientes: Dict[str, List[Evento]] = {}
+        # Minutos del evento más largo de cada temporada guardada
+        self._duraciones: Dict[str, int] = {}
+        # Protege los conjuntos de temporadas (no la E/S) para que se puedan
+        # consultar mientras EscrituraDiferida escribe desde su hilo
+        self._cerrojo_temporadas = threading.Lock()
+
+    @classmethod
+    def temporada_de(cls, minuto: Optional[int]) -> str:
+        """Temporada ('2025-26') a la que pertenece un minuto desde EPOCA"""
+        if minuto is None:
+            return cls.SIN_FECHA
+        momento = desde_minutos(minuto)
+        año = momento.year if momento.month >= cls.MES_INICIO_TEMPORADA else momento.year - 1
+        return f"{año}-{(año + 1) % 100:02d}"
+
+    @classmethod
+    def limites_temporada(cls, temporada: str) -> Tuple[int, int]:
+        """Minutos [inicio, fin) que abarca una temporada"""
+        año = int(temporada[:4])
+        return (a_minutos(datetime(año, cls.MES_INICIO_TEMPORADA, 1)),
+                a_minutos(datetime(año + 1, cls.MES_INICIO_TEMPORADA, 1)))
+
+    @classmethod
+    def solapa(cls, temporada: str, desde: int, hasta: int) -> bool:
+        """Indica si la temporada tiene algún minuto en [desde, hasta)"""
+        inicio, fin = cls.limites_temporada(temporada)
+        return inicio < hasta and desde < fin
+
+    @property
+    def temporadas_cargadas(self) -> List[str]:
+        with self._cerrojo_temporadas:
+            return sorted(self._cargadas)
+
+    def temporadas_sin_cargar(self) -> List[str]:
+        with self._cerrojo_temporadas:
+            return sorted((self._guardadas - self._cargadas - {self.SIN_FECHA})
+                          | set(self._pendientes))
+
+    def hay_sin_cargar(self, desde: int, hasta: int) -> bool:
+        return any(self.solapa(temporada, desde, hasta)
+                   for temporada in self.temporadas_sin_cargar())
+
+    def duracion_maxima(self) -> int:
+        with self._cerrojo_temporadas:
+            sin_cargar = ((self._guardadas - self._cargadas - {self.SIN_FECHA})
+                          | set(self._pendientes))
+            duraciones = dict(self._duraciones)
+        maxima = 0
+        for temporada in sin_cargar:
+            duracion = duraciones.get(temporada)
+            if duracion is None:
+                # Guardada sin duración anotada: se supone que dura la temporada entera
+                inicio, fin = self.limites_temporada(temporada)
+                duracion = fin - inicio
+            maxima = max(maxima, duracion)
+        return maxima
+
+    def existe(self) -> bool:
+        guardadas = self._buscar_guardadas()
+        with self._cerrojo_temporadas:
+            self._guardadas = guardadas
+        return bool(guardadas)
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        return [evento.to_dict() for evento in self.cargar_eventos()]
+
+    def cargar_eventos(self) -> List[Evento]:
+        guardadas = self._buscar_guardadas()
+        duraciones = self._leer_duraciones()
+        with self._cerrojo_temporadas:
+            self._guardadas = guardadas
+            self._cargadas = set()
+            self._pendientes = {}
+            self._duraciones = duraciones
+        self._temporada_de_id = {}
+        actual = self.temporada_de(a_minutos(self.reloj()))
+        return self._cargar_temporadas(
+            temporada for temporada in self._guardadas
+            if temporada == self.SIN_FECHA or temporada >= actual)
+
+    def cargar_rango(self, desde: int, hasta: int) -> List[Evento]:
+        with self._cerrojo_temporadas:
+            sin_cargar = self._guardadas - self._cargadas - {self.SIN_FECHA}
+        pendientes = [temporada for temporada in sin_cargar if self.solapa(temporada, desde, hasta)]
+        eventos = self._cargar_temporadas(pendientes)
+        with self._cerrojo_temporadas:
+            for temporada in list(self._pendientes):
+                if self.solapa(temporada, desde, hasta):
+                    eventos.extend(self._pendientes.pop(temporada))
+                    pendientes.append(temporada)
+        if pendientes:
+            print(f"✓ Cargados {len(eventos)} eventos de las temporadas {', '.join(sorted(pendientes))}")
+        return eventos
+
+    def guardar(self, eventos: Iterable[Evento]):
+        eventos = list(eventos)
+        with self._cerrojo_temporadas:
+            cargadas = set(self._cargadas)
+        self._escribir(cargadas | {self._temporada(evento) for evento in eventos}, eventos)
+
+    def registrar_cambios(self, cambios: List[Cambio],
+                          eventos: Callable[[], Iterable[Evento]]):
+        afectadas = set()
+        for _, evento_id, evento in cambios:
+            if evento_id in self._temporada_de_id:
+                afectadas.add(self._temporada_de_id[evento_id])
+            if evento is not None:
+                afectadas.add(self._temporada(evento))
+        self._escribir(afectadas, eventos())
+
+    def _temporada(self, evento: Evento) -> str:
+        return self.temporada_de(evento.minuto_inicio)
+
+    def _ruta_temporada(self, temporada: str) -> str:
+        return os.path.join(self.ruta, f"eventos_{temporada}{self.extension}")
+
+    def _buscar_guardadas(self) -> Set[str]:
+        if not os.path.isdir(self.ruta):
+            return set()
+        return {nombre[len("eventos_"):-len(self.extension)] for nombre in os.listdir(self.ruta)
+                if nombre.startswith("eventos_") and nombre.endswith(self.extension)}
+
+    def _leer_duraciones(self) -> Dict[str, int]:
+        archivo = os.path.join(self.ruta, self.ARCHIVO_DURACIONES)
+        if not os.path.exists(archivo):
+            return {}
+        with open(archivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _cargar_temporadas(self, temporadas: Iterable[str]) -> List[Evento]:
+        eventos = []
+        for temporada in sorted(temporadas):
+            cargados = self.formato(self._ruta_temporada(temporada)).cargar_eventos()
+            for evento in cargados:
+                self._temporada_de_id[evento.id] = temporada
+            eventos.extend(cargados)
+            with self._cerrojo_temporadas:
+                self._cargadas.add(temporada)
+        return eventos
+
+    def _escribir(self, temporadas: Set[str], eventos: Iterable[Evento]):
+        """Reescribe los archivos de `temporadas` con los eventos que les tocan"""
+        if not temporadas:
+            return
+        grupos: Dict[str, List[Evento]] = {temporada: [] for temporada in temporadas}
+        for evento in eventos:
+            grupo = grupos.get(self._temporada(evento))
+            if grupo is not None:
+                grupo.append(evento)
+        os.makedirs(self.ruta, exist_ok=True)
+        for temporada, grupo in grupos.items():
+            with self._cerrojo_temporadas:
+                sin_cargar = temporada in self._guardadas and temporada not in self._cargadas
+            if sin_cargar:
+                # Temporada histórica sin cargar: sus eventos guardados se
+                # conservan y quedan pendientes de entregar con cargar_rango
+                nuevos = {evento.id for evento in grupo}
+                conservados = [
+                    evento for evento in self.formato(self._ruta_temporada(temporada)).cargar_eventos()
+                    if evento.id not in nuevos]
+                with self._cerrojo_temporadas:
+                    self._pendientes[temporada] = conservados
+            with self._cerrojo_temporadas:
+                grupo += self._pendientes.get(temporada, [])
+            self.formato(self._ruta_temporada(temporada)).guardar(grupo)
+            for evento in grupo:
+                self._temporada_de_id[evento.id] = temporada
+            duracion = max((evento.minuto_fin - evento.minuto_inicio for evento in grupo
+                            if evento.minuto_inicio is not None), default=0)
+            with self._cerrojo_temporadas:
+                self._guardadas.add(temporada)
+                # Lo escrito en esta sesión ya está en memoria: no es histórico por cargar
+                self._cargadas.add(temporada)
+                self._duraciones[temporada] = duracion
+                duraciones = dict(self._duraciones)
+        escribir_json_atomico(os.path.join(self.ruta, self.ARCHIVO_DURACIONES), duraciones)
+
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """Eventos en una base de datos sqlite3 con índices por campo filtrable
+
+    Además de cargar y guardar, responde en SQL a los filtros, consultas por
+    rango de fechas y estadísticas, sin construir un Evento por fila:
+    GestorEventos le pasa filtrar_eventos, obtener_eventos_por_mes y
+    obtener_estadisticas.
+
+    Con `reloj`, cargar_eventos solo construye los eventos de la temporada en
+    curso y siguientes (más los que no tienen fecha válida); las temporadas
+    anteriores se entregan con cargar_rango, como en AlmacenamientoPorTemporadas.
+    """
+
+    resuelve_consultas = True
+
+    COLUMNAS = (
+        'id', 'nombre', 'fecha', 'hora', 'duracion', 'tipo', 'ubicacion',
+        'descripcion', 'capacidad', 'estado', 'precio_base', 'organizador',
+        'fecha_creacion'
+    )
+
+    def __init__(self, ruta: str = "events_data.db",
+                 reloj: Optional[Callable[[], datetime]] = None):
+        super().__init__(ruta)
+        self.reloj = reloj
+        self._conexion: Optional[sqlite3.Connection] = None
+        # Temporadas guardadas aún sin entregar, con los minutos de su evento más largo
+        self._sin_cargar: Dict[str, int] = {}
+        # Ids escritos en esas temporadas: ya están en memoria y cargar_rango los omite
+        self._escritos: Set[str] = set()
+        # Protege _sin_cargar, que se consulta mientras EscrituraDiferida escribe
+        self._cerrojo_temporadas = threading.Lock()
+
+    @property
+    def conexion(self) -> sqlite3.Connection:
+        """Conexión abierta bajo demanda, con el esquema ya creado"""
+        if self._conexion is None:
+            # EscrituraDiferida la usa desde su hilo, siempre bajo su cerrojo
+            self._conexion = sqlite3.connect(self.ruta, check_same_thread=False)
+            self._conexion.create_function('normalizar', 1, normalizar_texto, deterministic=True)
+            self._conexion.create_function('temporada', 1, AlmacenamientoPorTemporadas.temporada_de,
+                                           deterministic=True)
+            self._crear_esquema()
+        return self._conexion
+
+    def _crear_esquema(self):
+        with self._conexion:
+            self._conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS eventos (
+                    id TEXT PRIMARY KEY,
+                    nombre TEXT, fecha TEXT, hora TEXT, duracion REAL,
+                    tipo TEXT, ubicacion TEXT, descripcion TEXT,
+                    capacidad INTEGER, estado TEXT, precio_base REAL,
+                    organizador TEXT, fecha_creacion TEXT,
+                    tipo_clave TEXT, minuto_inicio INTEGER, minuto_fin INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS idx_eventos_fecha ON eventos (fecha);
+                CREATE INDEX IF NOT EXISTS idx_eventos_tipo ON eventos (tipo_clave);
+                CREATE INDEX IF NOT EXISTS idx_eventos_estado ON eventos (estado);
+                CREATE INDEX IF NOT EXISTS idx_eventos_ubicacion ON eventos (ubicacion);
+                CREATE INDEX IF NOT EXISTS idx_eventos_inicio ON eventos (minuto_inicio);
+                CREATE TABLE IF NOT EXISTS series (id TEXT PRIMARY KEY, datos TEXT);
+            """)
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        return self._consultar("1", ())
+
+    def cargar_eventos(self) -> List[Evento]:
+        if self.reloj is None:
+            return super().cargar_eventos()
+        actual = AlmacenamientoPorTemporadas.temporada_de(a_minutos(self.reloj()))
+        desde = AlmacenamientoPorTemporadas.limites_temporada(actual)[0]
+        sin_cargar = dict(self.conexion.execute(
+            "SELECT temporada(minuto_inicio), MAX(minuto_fin - minuto_inicio) FROM eventos"
+            " WHERE minuto_inicio < ? GROUP BY 1", (desde,)))
+        with self._cerrojo_temporadas:
+            self._sin_cargar = sin_cargar
+        self._escritos = set()
+        filas = self._consultar("minuto_inicio IS NULL OR minuto_inicio >= ?", (desde,))
+        return [Evento.from_dict(fila) for fila in filas]
+
+    def cargar_rango(self, desde: int, hasta: int) -> List[Evento]:
+        with self._cerrojo_temporadas:
+            pendientes = sorted(temporada for temporada in self._sin_cargar
+                                if AlmacenamientoPorTemporadas.solapa(temporada, desde, hasta))
+            for temporada in pendientes:
+                del self._sin_cargar[temporada]
+        eventos = []
+        for temporada in pendientes:
+            filas = self._consultar("minuto_inicio >= ? AND minuto_inicio < ?",
+                                    AlmacenamientoPorTemporadas.limites_temporada(temporada))
+            eventos.extend(Evento.from_dict(fila) for fila in filas
+                           if fila['id'] not in self._escritos)
+        if pendientes:
+            print(f"✓ Cargados {len(eventos)} eventos de las temporadas {', '.join(pendientes)}")
+        return eventos
+
+    def hay_sin_cargar(self, desde: int, hasta: int) -> bool:
+        return any(AlmacenamientoPorTemporadas.solapa(temporada, desde, hasta)
+                   for temporada in self.temporadas_sin_cargar())
+
+    def duracion_maxima(self) -> int:
+        with self._cerrojo_temporadas:
+            return max(self._sin_cargar.values(), default=0)
+
+    def temporadas_sin_cargar(self) -> List[str]:
+        with self._cerrojo_temporadas:
+            return sorted(self._sin_cargar)
+
+    def guardar(self, eventos: Iterable[Evento]):
+        eventos = list(eventos)
+        with self._cerrojo_temporadas:
+            sin_cargar = list(self._sin_cargar)
+        with self.conexion:
+            if sin_cargar:
+                # Las temporadas sin cargar no están en `eventos`: se conservan
+                self.conexion.execute(
+                    "DELETE FROM eventos WHERE temporada(minuto_inicio) NOT IN"
+                    f" ({', '.join('?' * len(sin_cargar))})", sin_cargar)
+            else:
+                self.conexion.execute("DELETE FROM eventos")
+            self.conexion.executemany(self._SQL_INSERTAR, map(self._fila, eventos))
+        self._anotar_escritos(eventos)
+
+    def registrar_cambios(self, cambios: List[Cambio],
+                          eventos: Callable[[], Iterable[Evento]]):
+        with self.conexion:
+            for operacion, evento_id, evento in cambios:
+                if evento is None or evento.id != evento_id:
+                    self.conexion.execute("DELETE FROM eventos WHERE id = ?", (evento_id,))
+                if evento is not None:
+                    self.conexion.execute(self._SQL_INSERTAR, self._fila(evento))
+        self._anotar_escritos(evento for _, _, evento in cambios if evento is not None)
+
+    def _anotar_escritos(self, eventos: Iterable[Evento]):
+        """Apunta los ids de `eventos` que caen en temporadas sin cargar"""
+        with self._cerrojo_temporadas:
+            sin_cargar = set(self._sin_cargar)
+        if sin_cargar:
+            self._escritos.update(
+                evento.id for evento in eventos
+                if AlmacenamientoPorTemporadas.temporada_de(evento.minuto_inicio) in sin_cargar)
+
+    def cargar_series(self) -> List[Dict[str, Any]]:
+        return [json.loads(datos) for datos, in
+                self.conexion.execute("SELECT datos FROM series ORDER BY rowid")]
+
+    def guardar_series(self, series: List[Dict[str, Any]]):
+        with self.conexion:
+            self.conexion.execute("DELETE FROM series")
+            self.conexion.executemany(
+                "INSERT INTO series (id, datos) VALUES (?, ?)",
+                ((serie['id'], json.dumps(serie, ensure_ascii=False)) for serie in series))
+
+    def cerrar(self):
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+    def filtrar(self, criterio: str, valor: str) -> List[Dict[str, Any]]:
+        # Mismas reglas que consultas.Contiene / Igual: textos sin tildes ni mayúsculas
+        condiciones = {
+            'nombre': ("instr(normalizar(nombre), ?) > 0", normalizar_texto(valor).strip()),
+            'tipo': ("tipo_clave = ?", valor.lower()),
+            'fecha': ("fecha = ?", valor),
+            'ubicacion': ("instr(normalizar(ubicacion), ?) > 0", normalizar_texto(valor).strip()),
+            'estado': ("estado = ?", valor.lower()),
+        }
+        condicion = condiciones.get(criterio.lower())
+        if condicion is None:
+            return []
+        return self._consultar(condicion[0], (condicion[1],))
+
+    def eventos_entre(self, desde: int, hasta: int) -> List[Dict[str, Any]]:
+        return self._consultar("minuto_inicio >= ? AND minuto_inicio < ?", (desde, hasta),
+                               orden="minuto_inicio, rowid")
+
+    def estadisticas(self, desde_proximos: int, hasta_proximos: int) -> Dict[str, Any]:
+        conexion = self.conexion
+        total, capacidad_total, ingresos_base = conexion.execute(
+            "SELECT COUNT(*), COALESCE(SUM(capacidad), 0),"
+            " COALESCE(SUM(capacidad * precio_base), 0.0) FROM eventos"
+        ).fetchone()
+        por_estado = dict(conexion.execute(
+            "SELECT estado, COUNT(*) FROM eventos GROUP BY estado"))
+        tipos = dict(conexion.execute(
+            "SELECT tipo, COUNT(*) FROM eventos GROUP BY tipo ORDER BY MIN(rowid)"))
+        proximos, = conexion.execute(
+            "SELECT COUNT(*) FROM eventos WHERE minuto_inicio >= ? AND minuto_inicio < ?",
+            (desde_proximos, hasta_proximos)
+        ).fetchone()
+        return {
+            'total_eventos': total,
+            'eventos_programados': por_estado.get('programado', 0),
+            'eventos_en_curso': por_estado.get('en_curso', 0),
+            'eventos_finalizados': por_estado.get('finalizado', 0),
+            'eventos_cancelados': por_estado.get('cancelado', 0),
+            'tipos_eventos': tipos,
+            'tipo_mas_comun': max(tipos, key=tipos.get) if tipos else "N/A",
+            'capacidad_total': capacidad_total,
+            'ingresos_totales': ingresos_base * Evento.TASA_OCUPACION,
+            'eventos_proximos': proximos
+        }
+
+    _SQL_INSERTAR = (
+        f"INSERT INTO eventos ({', '.join(COLUMNAS)}, tipo_clave, minuto_inicio, minuto_fin)"
+        f" VALUES ({', '.join('?' * (len(COLUMNAS) + 3))})"
+        f" ON CONFLICT (id) DO UPDATE SET "
+        + ", ".join(f"{columna} = excluded.{columna}"
+                    for columna in COLUMNAS[1:] + ('tipo_clave', 'minuto_inicio', 'minuto_fin'))
+    )
+
+    @classmethod
+    def _fila(cls, evento: Evento) -> Tuple[Any, ...]:
+        return tuple(getattr(evento, columna) for columna in cls.COLUMNAS) + (
+            evento.tipo.lower(), evento.minuto_inicio, evento.minuto_fin)
+
+    def _consultar(self, condicion: str, parametros: Tuple[Any, ...],
+                   orden: str = "rowid") -> List[Dict[str, Any]]:
+        cursor = self.conexion.execute(
+            f"SELECT {', '.join(self.COLUMNAS)} FROM eventos WHERE {condicion} ORDER BY {orden}",
+            parametros)
+        return [dict(zip(self.COLUMNAS, fila)) for fila in cursor]
+
+
+class EscrituraDiferida(Almacenamiento):
+    """Envuelve otro backend y hace sus escrituras en un hilo aparte
+
+    Los cambios que llegan en ráfaga se acumulan y se escriben juntos cuando
+    pasan `retardo` segundos sin cambios nuevos (o, como mucho, tras
+    `espera_maxima` segundos), así que quien los registra nunca espera al
+    disco. Las lecturas y `vaciar()` esperan a que lo pendiente esté escrito.
+    Las consultas que el destino sabe resolver (filtrar, eventos_entre,
+    estadisticas) no se le pasan: obligarían a esperar a la escritura, y el
+    gestor las resuelve con sus índices en memoria.
+
+    Los eventos se copian (to_dict) al registrar cada cambio, solo los
+    cambiados: el hilo nunca toca los objetos Evento del gestor, que siguen
+    cambiando. Para los destinos que reescriben a partir de todos los
+    eventos se mantiene una copia de cada uno, al día con lo registrado.
+
+    Si una escritura falla, la tanda vuelve a la cola y se reintenta tras
+    `retardo` segundos; `vaciar()` y `cerrar()` lanzan el error para que
+    quien espera sepa que esos cambios no llegaron al destino.
+    """
+
+    def __init__(self, destino: Almacenamiento, retardo: float = 0.5,
+                 espera_maxima: float = 5.0):
+        super().__init__(destino.ruta)
+        self.destino = destino
+        self.retardo = retardo
+        self.espera_maxima = espera_maxima
+        self._condicion = threading.Condition()
+        # Serializa todo acceso a `destino` entre el hilo escritor y el resto
+        self._cerrojo_destino = threading.Lock()
+        # Cambios por escribir, con el evento ya copiado con to_dict()
+        self._cambios: List[Tuple[str, str, Optional[Dict[str, Any]]]] = []
+        self._completo = False
+        # Copia de todos los eventos del gestor por id, en su mismo orden
+        self._copia: Dict[str, Dict[str, Any]] = {}
+        self._primer_cambio = self._ultimo_cambio = 0.0
+        self._escribiendo = False
+        self._cerrado = False
+        # Último error de escritura (None si la última escritura fue bien)
+        self._error: Optional[Exception] = None
+        self._hilo = threading.Thread(target=self._trabajar, name="escritura-eventos", daemon=True)
+        self._hilo.start()
+
+    def existe(self) -> bool:
+        self.vaciar()
+        with self._cerrojo_destino:
+            return self.destino.existe()
+
+    def cargar(self) -> List[Dict[str, Any]]:
+        self.vaciar()
+        with self._cerrojo_destino:
+            return self.destino.cargar()
+
+    def cargar_eventos(self) -> List[Evento]:
+        self.vaciar()
+        with self._cerrojo_destino:
+            eventos = self.destino.cargar_eventos()
+            with self._condicion:
+                self._copia = {}
+                self._anotar_cargados(eventos)
+        return eventos
+
+    # Las consultas de qué falta por cargar no toman el cerrojo del destino:
+    # el hilo escritor lo tiene durante toda una escritura y el gestor las
+    # hace al crear eventos y calcular estadísticas
+
+    def cargar_rango(self, desde: int, hasta: int) -> List[Evento]:
+        if not self.destino.hay_sin_cargar(desde, hasta):
+            return []
+        with self._cerrojo_destino:
+            eventos = self.destino.cargar_rango(desde, hasta)
+            # Antes de soltar el destino: la próxima escritura ya debe contar con ellos
+            with self._condicion:
+                self._anotar_cargados(eventos)
+        return eventos
+
+    def hay_sin_cargar(self, desde: int, hasta: int) -> bool:
+        return self.destino.hay_sin_cargar(desde, hasta)
+
+    def duracion_maxima(self) -> int:
+        return self.destino.duracion_maxima()
+
+    def temporadas_sin_cargar(self) -> List[str]:
+        return self.destino.temporadas_sin_cargar()
+
+    def guardar(self, eventos: Iterable[Evento]):
+        copia = {evento.id: evento.to_dict() for evento in eventos}
+        with self._condicion:
+            self._cambios = []
+            self._completo = True
+            self._copia = copia
+            self._encolar()
+
+    def registrar_cambios(self, cambios: List[Cambio],
+                          eventos: Callable[[], Iterable[Evento]]):
+        copiados = [(operacion, evento_id, evento.to_dict() if evento is not None else None)
+                    for operacion, evento_id, evento in cambios]
+        with self._condicion:
+            for _, evento_id, datos in copiados:
+                # Igual que en el gestor: un cambio de id pasa el evento al final
+                if datos is None or datos['id'] != evento_id:
+                    self._copia.pop(evento_id, None)
+                if datos is not None:
+                    self._copia[datos['id']] = datos
+            self._cambios.extend(copiados)
+            self._encolar()
+
+    def cargar_series(self) -> List[Dict[str, Any]]:
+        with self._cerrojo_destino:
+            return self.destino.cargar_series()
+
+    def guardar_series(self, series: List[Dict[str, Any]]):
+        # Son pocas y cambian poco: se escriben en el momento
+        with self._cerrojo_destino:
+            self.destino.guardar_series(series)
+
+    def vaciar(self):
+        """Espera a que todo lo pendiente esté escrito en el destino
+
+        Lanza el error de escritura si el intento falla; lo pendiente sigue en cola.
+        """
+        with self._condicion:
+            self._error = None
+            self._ultimo_cambio = self._primer_cambio = 0.0
+            self._condicion.notify_all()
+            while (self._pendiente() or self._escribiendo) and self._error is None:
+                self._condicion.wait()
+            if self._error is not None:
+                raise self._error
+
+    def cerrar(self):
+        """Escribe lo pendiente, detiene el hilo y cierra el destino
+
+        Si no se pudo escribir lo pendiente, lanza el error tras cerrar.
+        """
+        try:
+            if not self._cerrado:
+                self.vaciar()
+        finally:
+            if not self._cerrado:
+                with self._condicion:
+                    self._cerrado = True
+                    self._condicion.notify_all()
+                self._hilo.join()
+            with self._cerrojo_destino:
+                self.destino.cerrar()
+
+    def _pendiente(self) -> bool:
+        return self._completo or bool(self._cambios)
+
+    def _anotar_cargados(self, eventos: List[Evento]):
+        """Añade a la copia los eventos que se entregan al gestor (con la condición tomada)
+
+        Si un id ya está en uso, con la clave que le pondrá GestorEventos._asignar_id_unico.
+        """
+        for evento in eventos:
+            datos = evento.to_dict()
+            clave = base = datos['id']
+            sufijo = 2
+            while clave in self._copia:
+                clave = f"{base}_{sufijo}"
+                sufijo += 1
+            datos['id'] = clave
+            self._copia[clave] = datos
+
+    def _eventos_copiados(self) -> List[Evento]:
+        """Eventos construidos desde la copia (en el hilo escritor)"""
+        with self._condicion:
+            copia = list(self._copia.values())
+        return [Evento.from_dict(datos) for datos in copia]
+
+    def _encolar(self):
+        """Avisa al hilo de que hay cambios (con la condición tomada)"""
+        ahora = time.monotonic()
+        if self._primer_cambio == 0.0:
+            self._primer_cambio = ahora
+        self._ultimo_cambio = ahora
+        self._condicion.notify_all()
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while not self._pendiente() and not self._cerrado:
+                    self._condicion.wait()
+                if not self._pendiente() or (self._cerrado and self._error is not None):
+                    # Al cerrar tras un fallo no se sigue reintentando
+                    return
+                espera = self._espera_restante()
+                if espera > 0:
+                    self._condicion.wait(espera)
+                    continue
+                cambios, completo = self._cambios, self._completo
+                self._cambios, self._completo = [], False
+                self._primer_cambio = self._ultimo_cambio = 0.0
+                self._escribiendo = True
+            try:
+                with self._cerrojo_destino:
+                    if completo:
+                        self.destino.guardar(self._eventos_copiados())
+                    else:
+                        self.destino.registrar_cambios(
+                            [(operacion, evento_id, Evento.from_dict(datos) if datos else None)
+                             for operacion, evento_id, datos in cambios],
+                            self._eventos_copiados)
+                error = None
+            except Exception as e:
+                print(f"✗ Error al guardar eventos en segundo plano: {e}")
+                error = e
+            with self._condicion:
+                self._escribiendo = False
+                if error is not None:
+                    self._reencolar(cambios, completo)
+                self._error = error
+                self._condicion.notify_all()
+
+    def _reencolar(self, cambios: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+                   completo: bool):
+        """Devuelve a la cola una tanda que no se pudo escribir (con la condición tomada)"""
+        if completo:
+            self._completo = True
+        else:
+            # Delante de lo que haya llegado mientras tanto, para conservar el orden
+            self._cambios = cambios + self._cambios
+        # Se reintenta tras `retardo` segundos
+        self._primer_cambio = self._ultimo_cambio = time.monotonic()
+
+    def _espera_restante(self) -> float:
+        """Segundos hasta que toca escribir (0 si ya toca o hay que vaciar)"""
+        if self._ultimo_cambio == 0.0:
+            return 0.0
+        ahora = time.monotonic()
+        return max(0.0, min(self._ultimo_cambio + self.retardo,
+                            self._primer_cambio + self.espera_maxima) - ahora)
@@ -0,0 +1,354 @@
+# binario.py
+"""Formato binario compacto para instantáneas de eventos
+
+Estructura del archivo (little-endian):
+
+    cabecera    FORMATO_CABECERA: firma, versión, nº de registros, nº de cadenas
+    registros   n × FORMATO_REGISTRO, todos del mismo tamaño
+    desplaz.    (nº de cadenas + 1) × uint32: inicio de cada cadena en el bloque
+    cadenas     UTF-8 de cada cadena distinta, terminada en NUL
+
+Los campos numéricos van empaquetados con `struct` y los de texto son
+índices a una tabla de cadenas sin repetidos, así que tipos, ubicaciones,
+fechas o estados ocupan 4 bytes por evento. Los registros de tamaño fijo
+permiten además leer un evento suelto sin recorrer el archivo.
+"""
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Events import Evento
+
+FIRMA = b"CNEV"
+VERSION = 1
+FORMATO_CABECERA = struct.Struct("<4sHxxII")
+
+# Campos de cada registro, en orden. Los minutos usan SIN_MINUTOS cuando la
+# fecha u hora del evento no se pudieron interpretar.
+CAMPOS_NUMERICOS = (
+    ('minuto_inicio', 'q'), ('minuto_fin', 'q'), ('duracion', 'd'),
+    ('capacidad', 'q'), ('precio_base', 'd'),
+)
+CAMPOS_TEXTO = (
+    'id', 'nombre', 'fecha', 'hora', 'tipo', 'ubicacion',
+    'descripcion', 'estado', 'organizador', 'fecha_creacion',
+)
+CAMPOS = tuple(campo for campo, _ in CAMPOS_NUMERICOS) + CAMPOS_TEXTO
+FORMATO_REGISTRO = struct.Struct(
+    "<" + "".join(codigo for _, codigo in CAMPOS_NUMERICOS) + "I" * len(CAMPOS_TEXTO))
+SIN_MINUTOS = -2 ** 63
+
+# Código struct y posición dentro del registro de cada campo
+_CODIGOS = dict(CAMPOS_NUMERICOS, **{campo: 'I' for campo in CAMPOS_TEXTO})
+_POSICIONES = {campo: struct.calcsize("<" + "".join(_CODIGOS[anterior] for anterior in CAMPOS[:i]))
+               for i, campo in enumerate(CAMPOS)}
+# Claves de Evento.to_dict(), en su orden
+_CAMPOS_DICT = ('id', 'nombre', 'fecha', 'hora', 'duracion', 'tipo', 'ubicacion',
+                'descripcion', 'capacidad', 'estado', 'precio_base', 'organizador',
+                'fecha_creacion')
+
+
+def escribir(ruta: str, eventos: Iterable[Evento]):
+    """Escribe la instantánea en un temporal, la fuerza a disco y la renombra encima"""
+    cadenas: Dict[str, int] = {}
+    registros = bytearray()
+    total = 0
+    for evento in eventos:
+        numeros = [getattr(evento, campo) for campo, _ in CAMPOS_NUMERICOS]
+        if evento.minuto_inicio is None:
+            numeros[0] = numeros[1] = SIN_MINUTOS
+        indices = [cadenas.setdefault(str(getattr(evento, campo)), len(cadenas))
+                   for campo in CAMPOS_TEXTO]
+        registros += FORMATO_REGISTRO.pack(*numeros, *indices)
+        total += 1
+
+    bloque = bytearray()
+    desplazamientos = [0]
+    for cadena in cadenas:
+        bloque += cadena.encode('utf-8') + b"\0"
+        desplazamientos.append(len(bloque))
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(FORMATO_CABECERA.pack(FIRMA, VERSION, total, len(cadenas)))
+        f.write(registros)
+        f.write(struct.pack(f"<{len(desplazamientos)}I", *desplazamientos))
+        f.write(bloque)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def leer_cabecera(datos) -> Tuple[int, int]:
+    """Valida la cabecera y devuelve (nº de registros, nº de cadenas)"""
+    firma, version, total, num_cadenas = FORMATO_CABECERA.unpack_from(datos, 0)
+    if firma != FIRMA:
+        raise ValueError("No es un archivo de eventos binario")
+    if version != VERSION:
+        raise ValueError(f"Versión de formato no soportada: {version}")
+    return total, num_cadenas
+
+
+def secciones(datos) -> Tuple[int, int, int, int]:
+    """Posición de los registros, de los desplazamientos y del bloque de cadenas, y nº de cadenas"""
+    total, num_cadenas = leer_cabecera(datos)
+    inicio_registros = FORMATO_CABECERA.size
+    inicio_desplazamientos = inicio_registros + total * FORMATO_REGISTRO.size
+    inicio_cadenas = inicio_desplazamientos + (num_cadenas + 1) * 4
+    return inicio_registros, inicio_desplazamientos, inicio_cadenas, num_cadenas
+
+
+def leer_cadenas(datos) -> List[str]:
+    """Decodifica de una vez toda la tabla de cadenas"""
+    _, inicio_desplazamientos, inicio_cadenas, num_cadenas = secciones(datos)
+    texto = bytes(datos[inicio_cadenas:]).decode('utf-8')
+    cadenas = texto.split("\0")[:-1]
+    if len(cadenas) != num_cadenas:
+        # Alguna cadena lleva NUL dentro: se separan por desplazamientos
+        desplazamientos = struct.unpack_from(
+            f"<{num_cadenas + 1}I", datos, inicio_desplazamientos)
+        bloque = bytes(datos[inicio_cadenas:])
+        cadenas = [bloque[desde:hasta - 1].decode('utf-8')
+                   for desde, hasta in zip(desplazamientos, desplazamientos[1:])]
+    return cadenas
+
+
+def leer_eventos(ruta: str) -> List[Evento]:
+    """Carga todos los eventos de una instantánea binaria"""
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+    inicio_registros, fin_registros, _, _ = secciones(datos)
+    # Cada cadena se decodifica una vez: los eventos con el mismo tipo,
+    # fecha o ubicación comparten el mismo objeto, como al internarlos
+    cadenas = leer_cadenas(datos)
+
+    eventos = []
+    for (inicio, fin, duracion, capacidad, precio, id_, nombre, fecha, hora, tipo,
+         ubicacion, descripcion, estado, organizador, creacion) in FORMATO_REGISTRO.iter_unpack(
+            memoryview(datos)[inicio_registros:fin_registros]):
+        if inicio == SIN_MINUTOS:
+            inicio = fin = None
+        eventos.append(Evento.desde_campos(
+            id=cadenas[id_], nombre=cadenas[nombre],
+            fecha=cadenas[fecha], hora=cadenas[hora], duracion=duracion,
+            minuto_inicio=inicio, minuto_fin=fin,
+            tipo=cadenas[tipo], ubicacion=cadenas[ubicacion],
+            descripcion=cadenas[descripcion], capacidad=capacidad,
+            estado=cadenas[estado], precio_base=precio,
+            organizador=cadenas[organizador], fecha_creacion=cadenas[creacion]))
+    return eventos
+
+
+def formato_columnas(campos: Iterable[str]) -> struct.Struct:
+    """Struct que, aplicado a un registro, solo decodifica `campos` (en orden de registro)"""
+    formato = "<"
+    posicion = 0
+    for campo in sorted(campos, key=_POSICIONES.get):
+        hueco = _POSICIONES[campo] - posicion
+        formato += f"{hueco}x" if hueco else ""
+        formato += _CODIGOS[campo]
+        posicion = _POSICIONES[campo] + struct.calcsize("<" + _CODIGOS[campo])
+    resto = FORMATO_REGISTRO.size - posicion
+    return struct.Struct(formato + (f"{resto}x" if resto else ""))
+
+
+class RegistroEvento:
+    """Un evento de una VistaEventos: cada campo se lee del archivo al pedirlo"""
+
+    __slots__ = ('_vista', 'posicion')
+
+    def __init__(self, vista: 'VistaEventos', posicion: int):
+        self._vista = vista
+        self.posicion = posicion
+
+    def __getattr__(self, campo: str) -> Any:
+        if campo not in _POSICIONES:
+            raise AttributeError(campo)
+        return self._vista.valor(self.posicion, campo)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Mismo formato que Evento.to_dict()"""
+        valores = self._vista.campos(self.posicion)
+        return {campo: valores[campo] for campo in _CAMPOS_DICT}
+
+    def a_evento(self) -> Evento:
+        """Construye el Evento completo del registro"""
+        return Evento.desde_campos(**self._vista.campos(self.posicion))
+
+    def __repr__(self) -> str:
+        return f"<RegistroEvento {self.posicion}: {self.id}>"
+
+
+class VistaEventos:
+    """Instantánea binaria abierta con mmap para análisis de solo lectura
+
+    Nada se carga al abrir: los registros se leen del archivo mapeado a
+    través de memoryview y cada campo se decodifica solo cuando se pide.
+    Los recorridos por columna (columna, filtrar, contar_por, sumar,
+    estadisticas) decodifican únicamente los campos que usan, y las cadenas
+    se decodifican una vez por valor distinto. La memoria del proceso no
+    crece con el tamaño del archivo: las páginas las gestiona el sistema.
+    """
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._datos = memoryview(self._mapa)
+        inicio_registros, inicio_desplazamientos, inicio_cadenas, num_cadenas = secciones(self._datos)
+        self._total = (inicio_desplazamientos - inicio_registros) // FORMATO_REGISTRO.size
+        self._registros = self._datos[inicio_registros:inicio_desplazamientos]
+        self._desplazamientos = self._datos[inicio_desplazamientos:inicio_cadenas]
+        if sys.byteorder == 'little':
+            self._desplazamientos = self._desplazamientos.cast('I')
+        else:
+            self._desplazamientos = struct.unpack(f"<{num_cadenas + 1}I", self._desplazamientos)
+        self._bloque_cadenas = self._datos[inicio_cadenas:]
+        self._cadenas: Dict[int, str] = {}
+        self._formatos: Dict[Tuple[str, ...], struct.Struct] = {}
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __getitem__(self, posicion: int) -> RegistroEvento:
+        if posicion < 0:
+            posicion += self._total
+        if not 0 <= posicion < self._total:
+            raise IndexError(posicion)
+        return RegistroEvento(self, posicion)
+
+    def __iter__(self) -> Iterator[RegistroEvento]:
+        return (RegistroEvento(self, posicion) for posicion in range(self._total))
+
+    def __enter__(self) -> 'VistaEventos':
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def cerrar(self):
+        """Libera el mapeo y el archivo (los registros dejan de ser legibles)"""
+        for vista in (self._registros, self._desplazamientos, self._bloque_cadenas, self._datos):
+            if isinstance(vista, memoryview):
+                vista.release()
+        self._mapa.close()
+        self._archivo.close()
+
+    def valor(self, posicion: int, campo: str) -> Any:
+        """Decodifica un solo campo del registro en `posicion`"""
+        crudo, = self._formato((campo,)).unpack_from(
+            self._registros, posicion * FORMATO_REGISTRO.size)
+        return self._decodificar(campo, crudo)
+
+    def campos(self, posicion: int) -> Dict[str, Any]:
+        """Decodifica todos los campos del registro en `posicion`"""
+        crudos = FORMATO_REGISTRO.unpack_from(self._registros, posicion * FORMATO_REGISTRO.size)
+        return {campo: self._decodificar(campo, crudo) for campo, crudo in zip(CAMPOS, crudos)}
+
+    def columna(self, campo: str) -> Iterator[Any]:
+        """Valores de un campo en todos los registros, en orden"""
+        decodificar = self._decodificar
+        for crudo, in self._formato((campo,)).iter_unpack(self._registros):
+            yield decodificar(campo, crudo)
+
+    def columnas(self, *campos: str) -> Iterator[Tuple[Any, ...]]:
+        """Tuplas con los valores de varios campos de cada registro"""
+        ordenados = tuple(sorted(campos, key=_POSICIONES.get))
+        orden = [ordenados.index(campo) for campo in campos]
+        decodificar = self._decodificar
+        for crudos in self._formato(ordenados).iter_unpack(self._registros):
+            yield tuple(decodificar(ordenados[i], crudos[i]) for i in orden)
+
+    def filtrar(self, **condiciones: Any) -> Iterator[RegistroEvento]:
+        """
+        Registros que cumplen todas las condiciones campo=valor; el valor
+        puede ser también una función que recibe el del campo y devuelve bool
+        """
+        if not condiciones:
+            yield from self
+            return
+        campos = tuple(sorted(condiciones, key=_POSICIONES.get))
+        pruebas = [self._prueba(campo, condiciones[campo]) for campo in campos]
+        for posicion, fila in enumerate(self._formato(campos).iter_unpack(self._registros)):
+            if all(prueba(crudo) for prueba, crudo in zip(pruebas, fila)):
+                yield RegistroEvento(self, posicion)
+
+    def contar_por(self, campo: str) -> Dict[Any, int]:
+        """Número de registros por valor de un campo"""
+        cuentas: Dict[Any, int] = {}
+        for crudo, in self._formato((campo,)).iter_unpack(self._registros):
+            cuentas[crudo] = cuentas.get(crudo, 0) + 1
+        return {self._decodificar(campo, crudo): cuenta for crudo, cuenta in cuentas.items()}
+
+    def sumar(self, campo: str) -> Any:
+        """Suma de un campo numérico en todos los registros"""
+        return sum(crudo for crudo, in self._formato((campo,)).iter_unpack(self._registros))
+
+    def estadisticas(self, desde_proximos: Optional[int] = None,
+                     hasta_proximos: Optional[int] = None) -> Dict[str, Any]:
+        """Equivalente de GestorEventos.obtener_estadisticas sobre el archivo
+
+        Los próximos son los eventos con inicio en [desde_proximos, hasta_proximos).
+        """
+        por_estado = self.contar_por('estado')
+        tipos = self.contar_por('tipo')
+        ingresos_base = sum(capacidad * precio for capacidad, precio in
+                            self._formato(('capacidad', 'precio_base')).iter_unpack(self._registros))
+        proximos = 0
+        if desde_proximos is not None and hasta_proximos is not None:
+            proximos = sum(1 for inicio, in self._formato(('minuto_inicio',)).iter_unpack(self._registros)
+                           if desde_proximos <= inicio < hasta_proximos)
+        return {
+            'total_eventos': self._total,
+            'eventos_programados': por_estado.get('programado', 0),
+            'eventos_en_curso': por_estado.get('en_curso', 0),
+            'eventos_finalizados': por_estado.get('finalizado', 0),
+            'eventos_cancelados': por_estado.get('cancelado', 0),
+            'tipos_eventos': tipos,
+            'tipo_mas_comun': max(tipos, key=tipos.get) if tipos else "N/A",
+            'capacidad_total': self.sumar('capacidad'),
+            'ingresos_totales': ingresos_base * Evento.TASA_OCUPACION,
+            'eventos_proximos': proximos
+        }
+
+    def cadena(self, indice: int) -> str:
+        """Decodifica (una sola vez) la cadena `indice` de la tabla"""
+        cadena = self._cadenas.get(indice)
+        if cadena is None:
+            desde = self._desplazamientos[indice]
+            hasta = self._desplazamientos[indice + 1] - 1
+            cadena = self._cadenas[indice] = str(self._bloque_cadenas[desde:hasta], 'utf-8')
+        return cadena
+
+    def _formato(self, campos: Tuple[str, ...]) -> struct.Struct:
+        formato = self._formatos.get(campos)
+        if formato is None:
+            formato = self._formatos[campos] = formato_columnas(campos)
+        return formato
+
+    def _decodificar(self, campo: str, crudo: Any) -> Any:
+        if _CODIGOS[campo] == 'I':
+            return self.cadena(crudo)
+        if crudo == SIN_MINUTOS and campo in ('minuto_inicio', 'minuto_fin'):
+            return None
+        return crudo
+
+    def _prueba(self, campo: str, condicion: Any) -> Callable[[Any], bool]:
+        """Función que evalúa la condición sobre el valor crudo del campo"""
+        if not callable(condicion):
+            esperado = condicion
+            condicion = lambda valor: valor == esperado
+        if _CODIGOS[campo] != 'I':
+            return lambda crudo: condicion(self._decodificar(campo, crudo))
+        # Cada cadena está una sola vez en la tabla: basta evaluar cada
+        # índice distinto una vez
+        resultados: Dict[int, bool] = {}
+
+        def prueba(crudo: int) -> bool:
+            resultado = resultados.get(crudo)
+            if resultado is None:
+                resultado = resultados[crudo] = bool(condicion(self.cadena(crudo)))
+            return resultado
+        return prueba
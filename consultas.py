@@ -0,0 +1,262 @@
+# consultas.py
+"""Consultas combinables sobre los eventos de GestorEventos
+
+Los predicados se combinan con Y/O (o con los operadores & y |) y se pasan
+a GestorEventos.consultar. El plan elige como origen el índice del gestor
+que devuelve menos candidatos y aplica el resto de condiciones como etapas
+perezosas; los eventos solo se convierten a diccionario en Consulta.filas().
+"""
+import heapq
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from Events import Evento, a_minutos
+from indices import normalizar_texto
+
+# Campos de Evento por los que se puede consultar y ordenar
+CAMPOS = (
+    'id', 'nombre', 'fecha', 'hora', 'duracion', 'tipo', 'ubicacion',
+    'descripcion', 'capacidad', 'estado', 'precio_base', 'organizador',
+    'fecha_creacion'
+)
+# Campos que admiten Rango; en 'fecha' se compara el inicio del evento
+CAMPOS_RANGO = ('fecha', 'capacidad', 'precio_base')
+
+
+class Acceso(NamedTuple):
+    """Forma de obtener candidatos: estimación de cuántos, generador y descripción"""
+    estimacion: int
+    obtener: Callable[[], Iterable[Evento]]
+    descripcion: str
+
+
+class Predicado:
+    """Condición sobre un evento"""
+
+    def cumple(self, evento: Evento) -> bool:
+        raise NotImplementedError
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        """Índice del gestor que da los candidatos de este predicado (None si no hay)"""
+        return None
+
+    def __and__(self, otro: 'Predicado') -> 'Predicado':
+        return Y(self, otro)
+
+    def __or__(self, otro: 'Predicado') -> 'Predicado':
+        return O(self, otro)
+
+
+class Igual(Predicado):
+    """campo == valor (el tipo, como en su índice, sin distinguir mayúsculas)"""
+
+    def __init__(self, campo: str, valor: Any):
+        self.campo = _validar_campo(campo)
+        self.valor = valor.lower() if campo == 'tipo' and isinstance(valor, str) else valor
+
+    def cumple(self, evento: Evento) -> bool:
+        valor = getattr(evento, self.campo)
+        if self.campo == 'tipo':
+            valor = valor.lower()
+        return valor == self.valor
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        return gestor._acceso_igual(self.campo, self.valor)
+
+    def __repr__(self) -> str:
+        return f"{self.campo} = {self.valor!r}"
+
+
+class Contiene(Predicado):
+    """El texto del campo contiene `texto`, sin distinguir mayúsculas ni tildes"""
+
+    def __init__(self, campo: str, texto: str):
+        self.campo = _validar_campo(campo)
+        self.texto = normalizar_texto(texto).strip()
+
+    def cumple(self, evento: Evento) -> bool:
+        return self.texto in normalizar_texto(getattr(evento, self.campo) or "")
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        return gestor._acceso_texto(self.campo, self.texto)
+
+    def __repr__(self) -> str:
+        return f"{self.campo} contiene {self.texto!r}"
+
+
+class Rango(Predicado):
+    """desde <= campo < hasta; cualquiera de los dos límites puede omitirse
+
+    En 'fecha' los límites pueden ser datetime, date o "DD/MM/AAAA" y se
+    comparan con el inicio del evento.
+    """
+
+    def __init__(self, campo: str, desde: Any = None, hasta: Any = None):
+        if campo not in CAMPOS_RANGO:
+            raise ValueError(f"Rango no admitido sobre el campo: {campo}")
+        self.campo = campo
+        if campo == 'fecha':
+            desde, hasta = _a_minutos(desde), _a_minutos(hasta)
+        self.desde = desde
+        self.hasta = hasta
+
+    def cumple(self, evento: Evento) -> bool:
+        valor = evento.minuto_inicio if self.campo == 'fecha' else getattr(evento, self.campo)
+        if valor is None:
+            return False
+        return ((self.desde is None or valor >= self.desde) and
+                (self.hasta is None or valor < self.hasta))
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        return gestor._acceso_rango(self.campo, self.desde, self.hasta)
+
+    def __repr__(self) -> str:
+        return f"{self.desde!r} <= {self.campo} < {self.hasta!r}"
+
+
+class Y(Predicado):
+    """Se cumplen todos los predicados"""
+
+    def __init__(self, *predicados: Predicado):
+        # Y(Y(a, b), c) se aplana para que el plan vea todas las opciones
+        self.predicados: Tuple[Predicado, ...] = tuple(
+            hijo for predicado in predicados
+            for hijo in (predicado.predicados if isinstance(predicado, Y) else (predicado,)))
+
+    def cumple(self, evento: Evento) -> bool:
+        return all(predicado.cumple(evento) for predicado in self.predicados)
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        accesos = [acceso for acceso in (p.acceso(gestor) for p in self.predicados) if acceso]
+        return min(accesos, key=lambda acceso: acceso.estimacion, default=None)
+
+    def __repr__(self) -> str:
+        return "(" + " Y ".join(map(repr, self.predicados)) + ")"
+
+
+class O(Predicado):
+    """Se cumple alguno de los predicados"""
+
+    def __init__(self, *predicados: Predicado):
+        self.predicados: Tuple[Predicado, ...] = tuple(
+            hijo for predicado in predicados
+            for hijo in (predicado.predicados if isinstance(predicado, O) else (predicado,)))
+
+    def cumple(self, evento: Evento) -> bool:
+        return any(predicado.cumple(evento) for predicado in self.predicados)
+
+    def acceso(self, gestor) -> Optional[Acceso]:
+        # Solo compensa si todas las ramas tienen índice: se unen sus candidatos
+        accesos = [predicado.acceso(gestor) for predicado in self.predicados]
+        if not accesos or None in accesos:
+            return None
+
+        def obtener() -> Iterator[Evento]:
+            vistos = set()
+            for acceso in accesos:
+                for evento in acceso.obtener():
+                    if evento.id not in vistos:
+                        vistos.add(evento.id)
+                        yield evento
+        return Acceso(sum(acceso.estimacion for acceso in accesos), obtener,
+                      "unión de " + ", ".join(acceso.descripcion for acceso in accesos))
+
+    def __repr__(self) -> str:
+        return "(" + " O ".join(map(repr, self.predicados)) + ")"
+
+
+class Consulta:
+    """Consulta sobre los eventos de un gestor: predicado, orden y límite
+
+    Se construye con GestorEventos.consultar y se encadena:
+
+        gestor.consultar(Igual('estado', 'programado'))
+              .donde(Rango('capacidad', desde=10000))
+              .ordenar_por('fecha').limite(20).filas()
+    """
+
+    def __init__(self, gestor, predicado: Optional[Predicado] = None):
+        self.gestor = gestor
+        self.predicado = predicado
+        self._orden: Optional[Tuple[str, bool]] = None
+        self._limite: Optional[int] = None
+
+    def donde(self, predicado: Predicado) -> 'Consulta':
+        """Añade una condición (Y con las anteriores)"""
+        self.predicado = predicado if self.predicado is None else Y(self.predicado, predicado)
+        return self
+
+    def ordenar_por(self, campo: str, descendente: bool = False) -> 'Consulta':
+        """Ordena por un campo ('fecha' ordena por inicio)"""
+        self._orden = (_validar_campo(campo), descendente)
+        return self
+
+    def limite(self, cantidad: int) -> 'Consulta':
+        """Devuelve como mucho `cantidad` eventos"""
+        self._limite = max(int(cantidad), 0)
+        return self
+
+    def plan(self) -> str:
+        """Describe el origen elegido para los candidatos"""
+        return self._acceso().descripcion
+
+    def eventos(self) -> Iterator[Evento]:
+        """Genera los eventos que cumplen la consulta"""
+        acceso = self._acceso()
+        eventos: Iterable[Evento] = acceso.obtener()
+        if self.predicado is not None:
+            cumple = self.predicado.cumple
+            eventos = (evento for evento in eventos if cumple(evento))
+        if self._orden is not None:
+            campo, descendente = self._orden
+            clave = _clave_orden(campo)
+            if self._limite is not None:
+                # Con límite basta un montículo de `limite` elementos
+                seleccion = heapq.nlargest if descendente else heapq.nsmallest
+                return iter(seleccion(self._limite, eventos, key=clave))
+            return iter(sorted(eventos, key=clave, reverse=descendente))
+        if self._limite is not None:
+            return islice(eventos, self._limite)
+        return iter(eventos)
+
+    def filas(self) -> Iterator[Dict[str, Any]]:
+        """Genera los resultados ya convertidos con Evento.to_dict()"""
+        return (evento.to_dict() for evento in self.eventos())
+
+    def lista(self) -> List[Evento]:
+        return list(self.eventos())
+
+    def contar(self) -> int:
+        return sum(1 for _ in self.eventos())
+
+    def __iter__(self) -> Iterator[Evento]:
+        return self.eventos()
+
+    def _acceso(self) -> Acceso:
+        acceso = self.predicado.acceso(self.gestor) if self.predicado is not None else None
+        return acceso or self.gestor._acceso_total()
+
+
+def _validar_campo(campo: str) -> str:
+    if campo not in CAMPOS:
+        raise ValueError(f"Campo no válido: {campo}")
+    return campo
+
+
+def _a_minutos(valor: Any) -> Optional[int]:
+    """Límite de fecha como minutos desde EPOCA"""
+    if valor is None or isinstance(valor, int):
+        return valor
+    if isinstance(valor, str):
+        valor = datetime.strptime(valor, "%d/%m/%Y")
+    elif not isinstance(valor, datetime) and isinstance(valor, date):
+        valor = datetime(valor.year, valor.month, valor.day)
+    return a_minutos(valor)
+
+
+def _clave_orden(campo: str) -> Callable[[Evento], Any]:
+    """Clave de ordenación; los valores vacíos van al final"""
+    if campo == 'fecha':
+        return lambda evento: (evento.minuto_inicio is None, evento.minuto_inicio or 0)
+    return lambda evento: (getattr(evento, campo) is None, getattr(evento, campo))
@@ -0,0 +1,352 @@
+# indices.py
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+class IndiceIntervalos:
+    """Índice de intervalos [inicio, fin) ordenado por el instante de inicio
+
+    Guarda los inicios en una lista ordenada, paralela a las entradas, junto
+    con la duración máxima registrada. Así una consulta de solapamiento solo
+    recorre, con búsqueda binaria, la ventana [inicio - duracion_max, fin).
+    """
+
+    def __init__(self, entradas: Iterable[Tuple[Any, Any, Any]] = ()):
+        self._inicios: List[Any] = []
+        self._entradas: List[Tuple[Any, Any, Any]] = []
+        self._duracion_max = None
+        # Se incrementa con cada modificación; invalida los CursorTemporal
+        self.version = 0
+        self.reconstruir(entradas)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any, Any]]:
+        return iter(self._entradas)
+
+    def reconstruir(self, entradas: Iterable[Tuple[Any, Any, Any]]):
+        """Reconstruye el índice completo a partir de (inicio, fin, valor)"""
+        self._entradas = sorted(entradas, key=lambda entrada: entrada[0])
+        self._inicios = [entrada[0] for entrada in self._entradas]
+        self._duracion_max = None
+        self.version += 1
+        for inicio, fin, _ in self._entradas:
+            self._actualizar_duracion_max(fin - inicio)
+
+    def agregar(self, inicio: Any, fin: Any, valor: Any):
+        """Inserta un intervalo manteniendo el orden por inicio"""
+        posicion = bisect_right(self._inicios, inicio)
+        self._inicios.insert(posicion, inicio)
+        self._entradas.insert(posicion, (inicio, fin, valor))
+        self._actualizar_duracion_max(fin - inicio)
+        self.version += 1
+
+    def eliminar(self, inicio: Any, valor: Any) -> bool:
+        """Elimina el intervalo de `valor` que empieza en `inicio`"""
+        posicion = bisect_left(self._inicios, inicio)
+        while posicion < len(self._inicios) and self._inicios[posicion] == inicio:
+            if self._entradas[posicion][2] is valor:
+                del self._inicios[posicion]
+                del self._entradas[posicion]
+                self.version += 1
+                return True
+            posicion += 1
+        return False
+
+    def solapados(self, inicio: Any, fin: Any) -> Iterator[Any]:
+        """Devuelve los valores cuyos intervalos se solapan con [inicio, fin)"""
+        if not self._entradas:
+            return
+        # La duración máxima no se reduce al eliminar: la ventana puede ser
+        # algo más ancha de lo necesario, pero nunca omite un solapamiento.
+        desde = bisect_left(self._inicios, inicio - self._duracion_max)
+        hasta = bisect_left(self._inicios, fin)
+        for posicion in range(desde, hasta):
+            _, fin_existente, valor = self._entradas[posicion]
+            if fin_existente > inicio:
+                yield valor
+
+    def intervalos_desde(self, instante: Any) -> Iterator[Tuple[Any, Any, Any]]:
+        """
+        Recorre en orden de inicio las entradas que pueden seguir abiertas en
+        `instante` o empezar después; las anteriores a la ventana se saltan
+        """
+        if not self._entradas:
+            return iter(())
+        desde = bisect_left(self._inicios, instante - self._duracion_max)
+        return islice(self._entradas, desde, None)
+
+    def cota_fin(self) -> Any:
+        """Instante a partir del cual ningún intervalo sigue abierto (None si está vacío)"""
+        if not self._entradas:
+            return None
+        return self._inicios[-1] + self._duracion_max
+
+    def posicion(self, instante: Any, desde_posicion: int = 0) -> int:
+        """Primera posición, a partir de `desde_posicion`, con inicio >= instante"""
+        return bisect_left(self._inicios, instante, desde_posicion)
+
+    def posicion_tras(self, instante: Any) -> int:
+        """Primera posición con inicio > instante"""
+        return bisect_right(self._inicios, instante)
+
+    def posicion_de(self, inicio: Any, valor: Any) -> Optional[int]:
+        """Posición de la entrada de `valor` que empieza en `inicio`, o None si no está"""
+        posicion = bisect_left(self._inicios, inicio)
+        while posicion < len(self._inicios) and self._inicios[posicion] == inicio:
+            if self._entradas[posicion][2] is valor:
+                return posicion
+            posicion += 1
+        return None
+
+    def entre_posiciones(self, desde: int, hasta: int) -> Iterator[Any]:
+        """Devuelve, en orden, los valores de las posiciones [desde, hasta)"""
+        for posicion in range(desde, hasta):
+            yield self._entradas[posicion][2]
+
+    def en_rango(self, desde: Any, hasta: Any) -> Iterator[Any]:
+        """Devuelve, en orden, los valores cuyo inicio está en [desde, hasta)"""
+        for posicion in range(bisect_left(self._inicios, desde),
+                              bisect_left(self._inicios, hasta)):
+            yield self._entradas[posicion][2]
+
+    def _actualizar_duracion_max(self, duracion: Any):
+        if self._duracion_max is None or duracion > self._duracion_max:
+            self._duracion_max = duracion
+
+
+class CursorTemporal:
+    """Puntero sobre un IndiceIntervalos que avanza con el reloj
+
+    Recuerda la posición de la última consulta. Mientras el índice no cambie
+    y el instante consultado no retroceda, la siguiente búsqueda parte de esa
+    posición en lugar de recorrer todo el índice.
+    """
+
+    def __init__(self, indice: IndiceIntervalos):
+        self._indice = indice
+        self._version = None
+        self._instante = None
+        self._posicion = 0
+
+    def ventana(self, desde: Any, hasta: Any) -> Tuple[int, int]:
+        """Posiciones [inicio, fin) de los intervalos que empiezan en [desde, hasta)"""
+        indice = self._indice
+        if (self._version == indice.version and self._instante is not None
+                and desde >= self._instante):
+            inicio = indice.posicion(desde, self._posicion)
+        else:
+            inicio = indice.posicion(desde)
+        self._version, self._instante, self._posicion = indice.version, desde, inicio
+        return inicio, indice.posicion(hasta, inicio)
+
+    def valores(self, desde: Any, hasta: Any) -> List[Any]:
+        """Valores cuyo inicio está en [desde, hasta), en orden"""
+        return list(self._indice.entre_posiciones(*self.ventana(desde, hasta)))
+
+    def contar(self, desde: Any, hasta: Any) -> int:
+        """Número de intervalos cuyo inicio está en [desde, hasta)"""
+        inicio, fin = self.ventana(desde, hasta)
+        return fin - inicio
+
+
+class EstadisticasEventos:
+    """Agregados de los eventos actualizados en O(1) con cada alta o baja"""
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Deja todos los contadores a cero"""
+        self.total = 0
+        self.por_estado: Dict[str, int] = {}
+        self.por_tipo: Dict[str, int] = {}
+        self.capacidad_total = 0
+        self.ingresos_totales = 0.0
+
+    def registrar(self, evento: Any):
+        """Suma el evento a los agregados"""
+        self._aplicar(evento, 1)
+
+    def retirar(self, evento: Any):
+        """Resta el evento de los agregados"""
+        self._aplicar(evento, -1)
+
+    def tipo_mas_comun(self) -> str:
+        """Tipo con más eventos, o "N/A" si no hay ninguno"""
+        return max(self.por_tipo, key=self.por_tipo.get) if self.por_tipo else "N/A"
+
+    def _aplicar(self, evento: Any, signo: int):
+        self.total += signo
+        self._contar(self.por_estado, evento.estado, signo)
+        self._contar(self.por_tipo, evento.tipo, signo)
+        self.capacidad_total += signo * evento.capacidad
+        self.ingresos_totales += signo * evento.obtener_ingresos_estimados()
+        if not self.total:
+            # Evita arrastrar el error de redondeo de sumas y restas sucesivas
+            self.ingresos_totales = 0.0
+
+    @staticmethod
+    def _contar(contador: Dict[str, int], clave: str, signo: int):
+        cuenta = contador.get(clave, 0) + signo
+        if cuenta:
+            contador[clave] = cuenta
+        else:
+            del contador[clave]
+
+
+def normalizar_texto(texto: str) -> str:
+    """Pasa a minúsculas y quita tildes para comparar textos"""
+    descompuesto = unicodedata.normalize('NFKD', str(texto).lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+class IndiceTexto:
+    """Índice invertido de trigramas y palabras sobre varios campos de texto
+
+    Las consultas de tres o más caracteres buscan subcadenas: se cruzan las
+    listas de trigramas y los candidatos se verifican contra el texto. Las
+    más cortas buscan prefijos de palabra con búsqueda binaria sobre el
+    vocabulario ordenado, o subcadenas recorriendo todos los textos si se
+    pide con subcadena=True. Cada campo tiene un peso para ordenar resultados.
+    """
+
+    def __init__(self, pesos: Sequence[int]):
+        self.pesos = tuple(pesos)
+        self._textos: Dict[Any, Tuple[str, ...]] = {}
+        # Orden de alta, para desempatar resultados con igual puntuación
+        self._orden: Dict[Any, int] = {}
+        self._contador = 0
+        self._trigramas: Dict[str, Set[Any]] = {}
+        self._palabras: Dict[str, Set[Any]] = {}
+        self._vocabulario: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def agregar(self, clave: Any, campos: Sequence[str]):
+        """Indexa los textos de `clave`, uno por campo en el orden de los pesos"""
+        textos = tuple(normalizar_texto(campo) for campo in campos)
+        self._textos[clave] = textos
+        self._orden[clave] = self._contador
+        self._contador += 1
+        for trigrama in self._trigramas_de(textos):
+            self._trigramas.setdefault(trigrama, set()).add(clave)
+        for palabra in self._palabras_de(textos):
+            claves = self._palabras.get(palabra)
+            if claves is None:
+                claves = self._palabras[palabra] = set()
+                insort(self._vocabulario, palabra)
+            claves.add(clave)
+
+    def eliminar(self, clave: Any):
+        """Retira `clave` del índice"""
+        textos = self._textos.pop(clave, None)
+        if textos is None:
+            return
+        del self._orden[clave]
+        for trigrama in self._trigramas_de(textos):
+            claves = self._trigramas[trigrama]
+            claves.discard(clave)
+            if not claves:
+                del self._trigramas[trigrama]
+        for palabra in self._palabras_de(textos):
+            claves = self._palabras[palabra]
+            claves.discard(clave)
+            if not claves:
+                del self._palabras[palabra]
+                del self._vocabulario[bisect_left(self._vocabulario, palabra)]
+
+    def vaciar(self):
+        """Elimina todas las entradas"""
+        self._textos.clear()
+        self._orden.clear()
+        self._trigramas.clear()
+        self._palabras.clear()
+        self._vocabulario.clear()
+
+    def buscar(self, consulta: str, campos: Optional[Sequence[int]] = None,
+               subcadena: bool = False) -> List[Any]:
+        """
+        Devuelve las claves que contienen `consulta`, sin repetir y de mayor
+        a menor relevancia
+
+        Args:
+            consulta (str): Texto buscado
+            campos (list): Posiciones de los campos en los que buscar (todos por defecto)
+            subcadena (bool): Buscar también las consultas de menos de tres
+                caracteres en cualquier parte del texto (recorriendo todas las
+                claves) en lugar de solo al principio de las palabras
+        """
+        consulta = normalizar_texto(consulta).strip()
+        if not consulta:
+            return []
+        campos = range(len(self.pesos)) if campos is None else campos
+
+        if len(consulta) >= 3:
+            candidatos = self._candidatos_por_trigramas(consulta)
+            coincide = lambda texto: consulta in texto
+        elif subcadena:
+            candidatos = self._textos
+            coincide = lambda texto: consulta in texto
+        else:
+            candidatos = self._candidatos_por_prefijo(consulta)
+            coincide = lambda texto: any(palabra.startswith(consulta)
+                                         for palabra in texto.split())
+
+        puntuadas = []
+        for clave in candidatos:
+            textos = self._textos[clave]
+            puntuacion = 0
+            for campo in campos:
+                texto = textos[campo]
+                if coincide(texto):
+                    puntuacion += self.pesos[campo]
+                    # Coincidir desde el principio del campo cuenta el doble
+                    if texto.startswith(consulta):
+                        puntuacion += self.pesos[campo]
+            if puntuacion:
+                puntuadas.append((-puntuacion, self._orden[clave], clave))
+        puntuadas.sort(key=lambda entrada: entrada[:2])
+        return [clave for _, _, clave in puntuadas]
+
+    def candidatos(self, consulta: str) -> Optional[Set[Any]]:
+        """
+        Claves que pueden contener `consulta` como subcadena en algún campo
+        (hay que verificarlas), o None si es demasiado corta para acotarlas
+        """
+        consulta = normalizar_texto(consulta).strip()
+        if len(consulta) < 3:
+            return None
+        return self._candidatos_por_trigramas(consulta)
+
+    def _candidatos_por_trigramas(self, consulta: str) -> Set[Any]:
+        listas = []
+        for posicion in range(len(consulta) - 2):
+            claves = self._trigramas.get(consulta[posicion:posicion + 3])
+            if not claves:
+                return set()
+            listas.append(claves)
+        listas.sort(key=len)
+        return set(listas[0]).intersection(*listas[1:])
+
+    def _candidatos_por_prefijo(self, prefijo: str) -> Set[Any]:
+        candidatos: Set[Any] = set()
+        posicion = bisect_left(self._vocabulario, prefijo)
+        while (posicion < len(self._vocabulario) and
+               self._vocabulario[posicion].startswith(prefijo)):
+            candidatos.update(self._palabras[self._vocabulario[posicion]])
+            posicion += 1
+        return candidatos
+
+    @staticmethod
+    def _trigramas_de(textos: Sequence[str]) -> Set[str]:
+        return {texto[posicion:posicion + 3]
+                for texto in textos for posicion in range(len(texto) - 2)}
+
+    @staticmethod
+    def _palabras_de(textos: Sequence[str]) -> Set[str]:
+        return {palabra for texto in textos for palabra in texto.split()}
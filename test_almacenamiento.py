@@ -0,0 +1,455 @@
+# test_almacenamiento.py
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from Events import Evento, GestorEventos
+from almacenamiento import (Almacenamiento, AlmacenamientoBinario, AlmacenamientoDiario,
+                            AlmacenamientoJSON, AlmacenamientoPorTemporadas,
+                            AlmacenamientoSQLite, EscrituraDiferida)
+
+AHORA = datetime(2026, 10, 18, 12, 0)
+
+
+def reloj():
+    return AHORA
+
+
+def nuevo_evento(nombre, fecha, hora="10:00", ubicacion="Museo FC Barcelona"):
+    return dict(nombre=nombre, fecha=fecha, hora=hora, duracion=1,
+                tipo="Visita Guiada", ubicacion=ubicacion)
+
+
+class TestAlmacenamientoDiario(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = os.path.join(directorio, "eventos.json")
+
+    def gestor(self, max_registros=1000):
+        gestor = GestorEventos(almacenamiento=AlmacenamientoDiario(self.ruta, max_registros),
+                               reloj=reloj)
+        self.addCleanup(gestor.almacenamiento.cerrar)
+        return gestor
+
+    def estado(self, gestor):
+        return sorted((evento.id, evento.hora, evento.estado) for evento in gestor.eventos)
+
+    def test_reproduce_altas_cambios_y_bajas(self):
+        gestor = self.gestor()
+        gestor.crear_evento(**nuevo_evento("Uno", "20/10/2026"))
+        dos = gestor.crear_evento(**nuevo_evento("Dos", "21/10/2026"))
+        tres = gestor.crear_evento(**nuevo_evento("Tres", "22/10/2026"))
+        gestor.actualizar_evento(dos.id, hora="12:00")
+        gestor.cambiar_estado_eventos([dos.id], "cancelado")
+        gestor.eliminar_evento(tres.id)
+        gestor.almacenamiento.cerrar()
+
+        self.assertFalse(os.path.exists(self.ruta))
+        self.assertEqual(self.estado(self.gestor()), self.estado(gestor))
+
+    def test_descarta_la_ultima_linea_incompleta(self):
+        gestor = self.gestor()
+        gestor.crear_evento(**nuevo_evento("Uno", "20/10/2026"))
+        gestor.almacenamiento.cerrar()
+        with open(f"{self.ruta}.log", 'a', encoding='utf-8') as diario:
+            diario.write('{"op": "alta", "id": "cort')
+
+        self.assertEqual([evento.nombre for evento in self.gestor().eventos], ["Uno"])
+        with open(f"{self.ruta}.log", encoding='utf-8') as diario:
+            self.assertTrue(diario.read().endswith("}\n"))
+
+    def test_compacta_el_diario(self):
+        gestor = self.gestor(max_registros=3)
+        for dia in range(20, 25):
+            gestor.crear_evento(**nuevo_evento(f"E{dia}", f"{dia}/10/2026"))
+        gestor.almacenamiento.cerrar()
+
+        with open(f"{self.ruta}.log", encoding='utf-8') as diario:
+            self.assertEqual(len(diario.readlines()), 2)
+        self.assertEqual(self.estado(self.gestor()), self.estado(gestor))
+
+
+class TestAlmacenamientoBinario(unittest.TestCase):
+
+    def test_ida_y_vuelta(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ruta = os.path.join(directorio, "eventos.bin")
+        eventos = [
+            Evento(**nuevo_evento("Barça - Madrid ⚽", "19/10/2026", "21:00"),
+                   capacidad=90000, precio_base=79.5, descripcion="Clásico"),
+            Evento(**nuevo_evento("Visita", "20/10/2026"), estado="cancelado",
+                   organizador="Fundació"),
+            Evento(**nuevo_evento("Sin fecha", "pendiente", "??")),
+        ]
+        AlmacenamientoBinario(ruta).guardar(eventos)
+
+        leidos = AlmacenamientoBinario(ruta).cargar_eventos()
+        self.assertEqual([evento.to_dict() for evento in leidos],
+                         [evento.to_dict() for evento in eventos])
+        self.assertEqual([(evento.minuto_inicio, evento.minuto_fin) for evento in leidos],
+                         [(evento.minuto_inicio, evento.minuto_fin) for evento in eventos])
+
+
+class TestAlmacenamientoPorTemporadas(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+
+    def gestor(self):
+        almacenamiento = AlmacenamientoPorTemporadas(self.directorio, reloj=reloj)
+        return GestorEventos(almacenamiento=almacenamiento, reloj=reloj)
+
+    def ids_en_disco(self):
+        gestor = self.gestor()
+        gestor.cargar_historico()
+        return sorted(evento.id for evento in gestor.eventos)
+
+    def test_carga_las_temporadas_historicas_al_consultarlas(self):
+        gestor = self.gestor()
+        for fecha in ("10/09/2020", "10/09/2021", "20/10/2026"):
+            gestor.crear_evento(**nuevo_evento(f"E {fecha}", fecha))
+
+        gestor = self.gestor()
+        self.assertEqual([evento.fecha for evento in gestor.eventos], ["20/10/2026"])
+        self.assertEqual([evento.fecha for evento in gestor.obtener_eventos_por_mes(2021, 9)],
+                         ["10/09/2021"])
+        self.assertEqual(gestor.almacenamiento.temporadas_cargadas, ["2021-22", "2026-27"])
+        # Un choque con un evento histórico se detecta aunque no estuviera cargado
+        self.assertIsNone(gestor.crear_evento(**nuevo_evento("Choque", "10/09/2020")))
+        self.assertEqual(gestor.almacenamiento.temporadas_cargadas,
+                         ["2020-21", "2021-22", "2026-27"])
+        self.assertEqual(len(gestor.eventos), 3)
+
+    def test_temporada_nueva_no_se_recarga_duplicada(self):
+        self.gestor().crear_evento(**nuevo_evento("Actual", "20/10/2026"))
+        gestor = self.gestor()
+        self.assertEqual(gestor.almacenamiento.temporadas_cargadas, ["2026-27"])
+
+        primero = gestor.crear_evento(**nuevo_evento("Prox1", "10/08/2027"))
+        segundo = gestor.crear_evento(**nuevo_evento("Prox2", "11/08/2027"))
+        # Consultas que pasan por cargar_rango sobre la temporada recién escrita
+        gestor.obtener_eventos_en_rango(datetime(2027, 7, 1), datetime(2028, 7, 1))
+        gestor.cargar_historico()
+
+        self.assertEqual(sorted(evento.id for evento in gestor.eventos),
+                         sorted(["actual_20102026_1000", primero.id, segundo.id]))
+        self.assertEqual(gestor.obtener_estadisticas()['total_eventos'], 3)
+
+    def test_baja_y_cambio_de_id_entre_temporadas(self):
+        gestor = self.gestor()
+        borrado = gestor.crear_evento(**nuevo_evento("Borrado", "10/08/2027"))
+        movido = gestor.crear_evento(**nuevo_evento("Movido", "12/08/2027"))
+        gestor.obtener_eventos_en_rango(datetime(2027, 7, 1), datetime(2028, 7, 1))
+
+        self.assertTrue(gestor.eliminar_evento(borrado.id))
+        # Cambia de ID y pasa de la temporada 2027-28 a la 2028-29
+        self.assertTrue(gestor.actualizar_evento(movido.id, id="movido_nuevo",
+                                                 fecha="12/08/2028"))
+        gestor.cargar_historico()
+
+        self.assertEqual([evento.id for evento in gestor.eventos], ["movido_nuevo"])
+        self.assertEqual(self.ids_en_disco(), ["movido_nuevo"])
+        self.assertEqual(sorted(os.listdir(self.directorio)),
+                         ["duraciones.json", "eventos_2027-28.json", "eventos_2028-29.json"])
+
+    def test_escribir_en_temporada_historica_sin_cargar_conserva_sus_eventos(self):
+        antiguo = Evento(**nuevo_evento("Antiguo", "10/09/2020"))
+        AlmacenamientoPorTemporadas(self.directorio, reloj=reloj).guardar([antiguo])
+
+        almacenamiento = AlmacenamientoPorTemporadas(self.directorio, reloj=reloj)
+        self.assertEqual(almacenamiento.cargar_eventos(), [])
+        nuevo = Evento(**nuevo_evento("Nuevo", "11/09/2020"))
+        almacenamiento.registrar_cambios([('alta', nuevo.id, nuevo)], lambda: [nuevo])
+
+        # El guardado sigue en el archivo y se entrega una sola vez
+        entregados = almacenamiento.cargar_rango(0, 10 ** 9)
+        self.assertEqual([evento.id for evento in entregados], [antiguo.id])
+        self.assertEqual(almacenamiento.cargar_rango(0, 10 ** 9), [])
+
+        # Dar de baja el nuevo no resucita nada ni pierde el antiguo
+        almacenamiento.registrar_cambios([('baja', nuevo.id, None)], lambda: entregados)
+        self.assertEqual(self.ids_en_disco(), [antiguo.id])
+
+    def test_choque_con_evento_largo_de_temporada_sin_cargar(self):
+        # Empieza en la temporada anterior y dura tres días
+        largo = dict(nuevo_evento("Montaje", "29/06/2026", hora="20:00"), duracion=72)
+        self.assertIsNotNone(self.gestor().crear_evento(**largo))
+
+        choque = nuevo_evento("Choque", "02/07/2026")
+        self.assertIsNone(self.gestor().crear_evento(**choque))
+        # Sin duraciones anotadas (directorios antiguos) se carga la temporada entera
+        os.remove(os.path.join(self.directorio, "duraciones.json"))
+        gestor = self.gestor()
+        self.assertIsNone(gestor.crear_evento(**choque))
+        self.assertIn("2025-26", gestor.almacenamiento.temporadas_cargadas)
+
+    def test_busquedas_y_estadisticas_con_historico_sin_cargar(self):
+        self.gestor().crear_evento(**nuevo_evento("Final Antigua", "10/09/2020"))
+        gestor = self.gestor()
+        estadisticas = gestor.obtener_estadisticas()
+        self.assertEqual(estadisticas['total_eventos'], 0)
+        self.assertEqual(estadisticas['temporadas_sin_cargar'], ["2020-21"])
+
+        self.assertEqual([evento.nombre for evento in gestor.buscar_texto("final")],
+                         ["Final Antigua"])
+        self.assertEqual(len(gestor.buscar_por_tipo("visita guiada")), 1)
+        estadisticas = gestor.obtener_estadisticas()
+        self.assertEqual(estadisticas['total_eventos'], 1)
+        self.assertEqual(estadisticas['temporadas_sin_cargar'], [])
+
+    def test_estadisticas_con_historico_cargan_las_temporadas(self):
+        self.gestor().crear_evento(**nuevo_evento("Antiguo", "10/09/2020"))
+        self.gestor().crear_evento(**nuevo_evento("Actual", "20/10/2026"))
+        estadisticas = self.gestor().obtener_estadisticas(historico=True)
+        self.assertEqual(estadisticas['total_eventos'], 2)
+        self.assertEqual(estadisticas['temporadas_sin_cargar'], [])
+
+
+class TestAlmacenamientoSQLite(unittest.TestCase):
+    """Las consultas resueltas en SQL coinciden con las del gestor en memoria"""
+
+    EVENTOS = [
+        dict(nombre="Barça - Madrid", fecha="19/10/2026", hora="21:00", duracion=2,
+             tipo="Partido de Liga", ubicacion="Tribuna Principal", capacidad=90000,
+             precio_base=80),
+        dict(nombre="Visita Museo", fecha="19/10/2026", hora="10:00", duracion=1,
+             tipo="Visita Guiada", ubicacion="Museo FC Barcelona", capacidad=50,
+             precio_base=25),
+        dict(nombre="Gala Fundació", fecha="03/11/2026", hora="20:00", duracion=3,
+             tipo="Gala", ubicacion="Palco VIP", capacidad=300, estado="cancelado"),
+        dict(nombre="Concierto", fecha="sin fecha", hora="20:00", duracion=3,
+             tipo="Concierto", ubicacion="Gol Norte", capacidad=1000),
+    ]
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.sql = GestorEventos(almacenamiento=AlmacenamientoSQLite(":memory:"), reloj=reloj)
+        self.memoria = GestorEventos(
+            almacenamiento=AlmacenamientoJSON(os.path.join(directorio, "eventos.json")),
+            reloj=reloj)
+        for gestor in (self.sql, self.memoria):
+            for datos in self.EVENTOS:
+                gestor.agregar_evento(Evento(**datos))
+
+    def test_filtrar_en_sql(self):
+        casos = [('nombre', 'barca'), ('nombre', 'FUNDACIO'), ('tipo', 'gala'),
+                 ('fecha', '19/10/2026'), ('ubicacion', 'museo'), ('estado', 'Cancelado'),
+                 ('organizador', 'x')]
+        with mock.patch.object(GestorEventos, '_filtrar', side_effect=AssertionError):
+            resultados = [self.sql.filtrar_eventos(*caso) for caso in casos]
+        for caso, filas in zip(casos, resultados):
+            esperadas = self.memoria.filtrar_eventos(*caso)
+            self.assertEqual(sorted(fila['id'] for fila in filas),
+                             sorted(fila['id'] for fila in esperadas), caso)
+
+    def test_eventos_por_mes_en_sql(self):
+        with mock.patch.object(GestorEventos, 'obtener_eventos_en_rango',
+                               side_effect=AssertionError):
+            eventos = self.sql.obtener_eventos_por_mes(2026, 10)
+        self.assertEqual([evento.nombre for evento in eventos], ["Visita Museo", "Barça - Madrid"])
+        self.assertEqual([evento.id for evento in self.memoria.obtener_eventos_por_mes(2026, 10)],
+                         [evento.id for evento in eventos])
+
+    def test_estadisticas_en_sql(self):
+        self.sql.crear_serie(nombre="Tour", fecha="01/10/2026", hora="18:00", duracion=1,
+                             tipo="Visita Guiada", ubicacion="Zona Mixta")
+        self.memoria.crear_serie(nombre="Tour", fecha="01/10/2026", hora="18:00", duracion=1,
+                                 tipo="Visita Guiada", ubicacion="Zona Mixta")
+        calculadas = self.sql.obtener_estadisticas()
+        esperadas = self.memoria.obtener_estadisticas()
+        self.assertAlmostEqual(calculadas.pop('ingresos_totales'),
+                               esperadas.pop('ingresos_totales'))
+        self.assertEqual(calculadas, esperadas)
+        self.assertEqual(calculadas['eventos_proximos'], 4)
+
+
+class TestAlmacenamientoSQLiteBajoDemanda(unittest.TestCase):
+    """Con reloj, las temporadas anteriores a la actual se cargan al consultarlas"""
+
+    FECHAS = ("10/09/2020", "10/09/2021", "20/10/2026")
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = os.path.join(directorio, "eventos.db")
+        gestor = self.gestor()
+        for fecha in self.FECHAS:
+            gestor.crear_evento(**nuevo_evento(f"E {fecha}", fecha))
+        # Empieza en la temporada anterior y dura tres días
+        gestor.crear_evento(**dict(nuevo_evento("Montaje", "29/06/2026", hora="20:00"),
+                                   duracion=72))
+
+    def gestor(self):
+        gestor = GestorEventos(almacenamiento=AlmacenamientoSQLite(self.ruta, reloj=reloj),
+                               reloj=reloj)
+        self.addCleanup(gestor.cerrar)
+        return gestor
+
+    def test_estadisticas_sin_construir_el_historico(self):
+        gestor = self.gestor()
+        self.assertEqual([evento.fecha for evento in gestor.eventos], ["20/10/2026"])
+        self.assertEqual(gestor.almacenamiento.temporadas_sin_cargar(),
+                         ["2020-21", "2021-22", "2025-26"])
+        with mock.patch.object(Evento, 'from_dict', side_effect=AssertionError):
+            estadisticas = gestor.obtener_estadisticas(historico=True)
+        self.assertEqual(estadisticas['total_eventos'], 4)
+        self.assertEqual(estadisticas['temporadas_sin_cargar'], [])
+        self.assertEqual(len(gestor.eventos), 1)
+
+    def test_consultas_cargan_las_temporadas_de_sus_filas(self):
+        gestor = self.gestor()
+        filas = gestor.filtrar_eventos('fecha', "10/09/2021")
+        self.assertEqual(len(filas), 1)
+        self.assertTrue(gestor.actualizar_evento(filas[0]['id'], hora="11:00"))
+        eventos = gestor.obtener_eventos_por_mes(2020, 9)
+        self.assertEqual(len(eventos), 1)
+        self.assertIs(eventos[0], gestor.buscar_por_id(eventos[0].id))
+        self.assertEqual(gestor.almacenamiento.temporadas_sin_cargar(), ["2025-26"])
+
+    def test_choque_con_evento_largo_sin_cargar(self):
+        self.assertIsNone(self.gestor().crear_evento(**nuevo_evento("Choque", "02/07/2026")))
+
+    def test_escrituras_conservan_lo_no_cargado_sin_duplicarlo(self):
+        gestor = self.gestor()
+        actual = gestor.eventos[0]
+        self.assertTrue(gestor.actualizar_evento(actual.id, fecha="15/09/2021"))
+        self.assertTrue(gestor.guardar_eventos())
+        gestor.cargar_historico()
+        self.assertEqual(len(gestor.eventos), 4)
+
+        gestor = self.gestor()
+        gestor.cargar_historico()
+        self.assertEqual(sorted(evento.fecha for evento in gestor.eventos),
+                         ["10/09/2020", "10/09/2021", "15/09/2021", "29/06/2026"])
+
+    def test_escritura_diferida_no_pasa_las_consultas(self):
+        escritura = EscrituraDiferida(AlmacenamientoSQLite(self.ruta, reloj=reloj))
+        self.addCleanup(escritura.cerrar)
+        self.assertIsNone(escritura.filtrar('fecha', "10/09/2021"))
+        self.assertIsNone(escritura.estadisticas(0, 1))
+
+
+class DestinoQueFalla(Almacenamiento):
+    """Destino que registra las tandas recibidas y falla mientras `fallos` > 0"""
+
+    def __init__(self, fallos):
+        super().__init__("destino")
+        self.fallos = fallos
+        self.tandas = []
+        self.nombres = []
+        self.cerrado = False
+
+    def registrar_cambios(self, cambios, eventos):
+        if self.fallos:
+            self.fallos -= 1
+            raise OSError("disco lleno")
+        self.tandas.append([evento_id for _, evento_id, _ in cambios])
+        self.nombres.append(([evento.nombre for _, _, evento in cambios if evento],
+                             [evento.nombre for evento in eventos()]))
+
+    def cerrar(self):
+        self.cerrado = True
+
+
+class TemporadasLentas(AlmacenamientoPorTemporadas):
+    """Destino por temporadas cuyas escrituras tardan `pausa` segundos"""
+
+    def __init__(self, directorio, pausa):
+        super().__init__(directorio, reloj=reloj)
+        self.pausa = pausa
+        self.escribiendo = threading.Event()
+
+    def registrar_cambios(self, cambios, eventos):
+        self.escribiendo.set()
+        time.sleep(self.pausa)
+        super().registrar_cambios(cambios, eventos)
+
+
+class TestEscrituraDiferida(unittest.TestCase):
+
+    def test_tanda_fallida_vuelve_a_la_cola(self):
+        destino = DestinoQueFalla(fallos=1)
+        escritura = EscrituraDiferida(destino, retardo=0.01)
+        escritura.registrar_cambios([('baja', 'a', None)], list)
+        with self.assertRaises(OSError):
+            escritura.vaciar()
+        escritura.registrar_cambios([('baja', 'b', None)], list)
+        escritura.vaciar()
+        escritura.cerrar()
+        self.assertEqual(destino.tandas, [['a', 'b']])
+        self.assertTrue(destino.cerrado)
+
+    def test_cerrar_informa_del_fallo(self):
+        destino = DestinoQueFalla(fallos=10 ** 6)
+        gestor = GestorEventos(almacenamiento=EscrituraDiferida(destino, retardo=0.01),
+                               reloj=reloj)
+        gestor.crear_evento(**nuevo_evento("Perdido", "20/10/2026"))
+        self.assertFalse(gestor.cerrar())
+        self.assertEqual(destino.tandas, [])
+        self.assertTrue(destino.cerrado)
+
+    def test_escribe_los_eventos_como_estaban_al_registrarlos(self):
+        destino = DestinoQueFalla(fallos=0)
+        escritura = EscrituraDiferida(destino, retardo=0.05)
+        self.addCleanup(escritura.cerrar)
+        evento = Evento(**nuevo_evento("Original", "20/10/2026"))
+        escritura.registrar_cambios([('alta', evento.id, evento)], lambda: [evento])
+        evento.nombre = "Cambiado sin registrar"
+        escritura.vaciar()
+        self.assertEqual(destino.nombres, [(["Original"], ["Original"])])
+
+    def test_cargar_una_temporada_antes_de_escribir_en_ella_no_pierde_eventos(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        gestor = GestorEventos(almacenamiento=AlmacenamientoPorTemporadas(directorio, reloj=reloj),
+                               reloj=reloj)
+        gestor.crear_evento(**nuevo_evento("Antiguo", "10/09/2020"))
+        actual = gestor.crear_evento(**nuevo_evento("Actual", "20/10/2026"))
+
+        destino = AlmacenamientoPorTemporadas(directorio, reloj=reloj)
+        gestor = GestorEventos(almacenamiento=EscrituraDiferida(destino, retardo=10),
+                               reloj=reloj)
+        # Se mueve a la temporada sin cargar y esta se carga antes de escribir
+        self.assertTrue(gestor.actualizar_evento(actual.id, fecha="11/09/2020"))
+        gestor.cargar_historico()
+        self.assertTrue(gestor.cerrar())
+
+        gestor = GestorEventos(almacenamiento=AlmacenamientoPorTemporadas(directorio, reloj=reloj),
+                               reloj=reloj)
+        gestor.cargar_historico()
+        self.assertEqual(sorted(evento.nombre for evento in gestor.eventos), ["Actual", "Antiguo"])
+
+    def test_crear_y_estadisticas_no_esperan_a_una_escritura_lenta(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        gestor = GestorEventos(almacenamiento=AlmacenamientoPorTemporadas(directorio, reloj=reloj),
+                               reloj=reloj)
+        gestor.crear_evento(**nuevo_evento("Histórico", "10/09/2020"))
+
+        destino = TemporadasLentas(directorio, pausa=1.0)
+        gestor = GestorEventos(almacenamiento=EscrituraDiferida(destino, retardo=0),
+                               reloj=reloj)
+        self.addCleanup(gestor.cerrar)
+        gestor.crear_evento(**nuevo_evento("Primero", "20/10/2026"))
+        self.assertTrue(destino.escribiendo.wait(1))
+
+        comienzo = time.monotonic()
+        self.assertIsNotNone(gestor.crear_evento(**nuevo_evento("Segundo", "21/10/2026")))
+        estadisticas = gestor.obtener_estadisticas()
+        self.assertLess(time.monotonic() - comienzo, 0.5)
+        self.assertEqual(estadisticas['total_eventos'], 2)
+        self.assertEqual(estadisticas['temporadas_sin_cargar'], ["2020-21"])
+
+
+if __name__ == "__main__":
+    unittest.main()
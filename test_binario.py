@@ -0,0 +1,72 @@
+# test_binario.py
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import binario
+from Events import Evento, GestorEventos, a_minutos
+from almacenamiento import AlmacenamientoBinario
+
+
+def reloj():
+    return datetime(2026, 10, 18, 12, 0)
+
+
+class TestVistaEventos(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = os.path.join(directorio, "eventos.bin")
+        self.gestor = GestorEventos(almacenamiento=AlmacenamientoBinario(self.ruta), reloj=reloj)
+        for dia, tipo, capacidad in ((19, "Partido de Liga", 90000), (20, "Visita Guiada", 50),
+                                     (21, "Visita Guiada", 60), (30, "Gala", 300)):
+            self.gestor.crear_evento(nombre=f"{tipo} {dia}", fecha=f"{dia}/10/2026",
+                                     hora="10:00", duracion=2, tipo=tipo,
+                                     ubicacion="Palco VIP", capacidad=capacidad, precio_base=10)
+        self.gestor.crear_evento(nombre="Sin fecha", fecha="pendiente", hora="10:00", duracion=1,
+                                 tipo="Gala", ubicacion="Palco VIP", estado="cancelado")
+        self.vista = GestorEventos.abrir_archivo_binario(self.ruta)
+        self.addCleanup(self.vista.cerrar)
+
+    def test_registros_sueltos(self):
+        self.assertEqual(len(self.vista), 5)
+        self.assertEqual([registro.to_dict() for registro in self.vista],
+                         [evento.to_dict() for evento in self.gestor.eventos])
+        self.assertEqual(self.vista[-1].nombre, "Sin fecha")
+        self.assertIsNone(self.vista[-1].minuto_inicio)
+        self.assertEqual(self.vista[0].minuto_inicio, a_minutos(datetime(2026, 10, 19, 10, 0)))
+        self.assertIsInstance(self.vista[1].a_evento(), Evento)
+        with self.assertRaises(IndexError):
+            self.vista[5]
+
+    def test_columnas_y_filtros(self):
+        self.assertEqual(list(self.vista.columna('capacidad')), [90000, 50, 60, 300, 0])
+        self.assertEqual(list(self.vista.columnas('estado', 'capacidad'))[-1], ('cancelado', 0))
+        self.assertEqual([registro.nombre for registro in
+                          self.vista.filtrar(tipo="Visita Guiada", capacidad=lambda c: c > 55)],
+                         ["Visita Guiada 21"])
+        self.assertEqual(self.vista.contar_por('tipo'),
+                         {"Partido de Liga": 1, "Visita Guiada": 2, "Gala": 2})
+        self.assertEqual(self.vista.sumar('capacidad'), 90410)
+
+    def test_estadisticas_como_el_gestor(self):
+        desde, hasta = self.gestor._ventana_proximos()
+        calculadas = self.vista.estadisticas(desde, hasta)
+        esperadas = self.gestor.obtener_estadisticas()
+        del esperadas['temporadas_sin_cargar']
+        self.assertAlmostEqual(calculadas.pop('ingresos_totales'),
+                               esperadas.pop('ingresos_totales'))
+        self.assertEqual(calculadas, esperadas)
+
+    def test_firma_no_valida(self):
+        with open(self.ruta, 'r+b') as archivo:
+            archivo.write(b"XXXX")
+        with self.assertRaises(ValueError):
+            binario.leer_eventos(self.ruta)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+# test_consultas.py
+import unittest
+from datetime import datetime
+
+from Events import GestorEventos
+from almacenamiento import AlmacenamientoSQLite
+from consultas import Contiene, Igual, O, Rango
+
+
+class TestConsulta(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = GestorEventos(almacenamiento=AlmacenamientoSQLite(":memory:"),
+                                    reloj=lambda: datetime(2026, 10, 18, 12, 0))
+        tipos = ["Visita Guiada", "Concierto", "Gala"]
+        for dia in range(1, 29):
+            self.gestor.crear_evento(nombre=f"Evento {dia}", fecha=f"{dia:02d}/11/2026",
+                                     hora="10:00", duracion=1, tipo=tipos[dia % 3],
+                                     ubicacion="Palco VIP", capacidad=dia * 100,
+                                     estado="cancelado" if dia % 5 == 0 else "programado")
+
+    def comprobar(self, predicado):
+        """La consulta devuelve lo mismo que evaluar el predicado en todos los eventos"""
+        esperados = {evento.id for evento in self.gestor.eventos if predicado.cumple(evento)}
+        self.assertEqual({evento.id for evento in self.gestor.consultar(predicado)}, esperados)
+        return esperados
+
+    def test_plan_elige_el_indice_mas_selectivo(self):
+        self.assertEqual(self.gestor.consultar().plan(), "recorrido completo")
+        self.assertEqual(self.gestor.consultar(Igual('id', "evento 3_03112026_1000")).plan(),
+                         "búsqueda por id")
+        rango = Rango('fecha', desde="03/11/2026", hasta="05/11/2026")
+        self.assertEqual(self.gestor.consultar(Igual('tipo', 'Gala') & rango).plan(),
+                         "índice horario")
+        self.assertEqual(self.gestor.consultar(Contiene('nombre', "evento 1")).plan(),
+                         "índice de texto")
+        self.assertTrue(self.gestor.consultar(Igual('estado', 'cancelado') | rango)
+                        .plan().startswith("unión de"))
+        self.assertEqual(self.gestor.consultar(Rango('capacidad', desde=500)).plan(),
+                         "recorrido completo")
+
+    def test_resultados_como_recorrido_completo(self):
+        rango = Rango('fecha', desde=datetime(2026, 11, 10), hasta="20/11/2026")
+        self.assertEqual(len(self.comprobar(rango)), 10)
+        self.assertEqual(len(self.comprobar(Igual('tipo', 'Gala') & rango)), 3)
+        self.comprobar(Igual('estado', 'cancelado') | Contiene('nombre', "evento 2"))
+        self.comprobar(O(Igual('tipo', 'Concierto'), Rango('capacidad', hasta=400)))
+        self.assertEqual(self.comprobar(Contiene('nombre', "no existe")), set())
+
+    def test_orden_y_limite(self):
+        consulta = self.gestor.consultar(Igual('estado', 'programado'))
+        mayores = consulta.ordenar_por('capacidad', descendente=True).limite(3)
+        self.assertEqual([evento.capacidad for evento in mayores], [2800, 2700, 2600])
+        primeros = self.gestor.consultar().ordenar_por('fecha').limite(2).filas()
+        self.assertEqual([fila['fecha'] for fila in primeros], ["01/11/2026", "02/11/2026"])
+        self.assertEqual(self.gestor.consultar(Igual('tipo', 'Gala')).limite(4).contar(), 4)
+
+    def test_campos_no_validos(self):
+        with self.assertRaises(ValueError):
+            self.gestor.consultar().ordenar_por('inexistente')
+        with self.assertRaises(ValueError):
+            Rango('nombre', desde="a")
+
+
+if __name__ == "__main__":
+    unittest.main()
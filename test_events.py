@@ -0,0 +1,406 @@
+# test_events.py
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime
+from unittest import mock
+
+from Events import Evento, GestorEventos
+from almacenamiento import AlmacenamientoSQLite
+
+MUSEO = "Museo FC Barcelona"
+
+
+def gestor_en_memoria():
+    return GestorEventos(almacenamiento=AlmacenamientoSQLite(":memory:"),
+                         reloj=lambda: datetime(2027, 1, 1, 9, 0))
+
+
+def datos_evento(nombre, fecha, hora, duracion=1, tipo="Visita Guiada", ubicacion=MUSEO):
+    return dict(nombre=nombre, fecha=fecha, hora=hora, duracion=duracion,
+                tipo=tipo, ubicacion=ubicacion)
+
+
+class TestConflictos(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+        self.visita = self.gestor.crear_evento(**datos_evento("Visita", "05/01/2027", "10:00",
+                                                              duracion=2))
+
+    def choca(self, **datos):
+        return self.gestor.verificar_conflicto_horario(Evento(**datos_evento(**datos)))
+
+    def test_solapamiento_en_la_misma_ubicacion(self):
+        self.assertTrue(self.choca(nombre="B", fecha="05/01/2027", hora="11:30"))
+        self.assertTrue(self.choca(nombre="B", fecha="05/01/2027", hora="09:30"))
+        self.assertIsNone(self.gestor.crear_evento(**datos_evento("B", "05/01/2027", "11:00")))
+        self.assertEqual(len(self.gestor.eventos), 1)
+
+    def test_intervalos_contiguos_no_chocan(self):
+        self.assertFalse(self.choca(nombre="B", fecha="05/01/2027", hora="12:00"))
+        self.assertFalse(self.choca(nombre="B", fecha="05/01/2027", hora="09:00"))
+
+    def test_otra_ubicacion_no_choca_salvo_exclusivos(self):
+        self.assertFalse(self.choca(nombre="B", fecha="05/01/2027", hora="10:00",
+                                    ubicacion="Palco VIP"))
+        self.assertTrue(self.choca(nombre="Partido", fecha="05/01/2027", hora="11:00",
+                                   tipo="Partido de Liga", ubicacion="Tribuna Principal"))
+
+    def test_baja_y_cambio_liberan_el_horario(self):
+        self.assertTrue(self.gestor.actualizar_evento(self.visita.id, hora="15:00"))
+        self.assertFalse(self.choca(nombre="B", fecha="05/01/2027", hora="10:00"))
+        self.assertTrue(self.choca(nombre="B", fecha="05/01/2027", hora="16:00"))
+        self.assertTrue(self.gestor.eliminar_evento(self.visita.id))
+        self.assertFalse(self.choca(nombre="B", fecha="05/01/2027", hora="16:00"))
+
+    def test_ocurrencias_de_series(self):
+        self.gestor.crear_serie(**datos_evento("Tour", "01/01/2027", "18:00"))
+        self.assertTrue(self.choca(nombre="B", fecha="20/03/2027", hora="18:30"))
+        self.assertFalse(self.choca(nombre="B", fecha="20/03/2027", hora="19:00"))
+
+    def test_coincide_con_busqueda_exhaustiva(self):
+        for hora in range(8, 20, 3):
+            self.gestor.crear_evento(**datos_evento(f"E{hora}", "06/01/2027", f"{hora:02d}:15",
+                                                    duracion=1.5))
+        for minuto in range(7 * 60, 21 * 60, 20):
+            nuevo = Evento(**datos_evento("N", "06/01/2027",
+                                          f"{minuto // 60:02d}:{minuto % 60:02d}"))
+            esperados = {evento.id for evento in self.gestor.eventos
+                         if evento.minuto_inicio < nuevo.minuto_fin
+                         and nuevo.minuto_inicio < evento.minuto_fin}
+            self.assertEqual({evento.id for evento in self.gestor.obtener_conflictos(nuevo)},
+                             esperados, minuto)
+
+    def test_auditar_conflictos_guardados(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        almacenamiento = AlmacenamientoSQLite(os.path.join(directorio, "eventos.db"))
+        # Datos escritos sin pasar por el control de conflictos
+        almacenamiento.guardar([Evento(**datos_evento("A", "05/01/2027", "10:00", duracion=2)),
+                                Evento(**datos_evento("B", "05/01/2027", "11:00")),
+                                Evento(**datos_evento("C", "05/01/2027", "12:00"))])
+        gestor = GestorEventos(almacenamiento=almacenamiento,
+                               reloj=lambda: datetime(2027, 1, 1, 9, 0))
+        conflictos = gestor.auditar_conflictos()
+        self.assertEqual([(a.nombre, b.nombre) for a, b in conflictos[MUSEO]], [("A", "B")])
+
+
+class TestActualizarEvento(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+        self.evento = self.gestor.crear_evento(**datos_evento("Visita", "05/01/2027", "10:00"),
+                                               capacidad=50)
+
+    def comprobar_indexado(self, capacidad):
+        self.assertEqual(self.gestor.obtener_estadisticas()['capacidad_total'], capacidad)
+        self.assertEqual(self.gestor.buscar_por_tipo("Visita Guiada"), [self.evento])
+        self.assertEqual(self.gestor.buscar_texto("visita"), [self.evento])
+        self.assertTrue(self.gestor.verificar_conflicto_horario(
+            Evento(**datos_evento("B", "05/01/2027", "10:30"))))
+
+    def test_convierte_los_campos_numericos(self):
+        self.assertTrue(self.gestor.actualizar_evento(self.evento.id, capacidad="200",
+                                                      precio_base="12.5", duracion="1.5"))
+        self.assertEqual((self.evento.capacidad, self.evento.precio_base, self.evento.duracion),
+                         (200, 12.5, 1.5))
+        self.comprobar_indexado(200)
+
+    def test_valor_invalido_no_cambia_nada(self):
+        for cambios in ({'duracion': "x"}, {'capacidad': "mucha"}, {'precio_base': None},
+                        {'hora': "11:00", 'capacidad': "?"}):
+            self.assertFalse(self.gestor.actualizar_evento(self.evento.id, **cambios))
+        self.assertEqual((self.evento.hora, self.evento.duracion), ("10:00", 1.0))
+        self.comprobar_indexado(50)
+
+    def test_fallo_al_reindexar_deja_el_evento_como_estaba(self):
+        original = self.evento.to_dict()
+        agregar = self.gestor._indice_texto.agregar
+        fallos = [RuntimeError("fallo")]
+
+        def agregar_con_fallo(*args):
+            if fallos:
+                raise fallos.pop()
+            return agregar(*args)
+        with mock.patch.object(self.gestor._indice_texto, 'agregar',
+                               side_effect=agregar_con_fallo):
+            self.assertFalse(self.gestor.actualizar_evento(
+                self.evento.id, id="nuevo", hora="18:00", tipo="Gala", capacidad=10))
+        self.assertEqual(self.evento.to_dict(), original)
+        self.assertIs(self.gestor.buscar_por_id(original['id']), self.evento)
+        self.assertIsNone(self.gestor.buscar_por_id("nuevo"))
+        self.assertEqual(self.gestor.buscar_por_tipo("Gala"), [])
+        self.comprobar_indexado(50)
+        self.assertFalse(self.gestor.verificar_conflicto_horario(
+            Evento(**datos_evento("B", "05/01/2027", "18:00"))))
+
+
+class TestCrearEventosLote(unittest.TestCase):
+
+    def test_resultado_por_fila(self):
+        gestor = gestor_en_memoria()
+        gestor.crear_evento(**datos_evento("Existente", "05/01/2027", "10:00"))
+        filas = [
+            datos_evento("Choca con existente", "05/01/2027", "10:30"),
+            datos_evento("Tarde", "05/01/2027", "18:00", duracion=2),
+            datos_evento("Choca con el lote", "05/01/2027", "19:00"),
+            datos_evento("", "06/01/2027", "10:00"),
+            datos_evento("Sin hora", "06/01/2027", "25:99"),
+            dict(datos_evento("Capacidad rara", "07/01/2027", "10:00"), capacidad="mucha"),
+            datos_evento("Otra ubicación", "05/01/2027", "19:00", ubicacion="Palco VIP"),
+        ]
+        resultados = gestor.crear_eventos_lote(filas)
+
+        self.assertEqual([resultado['fila'] for resultado in resultados], list(range(7)))
+        creados = [resultado['evento'].nombre for resultado in resultados if resultado['evento']]
+        self.assertEqual(creados, ["Tarde", "Otra ubicación"])
+        errores = [resultado['error'] for resultado in resultados]
+        self.assertEqual(errores[0], "Conflicto de horario con un evento existente")
+        self.assertEqual(errores[2], "Conflicto de horario con otra fila del lote")
+        self.assertEqual(errores[3], "El nombre del evento es obligatorio")
+        self.assertTrue(errores[4].startswith("La fecha y la hora"))
+        self.assertTrue(errores[5].startswith("Datos inválidos"))
+        self.assertEqual(len(gestor.eventos), 3)
+
+    def test_exclusivo_del_lote_choca_en_cualquier_ubicacion(self):
+        gestor = gestor_en_memoria()
+        resultados = gestor.crear_eventos_lote([
+            datos_evento("Visita", "05/01/2027", "21:00"),
+            datos_evento("Partido", "05/01/2027", "20:00", duracion=2,
+                         tipo="Partido de Liga", ubicacion="Tribuna Principal"),
+        ])
+        self.assertEqual([resultado['evento'] is not None for resultado in resultados],
+                         [False, True])
+
+
+class TestCSV(unittest.TestCase):
+
+    def setUp(self):
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        self.ruta = os.path.join(directorio, "eventos.csv.gz")
+        self.gestor = gestor_en_memoria()
+        for dia in range(1, 6):
+            self.gestor.crear_evento(**datos_evento(f"Visita {dia}", f"0{dia}/02/2027", "10:00"))
+        self.gestor.crear_evento(**datos_evento("Gala", "03/02/2027", "20:00", tipo="Gala",
+                                                ubicacion="Palco VIP"))
+
+    def importar(self):
+        gestor = gestor_en_memoria()
+        resumen = gestor.importar_desde_csv(self.ruta, tamano_lote=2)
+        return gestor, resumen
+
+    def test_ida_y_vuelta_comprimida_con_filtro(self):
+        self.assertTrue(self.gestor.exportar_a_csv(self.ruta, criterio='tipo',
+                                                   valor="Visita Guiada", tamano_bloque=2))
+        with gzip.open(self.ruta, 'rt', encoding='utf-8') as archivo:
+            self.assertEqual(len(archivo.readlines()), 6)
+        gestor, resumen = self.importar()
+
+        self.assertEqual((resumen['creados'], resumen['rechazados']), (5, 0))
+        self.assertEqual(sorted(evento.to_dict()['nombre'] for evento in gestor.eventos),
+                         [f"Visita {dia}" for dia in range(1, 6)])
+        original = self.gestor.buscar_por_id(gestor.eventos[0].id).to_dict()
+        importado = gestor.eventos[0].to_dict()
+        del original['fecha_creacion'], importado['fecha_creacion']
+        self.assertEqual(importado, original)
+
+    def test_rango_de_fechas_y_filas_rechazadas(self):
+        self.gestor.exportar_a_csv(self.ruta, desde=datetime(2027, 2, 3),
+                                   hasta=datetime(2027, 2, 5))
+        gestor = gestor_en_memoria()
+        gestor.crear_evento(**datos_evento("Ocupa", "04/02/2027", "10:00"))
+        resumen = gestor.importar_desde_csv(self.ruta)
+
+        self.assertEqual((resumen['creados'], resumen['rechazados']), (2, 1))
+        self.assertEqual(resumen['errores'],
+                         [(3, "Conflicto de horario con un evento existente")])
+
+
+class TestConsultasCalendario(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+        # Del domingo 31/01 al martes 09/02 de 2027, en orden desordenado
+        for dia, hora in ((9, "10:00"), (1, "23:00"), (31, "10:00"), (7, "23:30"), (8, "00:00"),
+                          (1, "08:00")):
+            mes = "01" if dia == 31 else "02"
+            self.gestor.crear_evento(**datos_evento(f"{dia:02d} {hora}", f"{dia:02d}/{mes}/2027",
+                                                    hora, duracion=0.5))
+
+    def nombres(self, eventos):
+        return [evento.nombre for evento in eventos]
+
+    def test_rango_semiabierto_y_ordenado(self):
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_en_rango(
+            datetime(2027, 2, 1, 8, 0), datetime(2027, 2, 8))),
+            ["01 08:00", "01 23:00", "07 23:30"])
+        self.assertEqual(self.gestor.obtener_eventos_en_rango(datetime(2027, 3, 1),
+                                                              datetime(2027, 4, 1)), [])
+
+    def test_semana_de_lunes_a_domingo(self):
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_por_semana(date(2027, 2, 4))),
+                         ["01 08:00", "01 23:00", "07 23:30"])
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_por_semana(date(2027, 1, 31))),
+                         ["31 10:00"])
+
+    def test_dia_y_mes(self):
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_por_dia(date(2027, 2, 8))),
+                         ["08 00:00"])
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_por_mes(2027, 2)),
+                         ["01 08:00", "01 23:00", "07 23:30", "08 00:00", "09 10:00"])
+
+    def test_incluye_ocurrencias_de_series(self):
+        self.gestor.crear_serie(**datos_evento("Tour", "01/02/2027", "12:00",
+                                               ubicacion="Palco VIP"))
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_por_dia(date(2027, 2, 9))),
+                         ["09 10:00", "Tour"])
+
+
+class TestProximosYHoy(unittest.TestCase):
+
+    def setUp(self):
+        self.ahora = datetime(2027, 2, 1, 9, 0)
+        self.gestor = GestorEventos(almacenamiento=AlmacenamientoSQLite(":memory:"),
+                                    reloj=lambda: self.ahora)
+        for fecha, hora in (("01/02/2027", "08:00"), ("01/02/2027", "09:00"),
+                            ("01/02/2027", "20:00"), ("03/02/2027", "09:00"),
+                            ("03/02/2027", "09:01"), ("05/02/2027", "08:00")):
+            self.gestor.crear_evento(**datos_evento(f"{fecha} {hora}", fecha, hora,
+                                                    duracion=1 / 60))
+
+    def nombres(self, eventos):
+        return [evento.nombre for evento in eventos]
+
+    def test_proximas_48_horas(self):
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_proximos()),
+                         ["01/02/2027 20:00", "03/02/2027 09:00"])
+        self.assertEqual(self.gestor.obtener_estadisticas()['eventos_proximos'], 2)
+
+    def test_hoy(self):
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_de_hoy()),
+                         ["01/02/2027 08:00", "01/02/2027 09:00", "01/02/2027 20:00"])
+
+    def test_el_reloj_avanza_y_los_cambios_cuentan(self):
+        self.gestor.obtener_eventos_proximos()
+        self.ahora = datetime(2027, 2, 3, 9, 0)
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_proximos()),
+                         ["03/02/2027 09:01", "05/02/2027 08:00"])
+        self.gestor.crear_evento(**datos_evento("Nuevo", "04/02/2027", "12:00"))
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_proximos()),
+                         ["03/02/2027 09:01", "Nuevo", "05/02/2027 08:00"])
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_de_hoy()),
+                         ["03/02/2027 09:00", "03/02/2027 09:01"])
+        # Retroceder el reloj también funciona
+        self.ahora = datetime(2027, 2, 1, 19, 0)
+        self.assertEqual(self.nombres(self.gestor.obtener_eventos_proximos()),
+                         ["01/02/2027 20:00", "03/02/2027 09:00", "03/02/2027 09:01"])
+
+
+class TestPaginacion(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+        for dia in (7, 3, 5, 1, 6, 2, 4):
+            self.gestor.crear_evento(**datos_evento(f"D{dia}", f"0{dia}/02/2027", "10:00"))
+        self.gestor.crear_evento(**datos_evento("Sin fecha", "pendiente", "10:00"))
+
+    def nombres(self, pagina):
+        return [fila['nombre'] for fila in pagina['eventos']]
+
+    def test_recorrido_hacia_delante_y_atras(self):
+        primera = self.gestor.obtener_pagina(tamano=3)
+        self.assertEqual(self.nombres(primera), ["D1", "D2", "D3"])
+        self.assertEqual((primera['posicion'], primera['total'], primera['anterior']), (0, 8, None))
+        segunda = self.gestor.obtener_pagina(primera['siguiente'], tamano=3)
+        tercera = self.gestor.obtener_pagina(segunda['siguiente'], tamano=3)
+        self.assertEqual(self.nombres(segunda), ["D4", "D5", "D6"])
+        self.assertEqual(self.nombres(tercera), ["D7", "Sin fecha"])
+        self.assertIsNone(tercera['siguiente'])
+        atras = self.gestor.obtener_pagina(tercera['anterior'], tamano=3, hacia_atras=True)
+        self.assertEqual(self.nombres(atras), ["D4", "D5", "D6"])
+        ultima = self.gestor.obtener_pagina(tamano=3, hacia_atras=True)
+        self.assertEqual(self.nombres(ultima), ["D6", "D7", "Sin fecha"])
+
+    def test_cursor_estable_tras_altas_y_bajas(self):
+        primera = self.gestor.obtener_pagina(tamano=3)
+        self.gestor.eliminar_evento(primera['eventos'][0]['id'])
+        self.gestor.crear_evento(**datos_evento("D0", "01/01/2027", "10:00"))
+        segunda = self.gestor.obtener_pagina(primera['siguiente'], tamano=3)
+        self.assertEqual(self.nombres(segunda), ["D4", "D5", "D6"])
+        # Si desaparece el evento del cursor se sigue desde su lugar
+        self.gestor.eliminar_evento(primera['eventos'][2]['id'])
+        self.assertEqual(self.nombres(self.gestor.obtener_pagina(primera['siguiente'], tamano=3)),
+                         ["D4", "D5", "D6"])
+
+    def test_filas_y_cursor_de_evento(self):
+        self.assertEqual([fila['nombre'] for fila in self.gestor.obtener_filas(6, 10)],
+                         ["D7", "Sin fecha"])
+        self.assertEqual(self.gestor.contar_eventos(), 8)
+        cursor = self.gestor.cursor_evento(self.gestor.buscar_por_nombre("D5")[0].id)
+        self.assertEqual(cursor[2], 4)
+        self.assertEqual(self.nombres(self.gestor.obtener_pagina(cursor, tamano=2)), ["D6", "D7"])
+        self.assertIsNone(self.gestor.cursor_evento("no_existe"))
+
+
+class TestHuecosLibres(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+
+    def test_huecos_entre_eventos(self):
+        self.gestor.crear_evento(**datos_evento("A", "05/01/2027", "10:00"))
+        self.gestor.crear_evento(**datos_evento("B", "05/01/2027", "12:00"))
+        huecos = self.gestor.buscar_huecos_libres(MUSEO, 1, datetime(2027, 1, 5, 9, 0), cantidad=3)
+        self.assertEqual(huecos, [datetime(2027, 1, 5, 9, 0), datetime(2027, 1, 5, 11, 0),
+                                  datetime(2027, 1, 5, 13, 0)])
+
+    def test_serie_infinita_sin_hueco_suficiente_termina(self):
+        self.gestor.crear_serie(**datos_evento("Tour", "01/01/2027", "10:00"))
+        self.assertEqual(
+            self.gestor.buscar_huecos_libres(MUSEO, 30, datetime(2027, 1, 5)), [])
+
+    def test_serie_infinita_con_huecos(self):
+        self.gestor.crear_serie(**datos_evento("Tour", "01/01/2027", "10:00"))
+        huecos = self.gestor.buscar_huecos_libres(MUSEO, 20, datetime(2027, 1, 5), cantidad=2)
+        self.assertEqual(huecos, [datetime(2027, 1, 5, 11, 0), datetime(2027, 1, 6, 11, 0)])
+
+    def test_hasta_limita_los_huecos(self):
+        huecos = self.gestor.buscar_huecos_libres(MUSEO, 2, datetime(2027, 1, 5), cantidad=5,
+                                                  hasta=datetime(2027, 1, 5, 5, 0))
+        self.assertEqual(huecos, [datetime(2027, 1, 5, 0, 0), datetime(2027, 1, 5, 2, 0)])
+
+
+class TestBusquedaTexto(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = gestor_en_memoria()
+        for nombre, hora in (("Barça - Madrid", "10:00"), ("Gala Arts", "12:00"),
+                             ("Visita", "14:00")):
+            self.gestor.crear_evento(**datos_evento(nombre, "05/01/2027", hora))
+
+    def nombres(self, eventos):
+        return [evento.nombre for evento in eventos]
+
+    def test_nombre_corto_busca_subcadenas(self):
+        self.assertEqual(self.nombres(self.gestor.buscar_por_nombre("ar")),
+                         ["Barça - Madrid", "Gala Arts"])
+        self.assertEqual(self.nombres(self.gestor.buscar_por_nombre("Ç")), ["Barça - Madrid"])
+
+    def test_nombre_largo_sin_tildes(self):
+        self.assertEqual(self.nombres(self.gestor.buscar_por_nombre("BARCA")),
+                         ["Barça - Madrid"])
+        self.assertEqual(self.gestor.buscar_por_nombre("xyz"), [])
+
+    def test_buscar_texto_corto_busca_subcadenas(self):
+        # "Visita" solo coincide por la ubicación (Museo FC Barcelona)
+        self.assertEqual(self.nombres(self.gestor.buscar_texto("ar")),
+                         ["Barça - Madrid", "Gala Arts", "Visita"])
+        self.assertEqual(self.nombres(self.gestor.buscar_texto("dr")), ["Barça - Madrid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# test_indices.py
+import random
+import unittest
+from types import SimpleNamespace
+
+from indices import (CursorTemporal, EstadisticasEventos, IndiceIntervalos, IndiceTexto,
+                     normalizar_texto)
+
+
+class TestIndiceIntervalos(unittest.TestCase):
+
+    def setUp(self):
+        azar = random.Random(7)
+        self.intervalos = []
+        for valor in range(300):
+            inicio = azar.randrange(0, 5000)
+            self.intervalos.append((inicio, inicio + azar.randrange(1, 120), valor))
+        self.indice = IndiceIntervalos(self.intervalos)
+
+    def solapados(self, inicio, fin):
+        return sorted((valor for desde, hasta, valor in self.intervalos
+                       if desde < fin and inicio < hasta), key=str)
+
+    def test_solapados_coincide_con_recorrido_completo(self):
+        for inicio in range(-100, 5200, 37):
+            fin = inicio + 45
+            self.assertEqual(sorted(self.indice.solapados(inicio, fin), key=str),
+                             self.solapados(inicio, fin), inicio)
+
+    def test_agregar_y_eliminar(self):
+        for entrada in self.intervalos[::2]:
+            self.assertTrue(self.indice.eliminar(entrada[0], entrada[2]))
+        self.assertFalse(self.indice.eliminar(self.intervalos[0][0], self.intervalos[0][2]))
+        self.intervalos = self.intervalos[1::2] + [(10, 9000, 'largo')]
+        self.indice.agregar(10, 9000, 'largo')
+        self.assertEqual(len(self.indice), len(self.intervalos))
+        self.assertEqual([inicio for inicio, _, _ in self.indice],
+                         sorted(inicio for inicio, _, _ in self.intervalos))
+        for inicio in range(0, 9000, 301):
+            self.assertEqual(sorted(self.indice.solapados(inicio, inicio + 10), key=str),
+                             self.solapados(inicio, inicio + 10), inicio)
+
+    def test_posiciones(self):
+        ordenados = sorted(self.intervalos, key=lambda entrada: entrada[0])
+        inicio, _, valor = ordenados[100]
+        posicion = self.indice.posicion_de(inicio, valor)
+        self.assertEqual(list(self.indice.entre_posiciones(posicion, posicion + 1)), [valor])
+        self.assertIsNone(self.indice.posicion_de(inicio, 'otro'))
+        self.assertEqual(list(self.indice.en_rango(1000, 2000)),
+                         list(self.indice.entre_posiciones(self.indice.posicion(1000),
+                                                           self.indice.posicion(2000))))
+        # Cota: ningún intervalo acaba después, aunque puede que ninguno acabe justo ahí
+        self.assertGreaterEqual(self.indice.cota_fin(), max(fin for _, fin, _ in self.intervalos))
+        self.assertIsNone(IndiceIntervalos().cota_fin())
+
+
+class TestCursorTemporal(unittest.TestCase):
+
+    def test_contar_con_el_reloj_avanzando_y_cambios(self):
+        indice = IndiceIntervalos((minuto, minuto + 1, minuto) for minuto in range(0, 1000, 10))
+        cursor = CursorTemporal(indice)
+        for ahora in range(0, 1000, 25):
+            self.assertEqual(cursor.valores(ahora, ahora + 50),
+                             [minuto for minuto in range(0, 1000, 10) if ahora <= minuto < ahora + 50])
+        indice.agregar(5, 6, 5)
+        self.assertEqual(cursor.contar(0, 20), 3)
+        self.assertEqual(cursor.contar(500, 500), 0)
+
+
+class TestEstadisticasEventos(unittest.TestCase):
+
+    def test_registrar_y_retirar(self):
+        def evento(tipo, estado, capacidad):
+            return SimpleNamespace(tipo=tipo, estado=estado, capacidad=capacidad,
+                                   obtener_ingresos_estimados=lambda: capacidad * 0.5)
+        estadisticas = EstadisticasEventos()
+        partido = evento("Partido", "programado", 1000)
+        visita = evento("Visita", "cancelado", 20)
+        for registrado in (partido, visita, evento("Visita", "programado", 30)):
+            estadisticas.registrar(registrado)
+        self.assertEqual(estadisticas.tipo_mas_comun(), "Visita")
+        estadisticas.retirar(visita)
+        self.assertEqual((estadisticas.total, estadisticas.por_estado, estadisticas.capacidad_total),
+                         (2, {'programado': 2}, 1030))
+        self.assertAlmostEqual(estadisticas.ingresos_totales, 515)
+        estadisticas.reiniciar()
+        self.assertEqual(estadisticas.tipo_mas_comun(), "N/A")
+
+
+class TestIndiceTexto(unittest.TestCase):
+
+    def setUp(self):
+        self.indice = IndiceTexto(pesos=[3, 1])
+        self.indice.agregar('a', ["Barça - Madrid", "Partido de Liga"])
+        self.indice.agregar('b', ["Visita al Museo", "Visita Guiada"])
+        self.indice.agregar('c', ["Gala Fundació", "Barcelona"])
+
+    def test_normalizar_texto(self):
+        self.assertEqual(normalizar_texto("Fundació BARÇA"), "fundacio barca")
+
+    def test_buscar_por_relevancia(self):
+        self.assertEqual(self.indice.buscar("BARC"), ['a', 'c'])
+        self.assertEqual(self.indice.buscar("fundacio"), ['c'])
+        self.assertEqual(self.indice.buscar("visita"), ['b'])
+        self.assertEqual(self.indice.buscar("barc", campos=[1]), ['c'])
+        self.assertEqual(self.indice.buscar("inexistente"), [])
+
+    def test_consultas_cortas(self):
+        self.assertEqual(self.indice.buscar("ma"), ['a'])
+        self.assertEqual(self.indice.buscar("ar", campos=[0]), [])
+        self.assertEqual(self.indice.buscar("ar", campos=[0], subcadena=True), ['a'])
+
+    def test_eliminar_y_vaciar(self):
+        self.indice.eliminar('a')
+        self.assertEqual(self.indice.buscar("barc"), ['c'])
+        self.assertEqual(len(self.indice), 2)
+        self.indice.vaciar()
+        self.assertEqual(self.indice.buscar("gala"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
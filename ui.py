@@ -2,6 +2,144 @@
 import tkinter as tk
 from tkinter import ttk
 
+class VirtualTreeview:
+    """Desplazamiento virtual sobre un Treeview para listas muy largas
+    
+    Solo existen como elementos reales del Treeview unas 2 veces las filas
+    visibles. Al desplazarse se reutilizan cambiando sus valores con las
+    filas que pide a `row_source(start, end)`, así que el coste de cada
+    desplazamiento no depende del número total de filas.
+    """
+    
+    def __init__(self, tree, scrollbar, row_values):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values  # Convierte una fila (dict) en los valores de las columnas
+        self.active = False
+        self.total = 0
+        self.row_source = None
+        self.first = 0          # Primera fila visible (índice global)
+        self.window_start = 0   # Fila global que ocupa el primer elemento reutilizable
+        self.slots = []         # IIDs de los elementos reutilizables
+        self.slot_ids = {}      # IID del elemento -> ID del evento que muestra
+        self.selected_ids = {}  # IDs seleccionados, en orden de selección
+        self.tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+    
+    @property
+    def visible_rows(self):
+        return int(self.tree.cget("height"))
+    
+    def activate(self, total, row_source):
+        """Muestra `total` filas obtenidas bajo demanda de `row_source`"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.active = True
+        self.total = total
+        self.row_source = row_source
+        self.first = 0
+        self.selected_ids.clear()
+        pool = min(2 * self.visible_rows, total)
+        self.slots = [self.tree.insert("", tk.END, iid=f"_fila_{n}") for n in range(pool)]
+        self.scrollbar.config(command=self.yview)
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(secuencia, self._on_wheel)
+        self._fill(0)
+        self.scroll_to(0)
+    
+    def deactivate(self):
+        """Devuelve el Treeview a su desplazamiento normal"""
+        if not self.active:
+            return
+        self.active = False
+        for item in self.slots:
+            if self.tree.exists(item):
+                self.tree.delete(item)
+        self.slots = []
+        self.slot_ids = {}
+        self.scrollbar.config(command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.unbind(secuencia)
+    
+    def refresh(self, total=None):
+        """Vuelve a pedir las filas mostradas (tras un cambio en los datos)"""
+        first = self.first
+        if total is not None:
+            self.total = total
+            self._resize_pool(min(2 * self.visible_rows, total))
+        self._fill(max(0, min(self.window_start, self.total - len(self.slots))))
+        self.scroll_to(first)
+    
+    def _resize_pool(self, pool):
+        """Añade o quita elementos reutilizables del final sin tocar la selección"""
+        for item in self.slots[pool:]:
+            self.tree.delete(item)
+        del self.slots[pool:]
+        self.slots.extend(self.tree.insert("", tk.END, iid=f"_fila_{n}")
+                          for n in range(len(self.slots), pool))
+    
+    def event_id(self, item):
+        """ID del evento que muestra un elemento del Treeview"""
+        return self.slot_ids.get(item)
+    
+    def discard(self, event_ids):
+        """Olvida la selección de eventos que ya no existen"""
+        for event_id in event_ids:
+            self.selected_ids.pop(event_id, None)
+    
+    def yview(self, *args):
+        """Comando de la barra de desplazamiento: 'moveto' o 'scroll'"""
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+    
+    def scroll_to(self, first):
+        """Deja `first` como primera fila visible"""
+        pool = len(self.slots)
+        if not pool:
+            self.scrollbar.set(0, 1)
+            return
+        first = max(0, min(first, self.total - self.visible_rows))
+        if not self.window_start <= first <= self.window_start + pool - self.visible_rows:
+            # Fuera de la ventana: se recoloca centrada y se reutilizan los elementos
+            start = first - (pool - self.visible_rows) // 2
+            self._fill(max(0, min(start, self.total - pool)))
+        self.first = first
+        self.tree.yview_moveto((first - self.window_start) / pool)
+        self.scrollbar.set(first / self.total, min(first + self.visible_rows, self.total) / self.total)
+    
+    def _fill(self, window_start):
+        """Asigna a los elementos reutilizables las filas desde `window_start`"""
+        self.window_start = window_start
+        rows = self.row_source(window_start, window_start + len(self.slots))
+        self.slot_ids = {}
+        reselect = []
+        for item, row in zip(self.slots, rows):
+            self.tree.item(item, values=self.row_values(row))
+            self.slot_ids[item] = row.get("id")
+            if row.get("id") in self.selected_ids:
+                reselect.append(item)
+        # La selección sigue a los eventos, no a los elementos reutilizados
+        self.tree.selection_set(reselect)
+    
+    def _on_select(self, _event):
+        if not self.active:
+            return
+        for event_id in self.slot_ids.values():
+            self.selected_ids.pop(event_id, None)
+        self.selected_ids.update(dict.fromkeys(self.slot_ids[item] for item in self.tree.selection()))
+    
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+        return "break"
+
+
 class EventOrganizerUI:
     def __init__(self, root):
         self.root = root
@@ -20,11 +158,20 @@ class EventOrganizerUI:
         self.event_capacity_var = tk.StringVar()
         self.search_var = tk.StringVar()
         
+        # Variables para la paginación de la tabla
+        self.page_size_var = tk.StringVar(value="50")
+        self.page_info_var = tk.StringVar(value="")
+        self.continuous_var = tk.BooleanVar(value=False)
+        
+        # Estado a aplicar a los eventos seleccionados
+        self.status_var = tk.StringVar()
+        
         # Variables para estadísticas
         self.total_events_var = tk.StringVar(value="0")
         self.upcoming_events_var = tk.StringVar(value="0")
         self.total_capacity_var = tk.StringVar(value="0")
         self.most_common_type_var = tk.StringVar(value="N/A")
+        self.stats_scope_var = tk.StringVar()
         
         # Configurar la interfaz
         self.setup_ui()
@@ -200,7 +347,8 @@ class EventOrganizerUI:
         
         # Crear Treeview para mostrar eventos
         columns = ("Nombre", "Fecha", "Hora", "Tipo", "Ubicación", "Capacidad")
-        self.events_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+        self.events_tree = ttk.Treeview(table_frame, columns=columns, show="headings",
+                                        height=15, selectmode="extended")
         
         # Configurar columnas
         for col in columns:
@@ -211,10 +359,40 @@ class EventOrganizerUI:
         scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.events_tree.yview)
         self.events_tree.configure(yscrollcommand=scrollbar.set)
         
+        # Desplazamiento virtual para recorrer listas largas sin paginar
+        self.virtual_table = VirtualTreeview(self.events_tree, scrollbar, self.event_values)
+        
         # Posicionar widgets
         self.events_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Controles de paginación
+        pager_frame = tk.Frame(main_frame, bg="white")
+        pager_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        self.prev_page_button = tk.Button(pager_frame, text="◀ Anterior",
+                 bg="#004D98", fg="white", font=("Arial", 9, "bold"),
+                 padx=10, state=tk.DISABLED)
+        self.prev_page_button.pack(side=tk.LEFT)
+        
+        tk.Label(pager_frame, textvariable=self.page_info_var, bg="white",
+                font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+        
+        self.next_page_button = tk.Button(pager_frame, text="Siguiente ▶",
+                 bg="#004D98", fg="white", font=("Arial", 9, "bold"),
+                 padx=10, state=tk.DISABLED)
+        self.next_page_button.pack(side=tk.LEFT)
+        
+        self.page_size_combo = ttk.Combobox(pager_frame, textvariable=self.page_size_var,
+                 values=("25", "50", "100", "200"), width=5, state="readonly")
+        self.page_size_combo.pack(side=tk.RIGHT)
+        tk.Label(pager_frame, text="Filas por página:", bg="white",
+                font=("Arial", 10)).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        self.continuous_check = tk.Checkbutton(pager_frame, text="Desplazamiento continuo",
+                 variable=self.continuous_var, bg="white", font=("Arial", 10))
+        self.continuous_check.pack(side=tk.RIGHT, padx=(0, 15))
+        
         # Botones de acción para eventos seleccionados
         action_frame = tk.Frame(main_frame, bg="white")
         action_frame.pack(fill=tk.X, pady=10)
@@ -229,6 +407,15 @@ class EventOrganizerUI:
                  padx=15)
         self.delete_event_button.pack(side=tk.LEFT, padx=5)
         
+        self.change_status_button = tk.Button(action_frame, text="Cambiar Estado",
+                 bg="#004D98", fg="white", font=("Arial", 10, "bold"),
+                 padx=15)
+        self.change_status_button.pack(side=tk.RIGHT, padx=5)
+        
+        self.status_combo = ttk.Combobox(action_frame, textvariable=self.status_var,
+                 width=12, state="readonly")
+        self.status_combo.pack(side=tk.RIGHT, padx=5)
+        
     def setup_stats_tab(self):
         # Frame principal
         main_frame = tk.Frame(self.stats_tab, bg="white")
@@ -252,6 +439,10 @@ class EventOrganizerUI:
         self.create_stat_card(cards_frame, "Capacidad Total", self.total_capacity_var, "#004D98", 2)
         self.create_stat_card(cards_frame, "Tipo Más Común", self.most_common_type_var, "#A50044", 3)
         
+        # Aviso de que las estadísticas no incluyen las temporadas sin cargar
+        tk.Label(stats_frame, textvariable=self.stats_scope_var, font=("Arial", 10, "italic"),
+                bg="white", fg="#A50044").pack(pady=(10, 0))
+        
         # Gráfico de tipos de eventos (simulado con etiquetas)
         tk.Label(stats_frame, text="Distribución por Tipo de Evento", 
                 font=("Arial", 14, "bold"), bg="white").pack(pady=(30, 10))
@@ -347,20 +538,85 @@ class EventOrganizerUI:
         
     def display_events(self, events_list):
         """Muestra la lista de eventos en el Treeview"""
+        self.virtual_table.deactivate()
+        
         # Limpiar lista actual
         for item in self.events_tree.get_children():
             self.events_tree.delete(item)
         
-        # Agregar eventos a la lista
+        # Agregar eventos a la lista (cada fila se identifica por el ID del evento)
         for event in events_list:
-            self.events_tree.insert("", tk.END, values=(
-                event.get("name", ""),
-                event.get("date", ""),
-                event.get("time", ""),
-                event.get("type", ""),
-                event.get("location", ""),
-                event.get("capacity", "")
-            ))
+            self.events_tree.insert("", tk.END, iid=event.get("id"), values=self.event_values(event))
+    
+    def get_selected_event_ids(self):
+        """IDs de los eventos seleccionados en la tabla (las filas se identifican por ID)"""
+        if self.virtual_table.active:
+            # Incluye los seleccionados que ya no están a la vista
+            return list(self.virtual_table.selected_ids)
+        return list(self.events_tree.selection())
+    
+    def insert_event_row(self, index, event):
+        """Inserta la fila de un evento en la posición `index` de la tabla"""
+        self.events_tree.insert("", index, iid=event.get("id"), values=self.event_values(event))
+    
+    def update_event_row(self, event, index=None):
+        """Actualiza los valores de la fila de un evento (y la mueve a `index` si se indica)"""
+        event_id = event.get("id")
+        if not self.events_tree.exists(event_id):
+            return
+        self.events_tree.item(event_id, values=self.event_values(event))
+        if index is not None:
+            self.events_tree.move(event_id, "", index)
+    
+    def delete_event_row(self, event_id):
+        """Quita de la tabla la fila de un evento, si se está mostrando"""
+        if self.events_tree.exists(event_id):
+            self.events_tree.delete(event_id)
+    
+    def display_virtual(self, total, row_source):
+        """Muestra `total` eventos con desplazamiento virtual
+        
+        `row_source(start, end)` devuelve los eventos (diccionarios) de las
+        posiciones [start, end); solo se le piden las filas que se muestran.
+        """
+        self.virtual_table.activate(total, row_source)
+        if total:
+            self.page_info_var.set(f"{total} eventos")
+        else:
+            self.page_info_var.set("Sin eventos")
+        self.prev_page_button.config(state=tk.DISABLED)
+        self.next_page_button.config(state=tk.DISABLED)
+    
+    def event_values(self, event):
+        """Valores de las columnas de la tabla para un evento"""
+        return (
+            event.get("nombre", ""),
+            event.get("fecha", ""),
+            event.get("hora", ""),
+            event.get("tipo", ""),
+            event.get("ubicacion", ""),
+            event.get("capacidad", "")
+        )
+    
+    def is_continuous(self):
+        """Indica si la tabla usa desplazamiento continuo en lugar de páginas"""
+        return self.continuous_var.get()
+    
+    def get_page_size(self):
+        """Obtiene el número de filas por página elegido"""
+        try:
+            return int(self.page_size_var.get())
+        except ValueError:
+            return 50
+    
+    def update_page_controls(self, first, shown, total, has_prev, has_next):
+        """Actualiza el texto y los botones de paginación"""
+        if total:
+            self.page_info_var.set(f"{first + 1}–{first + shown} de {total}")
+        else:
+            self.page_info_var.set("Sin eventos")
+        self.prev_page_button.config(state=tk.NORMAL if has_prev else tk.DISABLED)
+        self.next_page_button.config(state=tk.NORMAL if has_next else tk.DISABLED)
             
     def update_statistics(self, stats_dict):
         """Actualiza las estadísticas mostradas"""
@@ -369,6 +625,14 @@ class EventOrganizerUI:
         self.total_capacity_var.set(stats_dict.get("total_capacity", "0"))
         self.most_common_type_var.set(stats_dict.get("most_common_type", "N/A"))
         
+        unloaded = stats_dict.get("unloaded_seasons")
+        if unloaded:
+            self.stats_scope_var.set(
+                f"Solo temporadas activas: faltan {', '.join(unloaded)} "
+                "(pulse Actualizar Estadísticas para incluirlas)")
+        else:
+            self.stats_scope_var.set("")
+        
         # Actualizar gráfico (simulado)
         if "type_distribution" in stats_dict:
             chart_text = "Distribución:\n"